@@ -1,18 +1,26 @@
 """
 Procurement Intelligence Platform - Main Application
 FastAPI web server for procurement analytics dashboards
+
+Importing this module loads neither pandas nor plotly: connectors, the tender
+store and the refresh jobs are created by `start_services` on a worker thread
+once the server is accepting requests, and dashboard builders are imported
+by the first build that needs them.
 """
-from fastapi import FastAPI, Query, Request, Depends, HTTPException, status
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import FastAPI, Query, Request, Depends
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, Response, FileResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
+import math
 import sys
 import os
+import threading
+import time
 from pathlib import Path
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
-import jwt
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -21,47 +29,454 @@ load_dotenv()
 # Add connectors to path
 sys.path.append(str(Path(__file__).parent))
 
-from connectors.ted_eu import TEDConnector
-from dashboards.generator import DashboardGenerator
-from dashboards.powerbi_layout import PowerBIDashboard
+from dashboards.rendering import environment, STATIC_DIR
+from dashboards.pages import DASHBOARD_PAGES, INSIGHTS_TABS
+from dashboards import tasks
+from dashboards.snapshots import find_snapshot
 from user_dashboard import UserDashboard, add_favorite, remove_favorite, get_favorites
+from core import metrics
+from core.auth import AuthError, require_user, token_cache
+from core.config import get_setting
+from core.broadcast import format_event
+from core.scheduler import FileLock, Scheduler
+from core.offload import Offloader
+from core.ratelimit import QuotaExceeded, RateLimiter, SharedBuckets, UpstreamBudget
+from core.singleflight import SingleFlight
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Serve at once; services and background ingestion/cache warming start behind"""
+    startup = asyncio.create_task(start_background())
+    yield
+    startup.cancel()
+    await scheduler.stop()
+    offloader.shutdown()
+
+
+async def start_background():
+    """Create the services off the event loop, then start the refresh jobs"""
+    try:
+        await services()
+    except Exception as e:
+        print(f"Startup Error: {e}")
+        return
+    if scheduler_enabled:
+        scheduler.start()
+    if warmup_enabled:
+        await warmup()
 
-# Configuration
-SECRET_KEY = os.getenv("SECRET_KEY", "change-this-secret-key-in-production")
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
 
 app = FastAPI(
     title="Procurement Intelligence Platform",
     description="Multi-source government procurement analytics with AI insights",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
-# CORS middleware for API access
+# Per-client token buckets (API key or IP) and per-source upstream budgets,
+# shared by all workers through a memory-mapped file in the cache directory
+# (created by the first take, so importing the app writes nothing)
+rate_buckets = SharedBuckets(Path(__file__).parent / get_setting('cache.directory', 'cache') / 'ratelimit.buckets')
+rate_limiter = RateLimiter.from_config(rate_buckets)
+ratelimit_enabled = os.getenv('RATELIMIT_ENABLED', str(get_setting('ratelimit.enabled', True))).lower() == 'true'
+upstream_budget = UpstreamBudget.from_config(rate_buckets)
+
+
+@app.middleware('http')
+async def rate_limit(request: Request, call_next):
+    """429 with Retry-After once a client has spent its tokens (registered inside CORS)"""
+    if not ratelimit_enabled or not rate_limiter.applies(request.url.path):
+        return await call_next(request)
+    
+    host = request.client.host if request.client else None
+    allowed, left, wait = rate_limiter.check(request.headers, host, request.query_params)
+    if not allowed:
+        retry_after = str(math.ceil(wait))
+        return JSONResponse(
+            {'error': 'Rate limit exceeded', 'retry_after': int(retry_after)},
+            status_code=429, headers={'Retry-After': retry_after}
+        )
+    response = await call_next(request)
+    response.headers['X-RateLimit-Remaining'] = str(int(left))
+    return response
+
+
+# CORS middleware for API access (CORS_ORIGINS: comma-separated origins)
+cors_origins = os.getenv('CORS_ORIGINS', ','.join(get_setting('server.cors_origins', None) or ['*']))
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=[origin.strip() for origin in cors_origins.split(',')],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+
+class CachedStaticFiles(StaticFiles):
+    """Static files served with a long-lived Cache-Control header"""
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+        return response
+
+
 # Mount static files from _site directory
 app.mount("/site_libs", StaticFiles(directory="site/_site/site_libs"), name="site_libs")
+# Dashboard CSS, versioned by content hash in the templates
+app.mount("/static", CachedStaticFiles(directory=str(STATIC_DIR)), name="static")
+
+# CPU-heavy dashboard builds run off the event loop
+offloader = Offloader(
+    mode=os.getenv('OFFLOAD_MODE', get_setting('offload.mode', 'process')),
+    max_workers=int(get_setting('offload.max_workers', 2))
+)
+
+# Identical concurrent upstream queries share one connector call
+upstream_flight = SingleFlight('upstream')
 
-# Initialize connectors
-ted_connector = TEDConnector()
-dashboard_gen = DashboardGenerator()
-powerbi_dashboard = PowerBIDashboard()
+# Data services, created by start_services(): connectors (keyed like the
+# `sources` section of config.yml), the tender store (newly ingested tenders
+# are pushed to /api/stream/tenders) and the shared source cache
+ted_connector = None
+connectors = {}
+tender_store = None
+broadcaster = None
+source_cache = None
+services_started = False
+_services_lock = threading.Lock()
+SSE_HEARTBEAT_SECONDS = 15
 
-# Security
-security = HTTPBearer()
+# Most rows a query may ask for: bounds upstream fetches and build cost
+max_limit = int(get_setting('dashboards.max_limit', 1000))
+
+
+def clamp_limit(limit: int) -> int:
+    """A requested row limit bounded to 1..max_limit"""
+    return max(1, min(limit, max_limit))
+
+
+# Serve pre-built snapshots for fixed dashboards (python -m dashboards.snapshots)
+snapshots_enabled = bool(get_setting('snapshots.enabled', True))
+snapshot_requests = {'hits': 0, 'misses': 0}
 
 # In-memory storage (replace with database in production)
 users_db = {}
 
-# Templates
-templates = Jinja2Templates(directory="site")
+# Templates (compiled once, shared with the dashboard builders)
+templates = Jinja2Templates(env=environment)
+
+
+def start_services():
+    """Import the data stack and create connectors, tender store and refresh jobs (once)"""
+    global ted_connector, tender_store, broadcaster, source_cache, services_started
+    with _services_lock:
+        if services_started:
+            return
+        started = time.perf_counter()
+        from connectors.ted_eu import TEDConnector
+        from core.broadcast import Broadcaster
+        from storage.refresh import SourceCache
+        from storage.tender_store import TenderStore
+        
+        ted_connector = TEDConnector.from_config()
+        connectors['ted_eu'] = ted_connector
+        if tender_store is None:
+            tender_store = TenderStore()
+        broadcaster = Broadcaster()
+        tender_store.add_listener(broadcaster.publish)
+        source_cache = SourceCache(Path(__file__).parent / get_setting('cache.directory', 'cache'))
+        
+        # Per-source refresh at each source's `cache_hours` cadence. Jobs poll
+        # the shared snapshot every `poll_seconds`; only the worker holding
+        # the source lock ever calls upstream.
+        for source, settings in (get_setting('sources') or {}).items():
+            if settings.get('enabled') and source in connectors:
+                cache_hours = float(settings.get('cache_hours', 6))
+                scheduler.add_job(
+                    f'refresh:{source}',
+                    make_refresh_job(source, connectors[source], cache_hours),
+                    interval=min(poll_seconds, cache_hours * 3600)
+                )
+        
+        services_started = True
+        print(f"Services ready in {time.perf_counter() - started:.2f}s")
+
+
+async def services():
+    """Wait until start_services has run (in a thread, so the event loop keeps serving)"""
+    if not services_started:
+        await asyncio.to_thread(start_services)
+
+
+def filters_key(filters: dict) -> tuple:
+    """Hashable, order-independent identity of a filter dict"""
+    return tuple(sorted((k, str(v)) for k, v in filters.items() if v is not None))
+
+
+def fetch_upstream(source: str, filters: dict):
+    """
+    Query the connector directly. Results are ingested into the store until
+    the scheduler has loaded it; after that the store stays the shared
+    snapshot and the refresh brings new rows in.
+    """
+    allowed, wait = upstream_budget.take('ted_eu')
+    if not allowed:
+        return stale_page_data(source, filters, wait)
+    
+    if source == 'awards':
+        awards = tender_store.awards.resolve(ted_connector.search_awards(dict(filters)))
+        if not tender_store.awards.loaded:
+            tender_store.ingest_awards(awards, source='ted_eu')
+        return tender_store.join_awards(awards)
+    
+    tenders = tender_store.resolve_entities(ted_connector.search_tenders(dict(filters)))
+    if not tender_store.loaded:
+        tender_store.ingest(tenders, source='ted_eu')
+    return tenders
+
+
+def stale_page_data(source: str, filters: dict, retry_after: float):
+    """Over the upstream quota: answer from whatever the store holds, however old"""
+    if source == 'awards':
+        if len(tender_store.awards):
+            return tender_store.query_awards(filters)
+    elif len(tender_store):
+        return tender_store.query(filters)
+    raise QuotaExceeded('ted_eu', retry_after)
+
+
+def query_store(source: str, filters: dict):
+    """
+    Tenders (or awards joined to tenders) from the store; None until the
+    scheduler has loaded it, or when the stored rows may not be the whole
+    answer (fewer than `limit` matches from an incomplete refresh)
+
+    Queries without a limit (aggregates such as /api/stats) always use the
+    loaded store: upstream would only return one page of it, so the store
+    is the better answer even when partial.
+    """
+    if source == 'awards':
+        store = tender_store.awards
+        rows = tender_store.query_awards(filters) if store.loaded else None
+    else:
+        store = tender_store
+        rows = tender_store.query(filters) if store.loaded else None
+    if rows is None:
+        return None
+    return rows if not filters.get('limit') or store.answers(filters, rows) else None
+
+
+def fetch_page_data(source: str, filters: dict):
+    """
+    Tenders (or awards) for a query, answered from the tender store once the
+    scheduler has loaded it; before that, a coalesced upstream fetch
+    """
+    stored = query_store(source, filters)
+    if stored is not None:
+        return stored
+    return upstream_flight.run_sync((source,) + filters_key(filters), fetch_upstream, source, filters)
+
+
+async def load_page_data(source: str, filters: dict):
+    """Async `fetch_page_data`: upstream calls run in a thread, shared by identical requests"""
+    await services()
+    stored = query_store(source, filters)
+    if stored is not None:
+        return stored
+    return await upstream_flight.run((source,) + filters_key(filters), fetch_upstream, source, filters)
+
+
+async def load_tenders(filters: dict):
+    return await load_page_data('tenders', filters)
+
+
+def load_trends(filters: dict, tenders):
+    """Period-over-period trends: the store's daily rollup once loaded, else the fetched tenders"""
+    if tender_store.loaded:
+        return tender_store.trends(filters)
+    from storage.rollups import period_trends
+    return period_trends(tenders)
+
+
+def warm_dashboards():
+    """Rebuild the fixed dashboard snapshots (one worker at a time)"""
+    if not snapshots_enabled:
+        return
+    with FileLock(source_cache.directory / 'locks' / 'snapshots.lock') as locked:
+        if locked:
+            from dashboards.snapshots import build_snapshots
+            build_snapshots(fetch=fetch_page_data)
+
+
+def make_refresh_job(source: str, connector, max_age_hours: float):
+    """Scheduler job: refresh one source, then re-warm dashboards on change"""
+    from storage.refresh import refresh_source
+    
+    def job():
+        loaded = sum(
+            refresh_source(
+                source, connector, tender_store, source_cache, max_age_hours,
+                filters={'limit': int(get_setting('scheduler.refresh_rows', 20000))}, kind=kind,
+                budget=lambda: upstream_budget.take(source),
+                window_days=int(get_setting('scheduler.refresh_days', 90)) or None
+            )
+            for kind in ('tenders', 'awards')
+        )
+        if loaded:
+            warm_dashboards()
+    return job
+
+
+# Background scheduler; refresh jobs are added by start_services
+scheduler = Scheduler()
+scheduler_enabled = os.getenv('SCHEDULER_ENABLED', str(get_setting('scheduler.enabled', True))).lower() == 'true'
+poll_seconds = float(get_setting('scheduler.poll_seconds', 300))
+
+# Startup warmup: once the store is loaded, the top dashboard queries are
+# requested in-process so the build pool, store indexes and snapshots are
+# primed before /readyz lets traffic in
+warmup_enabled = os.getenv('WARMUP_ENABLED', str(get_setting('warmup.enabled', True))).lower() == 'true'
+warmup_paths = list(get_setting('warmup.paths', None) or ['/dashboard/insights', '/api/stats'])
+warmup_state = {'status': 'pending' if warmup_enabled else 'disabled', 'seconds': None, 'failed': []}
+started_at = time.time()
+
+
+async def warmup():
+    """Wait for the first store load, then request the warmup paths concurrently"""
+    started = time.perf_counter()
+    if scheduler_enabled:
+        timeout = float(get_setting('warmup.timeout_seconds', 300))
+        while not tender_store.loaded and time.perf_counter() - started < timeout:
+            await asyncio.sleep(0.5)
+    
+    import httpx
+    failed = []
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://warmup', timeout=None) as client:
+            responses = await asyncio.gather(*(client.get(path) for path in warmup_paths), return_exceptions=True)
+        for path, response in zip(warmup_paths, responses):
+            if isinstance(response, Exception) or response.status_code >= 500:
+                failed.append(path)
+    except Exception as e:
+        print(f"Warmup Error: {e}")
+        failed = warmup_paths
+    
+    seconds = time.perf_counter() - started
+    # A failed warmup only costs cold requests: readiness does not wait on it
+    warmup_state.update(status='failed' if failed else 'done', seconds=round(seconds, 2), failed=failed)
+    print(f"Warmup {warmup_state['status']} in {seconds:.2f}s ({len(warmup_paths)} queries)")
+
+
+def source_freshness() -> dict:
+    """Snapshot age per scheduled source against its `cache_hours` (plus one poll interval)"""
+    freshness = {}
+    for source, settings in (get_setting('sources') or {}).items():
+        if not (settings.get('enabled') and source in connectors):
+            continue
+        # A snapshot is refreshed after `cache_hours` and picked up by the next poll
+        max_age = float(settings.get('cache_hours', 6)) * 3600 + poll_seconds
+        age_hours = source_cache.age_hours(source)
+        age = age_hours * 3600 if age_hours is not None else None
+        freshness[source] = {
+            'age_seconds': round(age, 1) if age is not None else None,
+            'max_age_seconds': max_age,
+            'fresh': age is not None and age <= max_age
+        }
+    return freshness
+
+
+def readiness() -> dict:
+    """
+    Checks behind /readyz: services created, tender store loaded, warmup
+    finished and every scheduled source fresh. Without the scheduler nothing
+    is stored, so only services and warmup count.
+    """
+    checks = {'services': services_started, 'warmup': warmup_state['status'] != 'pending'}
+    if scheduler_enabled:
+        checks['store'] = services_started and tender_store.loaded
+        sources = source_freshness() if services_started else {}
+        checks['sources'] = services_started and all(source['fresh'] for source in sources.values())
+    else:
+        sources = {}
+    return {
+        'ready': all(checks.values()),
+        'checks': checks,
+        'warmup': warmup_state,
+        'sources': sources,
+        'tenders': len(tender_store) if tender_store is not None else 0
+    }
+
+
+def collect_metrics():
+    """Scrape-time cache, coalescing and store metrics for /metrics"""
+    token_counts = {'hits': 0, 'misses': 0}
+    for counts in token_cache.stats()['routes'].values():
+        token_counts['hits'] += counts.get('hits', 0)
+        token_counts['misses'] += counts.get('misses', 0)
+    caches = {'token': token_counts, 'snapshot': snapshot_requests}
+    flights = {'upstream': upstream_flight, 'offload': offloader.flight}
+    
+    def ratio(counts):
+        total = counts['hits'] + counts['misses']
+        return counts['hits'] / total if total else 0.0
+    
+    return [
+        ('procurement_cache_requests_total', 'counter', 'Cache lookups by result',
+         [({'cache': name, 'result': result}, counts[field])
+          for name, counts in caches.items() for result, field in (('hit', 'hits'), ('miss', 'misses'))]),
+        ('procurement_cache_hit_ratio', 'gauge', 'Cache hits / lookups since start',
+         [({'cache': name}, ratio(counts)) for name, counts in caches.items()]),
+        ('procurement_singleflight_calls_total', 'counter', 'Calls through a single-flight group',
+         [({'group': name}, flight.calls) for name, flight in flights.items()]),
+        ('procurement_singleflight_coalesced_total', 'counter', 'Calls that joined an in-flight execution',
+         [({'group': name}, flight.coalesced) for name, flight in flights.items()]),
+        ('procurement_inflight', 'gauge', 'Distinct executions in flight per single-flight group',
+         [({'group': name}, flight.inflight) for name, flight in flights.items()]),
+        ('procurement_offload_fallbacks_total', 'counter', 'Builds rerun in a thread after a pool failure',
+         [({}, offloader.stats['fallbacks'])]),
+        ('procurement_store_tenders', 'gauge', 'Tenders held in the tender store',
+         [({}, len(tender_store) if tender_store is not None else 0)]),
+        ('procurement_ratelimit_requests_total', 'counter', 'Rate-limited route requests by result',
+         [({'result': result}, count) for result, count in rate_limiter.stats.items()]),
+        ('procurement_upstream_budget_total', 'counter', 'Upstream calls allowed or deferred by the quota budget',
+         [({'source': source, 'result': result}, count)
+          for source, counts in upstream_budget.stats.items() for result, count in counts.items()])
+    ]
+
+
+if metrics.ENABLED:
+    metrics.register_collector(collect_metrics)
+    
+    @app.middleware('http')
+    async def time_requests(request: Request, call_next):
+        """Request latency by route template (not raw path, to bound cardinality)"""
+        started = time.perf_counter()
+        response = await call_next(request)
+        route = request.scope.get('route')
+        metrics.REQUEST_SECONDS.observe(
+            time.perf_counter() - started, request.method, getattr(route, 'path', 'unmatched')
+        )
+        return response
+
+
+@app.exception_handler(AuthError)
+async def auth_error_handler(request: Request, exc: AuthError):
+    """Keep the favorites API's {'success': False} error shape"""
+    if request.url.path.startswith('/api/'):
+        body = {'success': False, 'error': exc.detail}
+    else:
+        body = {'detail': exc.detail}
+    return JSONResponse(body, status_code=exc.status_code, headers=exc.headers)
+
+
+@app.exception_handler(QuotaExceeded)
+async def quota_error_handler(request: Request, exc: QuotaExceeded):
+    """Upstream budget spent and nothing cached to answer with"""
+    retry_after = str(math.ceil(exc.retry_after))
+    return JSONResponse({'error': str(exc), 'retry_after': int(retry_after)},
+                        status_code=503, headers={'Retry-After': retry_after})
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -124,17 +539,104 @@ async def search_tenders(
         filters['min_value'] = min_value
     if max_value:
         filters['max_value'] = max_value
-    filters['limit'] = min(limit, 1000)
+    filters['limit'] = clamp_limit(limit)
+    
+    tenders = await load_tenders(filters)
+    
+    with metrics.STAGE_SECONDS.time('api_search', 'serialize'):
+        return JSONResponse({
+            'total': len(tenders),
+            'filters': filters,
+            'tenders': tenders.to_dict('records')
+        })
+
+
+@app.get("/api/awards")
+async def search_awards(
+    country: str = Query(None, description="ISO 2-letter country code of the buyer"),
+    cpv_code: str = Query(None, description="CPV category code"),
+    min_value: int = Query(None, description="Minimum awarded value in EUR"),
+    max_value: int = Query(None, description="Maximum awarded value in EUR"),
+    limit: int = Query(100, description="Number of results (max 1000)")
+):
+    """Contract awards joined to their tenders, with award KPIs"""
+    
+    filters = {'limit': clamp_limit(limit)}
+    for name, value in (('country', country), ('cpv_code', cpv_code), ('min_value', min_value), ('max_value', max_value)):
+        if value:
+            filters[name] = value
+    
+    awards = await load_page_data('awards', filters)
+    from storage.awards import award_summary
+    
+    return JSONResponse({
+        'total': len(awards),
+        'filters': filters,
+        'summary': award_summary(awards),
+        # tenders not in the store leave joined columns empty: NaN -> null
+        'awards': awards.astype(object).where(awards.notna(), None).to_dict('records')
+    })
+
+
+@app.get("/api/closing-soon")
+async def closing_soon_tenders(
+    days: int = Query(7, description="Deadline window in days from today"),
+    country: str = Query(None, description="ISO 2-letter country code"),
+    cpv_code: str = Query(None, description="CPV category code prefix"),
+    limit: int = Query(100, description="Number of results (max 1000)")
+):
+    """Tenders closing within the next `days` days, earliest deadline first"""
+    
+    days = max(0, min(days, 365))
+    filters = {'limit': clamp_limit(limit)}
+    if country:
+        filters['country'] = country
+    if cpv_code:
+        filters['cpv_code'] = cpv_code
     
-    tenders = ted_connector.search_tenders(filters)
+    await services()
+    from storage.tender_store import closing_soon
+    tenders = tender_store.closing_soon(days, filters) if tender_store.loaded else None
+    if tenders is None or not tender_store.answers(filters, tenders):
+        today = datetime.now().date()
+        window = {
+            **filters,
+            'deadline_from': today.isoformat(),
+            'deadline_to': (today + timedelta(days=days)).isoformat()
+        }
+        tenders = closing_soon(await load_tenders(window), days, filters)
     
     return JSONResponse({
         'total': len(tenders),
+        'days': days,
         'filters': filters,
         'tenders': tenders.to_dict('records')
     })
 
 
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the process is serving (no data checks)"""
+    return JSONResponse({'status': 'ok', 'uptime_seconds': round(time.time() - started_at, 1)})
+
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: 200 once data is loaded, warmed and fresh, 503 until then"""
+    state = readiness()
+    return JSONResponse(
+        state, status_code=200 if state['ready'] else 503, headers={'Cache-Control': 'no-store'}
+    )
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus metrics (latency histograms, cache hit ratios, in-flight counts)"""
+    if not metrics.ENABLED:
+        return PlainTextResponse('metrics disabled\n', status_code=404)
+    return PlainTextResponse(metrics.render(), media_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 @app.get("/api/stats")
 async def get_statistics(
     country: str = Query(None),
@@ -148,569 +650,210 @@ async def get_statistics(
     if cpv_code:
         filters['cpv_code'] = cpv_code
     
-    stats = ted_connector.get_statistics(filters)
+    tenders = await load_tenders(filters)
+    stats = await offloader.run(tasks.statistics, tenders, key=filters_key(filters))
+    if stats:
+        # Partial: computed over an incomplete store (or one upstream page before it loads)
+        stats = {**stats, 'trends': load_trends(filters, tenders), 'partial': not tender_store.complete}
     
     return JSONResponse(stats)
 
 
+def render_dashboard(request: Request, page: str, dashboard: dict) -> HTMLResponse:
+    """Render a dashboard page through the shared layout template"""
+    return templates.TemplateResponse(
+        request,
+        'dashboard.html',
+        {**DASHBOARD_PAGES[page], 'dashboard': dashboard}
+    )
+
+
+def serve_snapshot(request: Request, page: str):
+    """Pre-rendered snapshot response for a fixed page, or None if missing/stale"""
+    if not snapshots_enabled:
+        return None
+    
+    path = find_snapshot(page)
+    if path is None:
+        snapshot_requests['misses'] += 1
+        return None
+    
+    snapshot_requests['hits'] += 1
+    headers = {'Cache-Control': 'public, max-age=300', 'Vary': 'Accept-Encoding'}
+    gz_path = path.with_name(path.name + '.gz')
+    if 'gzip' in request.headers.get('accept-encoding', '') and gz_path.exists():
+        headers['Content-Encoding'] = 'gzip'
+        return FileResponse(gz_path, media_type='text/html', headers=headers)
+    
+    return FileResponse(path, media_type='text/html', headers=headers)
+
+
+async def live_dashboard(request: Request, page: str) -> HTMLResponse:
+    """Build a fixed page from live data"""
+    spec = DASHBOARD_PAGES[page]
+    tenders = await load_page_data(spec['source'], spec['filters'])
+    build = getattr(tasks, spec.get('builder', 'tender_overview'))
+    dashboard = await offloader.run(build, tenders, key=('page', page))
+    
+    return render_dashboard(request, page, dashboard)
+
+
 @app.get("/dashboard/tenders", response_class=HTMLResponse)
 async def tender_dashboard(
+    request: Request,
     country: str = Query(None),
     cpv_code: str = Query(None),
     limit: int = Query(100)
 ):
     """Tender overview dashboard"""
     
-    filters = {'limit': limit}
+    filters = {'limit': clamp_limit(limit)}
     if country:
         filters['country'] = country
     if cpv_code:
         filters['cpv_code'] = cpv_code
     
-    tenders = ted_connector.search_tenders(filters)
-    dashboard = dashboard_gen.create_tender_overview(tenders)
+    if filters == DASHBOARD_PAGES['tenders']['filters']:
+        snapshot = serve_snapshot(request, 'tenders')
+        if snapshot:
+            return snapshot
     
-    html = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Tender Overview Dashboard</title>
-        <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
-        <style>
-            body {{
-                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Arial, sans-serif;
-                margin: 0;
-                padding: 20px;
-                background: #f5f5f5;
-            }}
-            .header {{
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-                padding: 30px;
-                border-radius: 10px;
-                margin-bottom: 30px;
-            }}
-            .kpi-grid {{
-                display: grid;
-                grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-                gap: 20px;
-                margin-bottom: 30px;
-            }}
-            .kpi-card {{
-                background: white;
-                padding: 20px;
-                border-radius: 10px;
-                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            }}
-            .kpi-value {{
-                font-size: 2em;
-                font-weight: bold;
-                color: #667eea;
-            }}
-            .kpi-label {{
-                color: #666;
-                margin-top: 5px;
-            }}
-            .chart {{
-                background: white;
-                padding: 20px;
-                border-radius: 10px;
-                margin-bottom: 20px;
-                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="header">
-            <h1>📊 Tender Overview Dashboard</h1>
-            <p>EU Procurement Intelligence</p>
-            <a href="/" style="color: white;">← Back to Home</a>
-        </div>
-        
-        <div class="kpi-grid">
-            <div class="kpi-card">
-                <div class="kpi-value">{dashboard['kpis']['total_tenders']}</div>
-                <div class="kpi-label">Total Tenders</div>
-            </div>
-            <div class="kpi-card">
-                <div class="kpi-value">{dashboard['kpis']['total_value']}</div>
-                <div class="kpi-label">Total Value</div>
-            </div>
-            <div class="kpi-card">
-                <div class="kpi-value">{dashboard['kpis']['average_value']}</div>
-                <div class="kpi-label">Average Value</div>
-            </div>
-        </div>
-        
-        <div class="chart">
-            {dashboard['charts']['timeline']}
-        </div>
-        
-        <div class="chart">
-            {dashboard['charts']['geography']}
-        </div>
-        
-        <div class="chart">
-            {dashboard['charts']['value_dist']}
-        </div>
-        
-        <div class="chart">
-            {dashboard['charts']['categories']}
-        </div>
-    </body>
-    </html>
-    """
+    tenders = await load_tenders(filters)
+    dashboard = await offloader.run(tasks.tender_overview, tenders, key=filters_key(filters))
     
-    return html
+    return render_dashboard(request, 'tenders', dashboard)
 
 
 @app.get("/dashboard/it-tenders", response_class=HTMLResponse)
-async def it_dashboard():
+async def it_dashboard(request: Request):
     """IT-specific tender dashboard"""
-    
-    tenders = ted_connector.search_tenders({'cpv_code': '48', 'limit': 100})
-    dashboard = dashboard_gen.create_tender_overview(tenders)
-    
-    html = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>IT Tenders Dashboard</title>
-        <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
-        <style>
-            body {{
-                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Arial, sans-serif;
-                margin: 0;
-                padding: 20px;
-                background: #f5f5f5;
-            }}
-            .header {{
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-                padding: 30px;
-                border-radius: 10px;
-                margin-bottom: 30px;
-            }}
-            .kpi-grid {{
-                display: grid;
-                grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-                gap: 20px;
-                margin-bottom: 30px;
-            }}
-            .kpi-card {{
-                background: white;
-                padding: 20px;
-                border-radius: 10px;
-                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            }}
-            .kpi-value {{
-                font-size: 2em;
-                font-weight: bold;
-                color: #667eea;
-            }}
-            .kpi-label {{
-                color: #666;
-                margin-top: 5px;
-            }}
-            .chart {{
-                background: white;
-                padding: 20px;
-                border-radius: 10px;
-                margin-bottom: 20px;
-                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="header">
-            <h1>💻 IT Tenders Dashboard</h1>
-            <p>Software, Cloud Computing & IT Services</p>
-            <a href="/" style="color: white;">← Back to Home</a>
-        </div>
-        
-        <div class="kpi-grid">
-            <div class="kpi-card">
-                <div class="kpi-value">{dashboard['kpis']['total_tenders']}</div>
-                <div class="kpi-label">IT Tenders</div>
-            </div>
-            <div class="kpi-card">
-                <div class="kpi-value">{dashboard['kpis']['total_value']}</div>
-                <div class="kpi-label">Total IT Spend</div>
-            </div>
-            <div class="kpi-card">
-                <div class="kpi-value">{dashboard['kpis']['average_value']}</div>
-                <div class="kpi-label">Average Contract</div>
-            </div>
-        </div>
-        
-        <div class="chart">
-            {dashboard['charts']['timeline']}
-        </div>
-        
-        <div class="chart">
-            {dashboard['charts']['geography']}
-        </div>
-        
-        <div class="chart">
-            {dashboard['charts']['categories']}
-        </div>
-    </body>
-    </html>
-    """
-    
-    return html
+    return serve_snapshot(request, 'it-tenders') or await live_dashboard(request, 'it-tenders')
 
 
 @app.get("/dashboard/countries", response_class=HTMLResponse)
-async def countries_dashboard():
+async def countries_dashboard(request: Request):
     """Geographic analysis dashboard"""
-    tenders = ted_connector.search_tenders({'limit': 100})
-    dashboard = dashboard_gen.create_tender_overview(tenders)
-    
-    html = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Geographic Analysis Dashboard</title>
-        <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
-        <style>
-            body {{
-                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Arial, sans-serif;
-                margin: 0;
-                padding: 20px;
-                background: #f5f5f5;
-            }}
-            .header {{
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-                padding: 30px;
-                border-radius: 10px;
-                margin-bottom: 30px;
-            }}
-            .kpi-grid {{
-                display: grid;
-                grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-                gap: 20px;
-                margin-bottom: 30px;
-            }}
-            .kpi-card {{
-                background: white;
-                padding: 20px;
-                border-radius: 10px;
-                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            }}
-            .kpi-value {{
-                font-size: 2em;
-                font-weight: bold;
-                color: #667eea;
-            }}
-            .kpi-label {{
-                color: #666;
-                margin-top: 5px;
-            }}
-            .chart {{
-                background: white;
-                padding: 20px;
-                border-radius: 10px;
-                margin-bottom: 20px;
-                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="header">
-            <h1>🌍 Geographic Analysis Dashboard</h1>
-            <p>Country & Regional Procurement Trends</p>
-            <a href="/" style="color: white;">← Back to Home</a>
-        </div>
-        
-        <div class="kpi-grid">
-            <div class="kpi-card">
-                <div class="kpi-value">{dashboard['kpis']['total_tenders']}</div>
-                <div class="kpi-label">Total Tenders</div>
-            </div>
-            <div class="kpi-card">
-                <div class="kpi-value">{dashboard['kpis']['total_value']}</div>
-                <div class="kpi-label">Total Value</div>
-            </div>
-            <div class="kpi-card">
-                <div class="kpi-value">{dashboard['kpis']['average_value']}</div>
-                <div class="kpi-label">Average Value</div>
-            </div>
-        </div>
-        
-        <div class="chart">
-            {dashboard['charts']['geography']}
-        </div>
-        
-        <div class="chart">
-            {dashboard['charts']['categories']}
-        </div>
-    </body>
-    </html>
-    """
-    return html
+    return serve_snapshot(request, 'countries') or await live_dashboard(request, 'countries')
 
 
 @app.get("/dashboard/value-analysis", response_class=HTMLResponse)
-async def value_dashboard():
+async def value_dashboard(request: Request):
     """Value analysis dashboard"""
-    tenders = ted_connector.search_tenders({'limit': 100})
-    dashboard = dashboard_gen.create_tender_overview(tenders)
-    
-    html = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Value Analysis Dashboard</title>
-        <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
-        <style>
-            body {{
-                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Arial, sans-serif;
-                margin: 0;
-                padding: 20px;
-                background: #f5f5f5;
-            }}
-            .header {{
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-                padding: 30px;
-                border-radius: 10px;
-                margin-bottom: 30px;
-            }}
-            .kpi-grid {{
-                display: grid;
-                grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-                gap: 20px;
-                margin-bottom: 30px;
-            }}
-            .kpi-card {{
-                background: white;
-                padding: 20px;
-                border-radius: 10px;
-                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            }}
-            .kpi-value {{
-                font-size: 2em;
-                font-weight: bold;
-                color: #667eea;
-            }}
-            .kpi-label {{
-                color: #666;
-                margin-top: 5px;
-            }}
-            .chart {{
-                background: white;
-                padding: 20px;
-                border-radius: 10px;
-                margin-bottom: 20px;
-                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="header">
-            <h1>💰 Value Analysis Dashboard</h1>
-            <p>Contract Value Trends & Distribution</p>
-            <a href="/" style="color: white;">← Back to Home</a>
-        </div>
-        
-        <div class="kpi-grid">
-            <div class="kpi-card">
-                <div class="kpi-value">{dashboard['kpis']['total_tenders']}</div>
-                <div class="kpi-label">Total Tenders</div>
-            </div>
-            <div class="kpi-card">
-                <div class="kpi-value">{dashboard['kpis']['total_value']}</div>
-                <div class="kpi-label">Total Value</div>
-            </div>
-            <div class="kpi-card">
-                <div class="kpi-value">{dashboard['kpis']['average_value']}</div>
-                <div class="kpi-label">Average Value</div>
-            </div>
-        </div>
-        
-        <div class="chart">
-            {dashboard['charts']['value_dist']}
-        </div>
-        
-        <div class="chart">
-            {dashboard['charts']['timeline']}
-        </div>
-    </body>
-    </html>
-    """
-    return html
+    return serve_snapshot(request, 'value-analysis') or await live_dashboard(request, 'value-analysis')
 
 
 @app.get("/dashboard/awards", response_class=HTMLResponse)
-async def awards_dashboard():
+async def awards_dashboard(request: Request):
     """Award analytics dashboard"""
-    tenders = ted_connector.search_awards({'limit': 100})
-    dashboard = dashboard_gen.create_tender_overview(tenders)
+    return serve_snapshot(request, 'awards') or await live_dashboard(request, 'awards')
+
+
+@app.get("/dashboard/insights", response_class=HTMLResponse)
+async def insights_dashboard(
+    country: str = Query(None),
+    cpv_code: str = Query(None),
+    tab: str = Query('overview'),
+    limit: int = Query(100)
+):
+    """Power BI style tabbed dashboard; inactive tabs load on first open"""
     
-    html = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Award Analytics Dashboard</title>
-        <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
-        <style>
-            body {{
-                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Arial, sans-serif;
-                margin: 0;
-                padding: 20px;
-                background: #f5f5f5;
-            }}
-            .header {{
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-                padding: 30px;
-                border-radius: 10px;
-                margin-bottom: 30px;
-            }}
-            .kpi-grid {{
-                display: grid;
-                grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-                gap: 20px;
-                margin-bottom: 30px;
-            }}
-            .kpi-card {{
-                background: white;
-                padding: 20px;
-                border-radius: 10px;
-                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            }}
-            .kpi-value {{
-                font-size: 2em;
-                font-weight: bold;
-                color: #667eea;
-            }}
-            .kpi-label {{
-                color: #666;
-                margin-top: 5px;
-            }}
-            .chart {{
-                background: white;
-                padding: 20px;
-                border-radius: 10px;
-                margin-bottom: 20px;
-                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="header">
-            <h1>🏆 Award Analytics Dashboard</h1>
-            <p>Contract Award Analysis & Winners</p>
-            <a href="/" style="color: white;">← Back to Home</a>
-        </div>
-        
-        <div class="kpi-grid">
-            <div class="kpi-card">
-                <div class="kpi-value">{dashboard['kpis']['total_tenders']}</div>
-                <div class="kpi-label">Total Awards</div>
-            </div>
-            <div class="kpi-card">
-                <div class="kpi-value">{dashboard['kpis']['total_value']}</div>
-                <div class="kpi-label">Total Value</div>
-            </div>
-            <div class="kpi-card">
-                <div class="kpi-value">{dashboard['kpis']['average_value']}</div>
-                <div class="kpi-label">Average Award</div>
-            </div>
-        </div>
-        
-        <div class="chart">
-            {dashboard['charts']['timeline']}
-        </div>
-        
-        <div class="chart">
-            {dashboard['charts']['categories']}
-        </div>
-    </body>
-    </html>
-    """
-    return html
+    filters = {'limit': clamp_limit(limit)}
+    if country:
+        filters['country'] = country
+    if cpv_code:
+        filters['cpv_code'] = cpv_code
+    
+    tenders = await load_tenders(filters)
+    html = await offloader.run(
+        tasks.tab_dashboard, tenders, 'Procurement Insights', tab, '/api/dashboard/insights',
+        load_trends(filters, tenders), key=(tab,) + filters_key(filters)
+    )
+    
+    return HTMLResponse(content=html)
+
+
+@app.get("/api/dashboard/insights/{tab}")
+async def insights_tab(
+    tab: str,
+    country: str = Query(None),
+    cpv_code: str = Query(None),
+    limit: int = Query(100)
+):
+    """Figure data for a single tab of the insights dashboard"""
+    
+    if tab not in {t['name'] for t in INSIGHTS_TABS}:
+        return JSONResponse({'error': f'Unknown tab: {tab}'}, status_code=404)
+    
+    filters = {'limit': clamp_limit(limit)}
+    if country:
+        filters['country'] = country
+    if cpv_code:
+        filters['cpv_code'] = cpv_code
+    
+    tenders = await load_tenders(filters)
+    
+    content = await offloader.run(tasks.tab_json, tab, tenders, key=(tab,) + filters_key(filters))
+    
+    return Response(content=content, media_type='application/json')
+
+
+@app.get("/api/stream/tenders")
+async def stream_tenders(
+    request: Request,
+    country: str = Query(None, description="Only push tenders for this ISO country code"),
+    cpv_code: str = Query(None, description="Only push tenders whose CPV code starts with this prefix")
+):
+    """Server-Sent Events feed of newly ingested tenders"""
+    
+    await services()
+    subscription = broadcaster.subscribe(country=country, cpv_code=cpv_code)
+    
+    async def events():
+        try:
+            yield 'retry: 5000\n\n'
+            yield format_event({'subscribers': broadcaster.subscriber_count}, event='ready')
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscription.queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ': keep-alive\n\n'
+        finally:
+            broadcaster.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        events(),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
 
 @app.get("/user/dashboard", response_class=HTMLResponse)
-async def user_personal_dashboard(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def user_personal_dashboard(email: str = Depends(require_user)):
     """User's personal dashboard with favorites"""
-    try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email = payload.get('email')
-        
-        if not email:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        
-        return HTMLResponse(content=UserDashboard.get_user_dashboard_html(email))
-    
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.JWTError:
-        raise HTTPException(status_code=401, detail="Invalid token")
+    return HTMLResponse(content=UserDashboard.get_user_dashboard_html(email))
 
 
 @app.post("/api/favorites")
-async def add_to_favorites(
-    tender_data: dict,
-    credentials: HTTPAuthorizationCredentials = Depends(security)
-):
+async def add_to_favorites(tender_data: dict, email: str = Depends(require_user)):
     """Add tender to user favorites"""
-    try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email = payload.get('email')
-        
-        if not email:
-            return JSONResponse({'success': False, 'error': 'Invalid token'}, status_code=401)
-        
-        success = add_favorite(email, tender_data)
-        return JSONResponse({'success': success})
-    
-    except jwt.JWTError:
-        return JSONResponse({'success': False, 'error': 'Invalid token'}, status_code=401)
+    success = add_favorite(email, tender_data)
+    return JSONResponse({'success': success})
 
 
 @app.delete("/api/favorites/{tender_id}")
-async def remove_from_favorites(
-    tender_id: str,
-    credentials: HTTPAuthorizationCredentials = Depends(security)
-):
+async def remove_from_favorites(tender_id: str, email: str = Depends(require_user)):
     """Remove tender from favorites"""
-    try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email = payload.get('email')
-        
-        if not email:
-            return JSONResponse({'success': False, 'error': 'Invalid token'}, status_code=401)
-        
-        success = remove_favorite(email, tender_id)
-        return JSONResponse({'success': success})
-    
-    except jwt.JWTError:
-        return JSONResponse({'success': False, 'error': 'Invalid token'}, status_code=401)
+    success = remove_favorite(email, tender_id)
+    return JSONResponse({'success': success})
 
 
 @app.get("/api/favorites")
-async def get_user_favorites(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def get_user_favorites(email: str = Depends(require_user)):
     """Get user's favorites"""
-    try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email = payload.get('email')
-        
-        if not email:
-            return JSONResponse({'success': False, 'error': 'Invalid token'}, status_code=401)
-        
-        favorites = get_favorites(email)
-        return JSONResponse({'success': True, 'favorites': favorites})
-    
-    except jwt.JWTError:
-        return JSONResponse({'success': False, 'error': 'Invalid token'}, status_code=401)
+    favorites = get_favorites(email)
+    return JSONResponse({'success': True, 'favorites': favorites})
 
 
 if __name__ == '__main__':
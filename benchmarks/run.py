@@ -0,0 +1,301 @@
+"""
+Benchmark runner
+
+Times search filtering, statistics, dashboard builds, JSON serialization
+and end-to-end route latency (in-process ASGI client, no network) over
+seeded synthetic corpora (connectors.synthetic), then appends the results to
+benchmarks/results/<machine>.jsonl and compares them with the previous run
+on the same machine.
+
+Usage:
+    python -m benchmarks.run                          # 1k, 100k and 1M tenders
+    python -m benchmarks.run --sizes 1k,100k --repeat 10
+    python -m benchmarks.run --only route --no-save
+    python -m benchmarks.run --cache-dir data         # reuse Parquet corpora between runs
+    python -m benchmarks.run --fail-on-regression     # exit 1 if >25% slower
+    python -m benchmarks.run --only startup           # cold import / first response of the app
+    python -m benchmarks.run --profile-imports        # slowest modules imported by `import app`
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+# Measure request cost in-process: no background refresh, builds run inline,
+# and no per-client rate limit (every request comes from the same client)
+os.environ.setdefault('SCHEDULER_ENABLED', 'false')
+os.environ.setdefault('OFFLOAD_MODE', 'inline')
+os.environ.setdefault('RATELIMIT_ENABLED', 'false')
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from connectors.synthetic import load_corpus
+
+SIZES = {'1k': 1_000, '100k': 100_000, '1M': 1_000_000}
+
+RESULTS_DIR = Path(__file__).parent / 'results'
+REGRESSION_THRESHOLD = 1.25
+
+# Routes timed end to end; the store is preloaded with the corpus
+ROUTES = [
+    '/api/search?limit=1000',
+    '/api/search?country=DE&cpv_code=48&min_value=1000000&limit=100',
+    '/api/stats',
+    '/dashboard/tenders?limit=1000',
+    '/dashboard/insights?limit=1000',
+    '/api/dashboard/insights/timeline?limit=1000',
+]
+
+
+def function_benchmarks(corpus) -> Dict[str, Callable]:
+    """Library-level benchmarks over one corpus"""
+    from fastapi.responses import JSONResponse
+    from dashboards import tasks
+    from dashboards.generator import DashboardGenerator
+    from dashboards.powerbi_layout import PowerBIDashboard
+    from storage.tender_store import TenderStore
+
+    store = TenderStore()
+    store.ingest(corpus, source='benchmark')
+    generator = DashboardGenerator()
+    powerbi = PowerBIDashboard()
+    page = corpus.head(1000)
+
+    return {
+        'search.filter': lambda: store.query({'country': 'DE', 'cpv_code': '48', 'min_value': 1_000_000, 'limit': 1000}),
+        'search.filter_unbounded': lambda: store.query({'cpv_code': '72'}),
+        'stats.get_statistics': lambda: tasks.statistics(corpus),
+        'dashboard.tender_overview': lambda: generator.create_tender_overview(corpus),
+        'dashboard.tab_json': lambda: powerbi.tab_json('overview', corpus),
+        'serialize.search_json': lambda: JSONResponse({'total': len(page), 'tenders': page.to_dict('records')}).body,
+    }
+
+
+def route_benchmarks(corpus) -> Dict[str, Callable]:
+    """End-to-end route benchmarks through the ASGI app"""
+    import httpx
+    import app as application
+    from storage.tender_store import TenderStore
+
+    application.snapshots_enabled = False
+    application.tender_store = TenderStore()
+    application.tender_store.ingest(corpus, source='benchmark')
+    # The corpus is all the data there is: every query is answered from the store
+    application.tender_store.mark_loaded('benchmark', complete=True)
+
+    loop = asyncio.new_event_loop()
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=application.app), base_url='http://bench')
+
+    def request(path):
+        def call():
+            response = loop.run_until_complete(client.get(path))
+            if response.status_code != 200:
+                raise RuntimeError(f"{path} returned {response.status_code}")
+        return call
+
+    return {f'route.{path}': request(path) for path in ROUTES}
+
+
+# Route polled by the first-response benchmark (any answer counts as serving)
+STARTUP_ROUTE = '/healthz'
+STARTUP_TIMEOUT = 60
+ROOT_DIR = Path(__file__).parent.parent
+
+
+def _startup_env() -> Dict[str, str]:
+    return {**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'}
+
+
+def time_import() -> float:
+    """Seconds to `import app` in a fresh interpreter (interpreter start excluded)"""
+    code = 'import time; t = time.perf_counter(); import app; print(time.perf_counter() - t)'
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                            cwd=ROOT_DIR, env=_startup_env(), timeout=STARTUP_TIMEOUT, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def time_first_response() -> float:
+    """Seconds from launching uvicorn until it answers STARTUP_ROUTE"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'app:app', '--port', str(port), '--log-level', 'warning'],
+        cwd=ROOT_DIR, env=_startup_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < STARTUP_TIMEOUT:
+            try:
+                urlopen(f'http://127.0.0.1:{port}{STARTUP_ROUTE}', timeout=1).close()
+                return time.perf_counter() - started
+            except HTTPError:
+                return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError(f"server did not answer within {STARTUP_TIMEOUT}s")
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def startup_benchmarks() -> Dict[str, Callable]:
+    """Cold-start benchmarks, each in a new process (independent of corpus size)"""
+    return {
+        'startup.import_app': time_import,
+        'startup.first_response': time_first_response,
+    }
+
+
+def profile_imports(top: int = 25):
+    """Print the modules with the largest cumulative import time under `import app`"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'], capture_output=True,
+                            text=True, cwd=ROOT_DIR, env=_startup_env(), timeout=STARTUP_TIMEOUT)
+    rows = []
+    for line in result.stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]), int(parts[0].split(':')[1]), parts[2].rstrip()))
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative, own, module in sorted(rows, reverse=True)[:top]:
+        print(f"{cumulative / 1000:14.1f} {own / 1000:9.1f}  {module}")
+
+
+def measure(func: Callable, repeat: int, budget: float) -> List[float]:
+    """Wall times of `repeat` calls after one warm-up (fewer if over budget)"""
+    func()
+    times = []
+    deadline = time.perf_counter() + budget
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+        if time.perf_counter() > deadline:
+            break
+    return times
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+            cwd=Path(__file__).parent, timeout=10
+        ).stdout.strip()
+    except Exception:
+        return ''
+
+
+def load_previous(path: Path) -> Dict:
+    """Latest recorded median per (benchmark, size) from earlier runs"""
+    previous = {}
+    if path.exists():
+        for line in path.read_text().splitlines():
+            if line.strip():
+                record = json.loads(line)
+                previous[(record['benchmark'], record['size'])] = record
+    return previous
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the benchmark suite')
+    parser.add_argument('--sizes', default=','.join(SIZES), help=f"Comma-separated corpus sizes ({', '.join(SIZES)})")
+    parser.add_argument('--only', default='', help='Run benchmarks whose name contains this text')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed calls per benchmark')
+    parser.add_argument('--budget', type=float, default=10.0, help='Max seconds of timed calls per benchmark')
+    parser.add_argument('--seed', type=int, default=0, help='Corpus seed')
+    parser.add_argument('--cache-dir', help='Reuse/write corpora as Parquet files in this directory')
+    parser.add_argument('--no-save', action='store_true', help='Do not append results')
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help='Exit 1 if a median is more than {:.0%} slower than the previous run'.format(REGRESSION_THRESHOLD - 1).replace('%', '%%'))
+    parser.add_argument('--profile-imports', action='store_true', help='Print the slowest imports of the app and exit')
+    args = parser.parse_args()
+
+    if args.profile_imports:
+        profile_imports()
+        return
+
+    sizes = [s.strip() for s in args.sizes.split(',') if s.strip()]
+    unknown = set(sizes) - set(SIZES)
+    if unknown:
+        parser.error(f"unknown size(s): {', '.join(sorted(unknown))}")
+
+    results_path = RESULTS_DIR / f'{platform.node() or "local"}.jsonl'
+    previous = load_previous(results_path)
+    run_info = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'machine': platform.node()
+    }
+
+    records = []
+    regressions = []
+
+    def report(name: str, size: str, rows: int, times: List[float]):
+        record = {
+            'benchmark': name,
+            'size': size,
+            'rows': rows,
+            'repeat': len(times),
+            'min': min(times),
+            'median': statistics.median(times),
+            'mean': statistics.fmean(times),
+            **run_info
+        }
+        records.append(record)
+
+        line = f"{name:<72} median {record['median'] * 1000:10.2f} ms   min {record['min'] * 1000:10.2f} ms"
+        before = previous.get((name, size))
+        if before:
+            ratio = record['median'] / before['median']
+            line += f"   {ratio:5.2f}x vs {before.get('commit') or before['timestamp']}"
+            if ratio > REGRESSION_THRESHOLD:
+                line += '  REGRESSION'
+                regressions.append(f'{name} [{size}]')
+        print(line)
+
+    startup = {name: func for name, func in startup_benchmarks().items() if args.only in name}
+    if startup:
+        print("\n== cold start")
+        for name, func in startup.items():
+            # Each call reports its own duration (process launch excluded where it can be)
+            report(name, 'cold', 0, [func() for _ in range(args.repeat)])
+
+    for size in sizes if not args.only.startswith('startup') else []:
+        started = time.perf_counter()
+        corpus = load_corpus(SIZES[size], seed=args.seed, cache_dir=args.cache_dir)
+        print(f"\n== {size}: {len(corpus):,} tenders (built in {time.perf_counter() - started:.2f}s)")
+
+        benchmarks = {**function_benchmarks(corpus), **route_benchmarks(corpus)}
+        for name, func in benchmarks.items():
+            if args.only not in name:
+                continue
+            report(name, size, len(corpus), measure(func, args.repeat, args.budget))
+
+    if not args.no_save and records:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        with results_path.open('a') as f:
+            for record in records:
+                f.write(json.dumps(record) + '\n')
+        print(f"\nSaved {len(records)} results -> {results_path}")
+
+    if regressions:
+        print(f"\nRegressions: {', '.join(regressions)}")
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
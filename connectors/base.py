@@ -2,26 +2,53 @@
 Base connector class for all procurement data sources
 """
 from abc import ABC, abstractmethod
+from functools import wraps
 from typing import Dict, List, Optional
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
+from core.metrics import upstream_span
+from connectors.normalize import AmountColumn, parse_amounts, parse_dates
+from connectors.currency import load_fx_table
+
+# Upstream calls timed (and counted as in flight) for every connector
+TIMED_METHODS = ('search_tenders', 'search_awards', 'get_tender_details')
+
+
+def _timed(connector: str, method: str, func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with upstream_span(connector, method):
+            return func(*args, **kwargs)
+    return wrapper
+
 
 class ProcurementConnector(ABC):
     """Abstract base class for procurement data connectors"""
     
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for method in TIMED_METHODS:
+            if method in cls.__dict__:
+                setattr(cls, method, _timed(cls.__name__, method, cls.__dict__[method]))
+    
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key
         self.base_url = ""
         self.source_name = ""
+        # column -> values that failed to parse in the latest normalization
+        self.normalization_issues: Dict[str, int] = {}
     
     @abstractmethod
-    def search_tenders(self, filters: Dict) -> pd.DataFrame:
+    def search_tenders(self, filters: Dict, raise_errors: bool = False) -> pd.DataFrame:
         """
         Search for tenders matching filters
         
         Args:
             filters: Dictionary of search parameters
+            raise_errors: Raise upstream failures instead of returning
+                          fallback (sample) data
             
         Returns:
             DataFrame with tender information
@@ -34,24 +61,51 @@ class ProcurementConnector(ABC):
         pass
     
     @abstractmethod
-    def search_awards(self, filters: Dict) -> pd.DataFrame:
-        """Search for contract awards"""
+    def search_awards(self, filters: Dict, raise_errors: bool = False) -> pd.DataFrame:
+        """Search for contract awards (`raise_errors` as in search_tenders)"""
         pass
     
-    def normalize_date(self, date_str: str) -> datetime:
-        """Normalize date strings to datetime objects"""
-        try:
-            return pd.to_datetime(date_str)
-        except:
-            return None
-    
-    def normalize_value(self, value: any) -> float:
-        """Normalize currency values to float"""
-        try:
-            if isinstance(value, (int, float)):
-                return float(value)
-            # Remove currency symbols and convert
-            value_str = str(value).replace('€', '').replace('$', '').replace(',', '')
-            return float(value_str)
-        except:
-            return 0.0
+    def normalize_date(self, date_str: str) -> Optional[datetime]:
+        """Normalize a date string to a datetime (None if it does not parse)"""
+        parsed = parse_dates([date_str]).dates.iloc[0]
+        return None if pd.isna(parsed) else parsed.to_pydatetime()
+    
+    def normalize_value(self, value: any) -> Optional[float]:
+        """Normalize a (possibly locale-formatted) amount to float (None if it does not parse)"""
+        parsed = parse_amounts([value]).amount.iloc[0]
+        return None if np.isnan(parsed) else float(parsed)
+    
+    def normalize_dates(self, values, column: str = 'date', dayfirst: bool = True) -> pd.Series:
+        """
+        Column form of normalize_date (see connectors.normalize.parse_dates);
+        values that do not parse become NaT and are reported
+        """
+        parsed = parse_dates(values, dayfirst=dayfirst)
+        self.report_invalid(column, parsed)
+        return parsed.dates
+    
+    def normalize_values(self, values, column: str = 'value', default_currency=None,
+                         decimal: Optional[str] = None) -> AmountColumn:
+        """
+        Column form of normalize_value (see connectors.normalize.parse_amounts);
+        values that do not parse become NaN (not 0.0) and are reported
+        """
+        parsed = parse_amounts(values, default_currency=default_currency, decimal=decimal)
+        self.report_invalid(column, parsed)
+        return parsed
+    
+    def convert_to_eur(self, amounts, currencies, dates, column: str = 'value_eur') -> pd.Series:
+        """
+        Convert an amount column to EUR at each row's date (see
+        connectors.currency); unknown currencies become NaN and are reported
+        """
+        converted = load_fx_table().to_eur(amounts, currencies, dates)
+        self.report_invalid(column, converted)
+        return converted.amount
+    
+    def report_invalid(self, column: str, parsed):
+        """Record (and log) how many values of a column failed to parse"""
+        report = parsed.report()
+        self.normalization_issues[column] = report['invalid']
+        if report['invalid']:
+            print(f"{self.source_name}: {report['invalid']} unparseable {column} value(s), e.g. {report['examples']}")
@@ -0,0 +1,150 @@
+"""
+Historical FX conversion to EUR
+
+Rates come from the ECB reference-rate history (eurofxref-hist.csv: a `Date`
+column and one column per currency, in units per EUR, newest first, 'N/A'
+for missing). The table is expanded to one row per calendar day, with
+weekends and holidays carrying the previous fixing, so looking up a
+(currency, day) pair is plain array indexing. Whole value columns are then
+converted at ingest with a single gather and divide.
+
+Usage:
+    python -m connectors.currency --download     # fetch the ECB history into fx_file
+"""
+import argparse
+import io
+import os
+import zipfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from core.config import get_setting
+from connectors.normalize import AmountColumn
+
+ECB_HISTORY_URL = 'https://www.ecb.europa.eu/stats/eurofxref/eurofxref-hist.zip'
+DEFAULT_FX_FILE = 'data/eurofxref-hist.csv'
+
+# Approximate ECB reference rates, used only when no FX file is available
+FALLBACK_RATES = {
+    'USD': 1.08, 'GBP': 0.85, 'PLN': 4.30, 'SEK': 11.40, 'DKK': 7.46, 'NOK': 11.60,
+    'CHF': 0.95, 'CZK': 25.0, 'HUF': 395.0, 'RON': 4.97, 'BGN': 1.9558
+}
+
+
+class FxTable:
+    """Daily EUR reference rates indexed by (day offset, currency)"""
+
+    def __init__(self, rates: pd.DataFrame):
+        """
+        Args:
+            rates: Units of currency per EUR; DatetimeIndex of fixing dates,
+                   one column per ISO currency code
+        """
+        rates = rates.sort_index()
+        daily = rates.reindex(pd.date_range(rates.index[0], rates.index[-1], freq='D')).ffill()
+        self.first_day = np.datetime64(daily.index[0].date(), 'D')
+        self.last_day = np.datetime64(daily.index[-1].date(), 'D')
+        self.index: Dict[str, int] = {'EUR': 0, **{c: i + 1 for i, c in enumerate(daily.columns)}}
+        self.table = np.column_stack([np.ones(len(daily)), daily.to_numpy(dtype=float)])
+
+    @classmethod
+    def from_csv(cls, path) -> 'FxTable':
+        """Load an ECB eurofxref-hist.csv file"""
+        frame = pd.read_csv(path, na_values=['N/A'], skipinitialspace=True)
+        frame = frame.loc[:, ~frame.columns.str.startswith('Unnamed')]
+        frame.columns = frame.columns.str.strip()
+        rates = frame.set_index(pd.to_datetime(frame.pop('Date'), format='%Y-%m-%d'))
+        return cls(rates.astype(float))
+
+    @classmethod
+    def fallback(cls) -> 'FxTable':
+        """Single-day table of FALLBACK_RATES"""
+        return cls(pd.DataFrame(FALLBACK_RATES, index=pd.DatetimeIndex([pd.Timestamp.today().normalize()])))
+
+    def _day_offsets(self, dates) -> np.ndarray:
+        """Row per date; dates outside the table clamp to its ends, missing ones use the latest"""
+        days = pd.to_datetime(pd.Series(dates), errors='coerce').to_numpy().astype('datetime64[D]')
+        last = len(self.table) - 1
+        offsets = np.full(len(days), last, dtype=np.int64)
+        known = ~np.isnat(days)
+        offsets[known] = np.clip((days[known] - self.first_day).astype(np.int64), 0, last)
+        return offsets
+
+    def rate(self, currency: str, day=None) -> Optional[float]:
+        """Units of `currency` per EUR on `day` (latest if None); None if unknown"""
+        column = self.index.get((currency or '').upper())
+        if column is None:
+            return None
+        rate = self.table[self._day_offsets([day])[0], column]
+        return None if np.isnan(rate) else float(rate)
+
+    def to_eur(self, amounts, currencies, dates) -> AmountColumn:
+        """
+        Convert amounts to EUR at each row's date
+
+        Returns:
+            AmountColumn of EUR amounts; `invalid` marks amounts whose
+            currency (or rate on that day) is unknown
+        """
+        amounts = pd.Series(amounts, dtype=float)
+        codes = pd.Series(currencies, index=amounts.index, dtype=object).fillna('EUR').str.upper()
+        columns = codes.map(self.index)
+        known = columns.notna().to_numpy()
+
+        rates = np.full(len(amounts), np.nan)
+        rates[known] = self.table[self._day_offsets(dates)[known], columns[known].astype(np.int64)]
+        converted = pd.Series(amounts.to_numpy() / rates, index=amounts.index)
+        invalid = converted.isna() & amounts.notna()
+        return AmountColumn(amount=converted, currency=codes, invalid=invalid, _source=codes)
+
+
+@lru_cache(maxsize=4)
+def load_fx_table(path: Optional[str] = None) -> FxTable:
+    """FX table from `path`, FX_RATES_FILE or `currency.fx_file`; FALLBACK_RATES if missing"""
+    path = path or os.getenv('FX_RATES_FILE') or get_setting('currency.fx_file', DEFAULT_FX_FILE)
+    if path and Path(path).exists():
+        try:
+            return FxTable.from_csv(path)
+        except Exception as e:
+            print(f"FX table {path} Error: {e}")
+    print(f"FX table {path} not available, using approximate fallback rates")
+    return FxTable.fallback()
+
+
+def download(path: str = DEFAULT_FX_FILE) -> Path:
+    """Fetch the ECB reference-rate history and write it to `path`"""
+    import requests
+
+    response = requests.get(ECB_HISTORY_URL, timeout=60)
+    response.raise_for_status()
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        data = archive.read(archive.namelist()[0])
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f'.{path.name}.tmp')
+    tmp.write_bytes(data)
+    tmp.replace(path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ECB FX history for EUR conversion')
+    parser.add_argument('--download', action='store_true', help='Fetch the ECB history')
+    parser.add_argument('--out', default=os.getenv('FX_RATES_FILE') or get_setting('currency.fx_file', DEFAULT_FX_FILE))
+    args = parser.parse_args()
+
+    if args.download:
+        print(f"Wrote {download(args.out)}")
+    table = load_fx_table(args.out)
+    print(f"{len(table.index)} currencies, {table.first_day} .. {table.last_day}")
+    for currency in ('USD', 'PLN', 'SEK', 'DKK'):
+        print(f"  1 EUR = {table.rate(currency)} {currency}")
+
+
+if __name__ == '__main__':
+    main()
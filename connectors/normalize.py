@@ -0,0 +1,223 @@
+"""
+Column-level normalization of amounts and dates
+
+Both parsers work on whole columns with vectorized string operations and
+return the parsed column together with an `invalid` mask: values that were
+present but could not be parsed are reported there, never turned into 0.
+
+Amounts accept locale formats ('1.234.567,89', '1 234 567,89',
+"1'234'567.89", '1,234,567.89'), scale words ('1,5 Mio', '2 Mrd', '300k')
+and detect the currency from symbols or ISO codes ('€ 1.200', '1 200 zł',
+'SEK 5 000'); any other word makes the value invalid. Dates accept ISO (with or
+without time/offset), compact, dotted, slashed and month-name formats.
+"""
+from dataclasses import dataclass
+from typing import Dict, Optional
+import numpy as np
+import pandas as pd
+
+# Currency markers (upper-cased) -> ISO 4217 code; 'KR' is resolved from context
+CURRENCY_MARKERS = {
+    'EUR': 'EUR', 'EURO': 'EUR', '€': 'EUR', 'USD': 'USD', 'US$': 'USD', '$': 'USD',
+    'GBP': 'GBP', '£': 'GBP', 'PLN': 'PLN', 'ZŁ': 'PLN', 'ZL': 'PLN',
+    'SEK': 'SEK', 'DKK': 'DKK', 'NOK': 'NOK', 'KR.': None, 'KR': None,
+    'CHF': 'CHF', 'CZK': 'CZK', 'KČ': 'CZK', 'HUF': 'HUF', 'FT': 'HUF',
+    'RON': 'RON', 'LEI': 'RON', 'BGN': 'BGN'
+}
+
+_MARKER_PATTERN = '(' + '|'.join(
+    sorted((m.replace('$', r'\$').replace('.', r'\.') for m in CURRENCY_MARKERS), key=len, reverse=True)
+) + ')'
+
+# Scale words (upper-cased, optional trailing '.') -> multiplier
+SCALE_WORDS = {
+    'K': 1e3, 'TSD': 1e3, 'TAUSEND': 1e3, 'THOUSAND': 1e3,
+    'MIO': 1e6, 'MLN': 1e6, 'MN': 1e6, 'MILLION': 1e6, 'MILLIONS': 1e6, 'MILLIONEN': 1e6,
+    'MRD': 1e9, 'MLD': 1e9, 'BN': 1e9, 'BILLION': 1e9, 'MILLIARDE': 1e9, 'MILLIARDEN': 1e9
+}
+
+_SCALE_PATTERN = r'(?<![^\W\d_])(' + '|'.join(sorted(SCALE_WORDS, key=len, reverse=True)) + r')\.?(?![^\W\d_])'
+_LETTER = r'[^\W\d_]'
+
+# Tried in order on the values no earlier format matched (regex guard, strptime format)
+DATE_FORMATS = [
+    (r'^\d{4}-\d{2}-\d{2}', '%Y-%m-%d'),          # ISO, optional time/offset ignored
+    (r'^\d{8}$', '%Y%m%d'),
+    (r'^\d{1,2}\.\d{1,2}\.\d{4}$', '%d.%m.%Y'),
+    (r'^\d{1,2}-\d{1,2}-\d{4}$', '%d-%m-%Y'),
+    (r'^\d{4}/\d{1,2}/\d{1,2}$', '%Y/%m/%d'),
+]
+SLASH_DATE = r'^\d{1,2}/\d{1,2}/\d{4}$'
+
+
+@dataclass
+class AmountColumn:
+    """Parsed amounts, detected currency per value and the invalid mask"""
+
+    amount: pd.Series
+    currency: pd.Series
+    invalid: pd.Series
+    _source: Optional[pd.Series] = None
+
+    def report(self, limit: int = 3) -> Dict:
+        """Count and a few examples of the values that did not parse"""
+        return _report(self.invalid, self._source, limit)
+
+
+@dataclass
+class DateColumn:
+    """Parsed dates (NaT where missing or invalid) and the invalid mask"""
+
+    dates: pd.Series
+    invalid: pd.Series
+    _source: Optional[pd.Series] = None
+
+    def report(self, limit: int = 3) -> Dict:
+        """Count and a few examples of the values that did not parse"""
+        return _report(self.invalid, self._source, limit)
+
+
+def _report(invalid: pd.Series, source: Optional[pd.Series], limit: int) -> Dict:
+    count = int(invalid.sum())
+    examples = source[invalid].head(limit).tolist() if count and source is not None else []
+    return {'invalid': count, 'examples': examples}
+
+
+def parse_amounts(values, default_currency=None, decimal: Optional[str] = None) -> AmountColumn:
+    """
+    Parse a column of monetary amounts
+
+    Args:
+        values: Numbers and/or strings
+        default_currency: Scalar or per-row currency used when a value carries
+                          no (or an ambiguous) currency marker
+        decimal: ',' or '.' to settle single-separator groups of three digits
+                 ('1.234', '1,234'); by default ',' is a thousands separator
+                 there and '.' a decimal point
+
+    Returns:
+        AmountColumn; `invalid` marks non-empty values that did not parse
+    """
+    values = pd.Series(values, dtype=object)
+    is_text = values.map(type).eq(str).to_numpy()
+    # Booleans are numbers to pandas, never amounts
+    numeric = ~is_text & ~values.map(lambda value: isinstance(value, (bool, np.bool_))).to_numpy(dtype=bool)
+
+    amount = pd.Series(np.nan, index=values.index)
+    amount[numeric] = pd.to_numeric(values[numeric], errors='coerce')
+    currency = pd.Series(None, index=values.index, dtype=object)
+    empty = values.isna().to_numpy().copy()
+
+    if is_text.any():
+        text = values[is_text].astype('str').str.strip()
+        empty[is_text] = text.eq('').to_numpy()
+        upper = text.str.upper()
+        marker = upper.str.extract(_MARKER_PATTERN, expand=False)
+        currency[is_text] = marker.map(CURRENCY_MARKERS).to_numpy(dtype=object)
+
+        scale = upper.str.extract(_SCALE_PATTERN, expand=False).map(SCALE_WORDS).fillna(1.0)
+        # Letters left over once the scale word and currency marker are gone: not an amount
+        words = upper.str.replace(_SCALE_PATTERN, ' ', regex=True).str.replace(_MARKER_PATTERN, ' ', regex=True)
+        unknown = words.str.contains(_LETTER, regex=True)
+
+        # Keep digits, separators and sign; grouping spaces/apostrophes go, and
+        # trailing separators ('5 000 kr.') but not a leading decimal point ('.5')
+        digits = upper.str.replace(r"[^\d,.\-]", '', regex=True).str.rstrip('.,')
+        parsed = _parse_numbers(digits, decimal) * scale
+        amount[is_text] = parsed.where(~unknown).to_numpy()
+
+    if default_currency is not None:
+        currency = currency.fillna(pd.Series(default_currency, index=values.index) if np.ndim(default_currency) else default_currency)
+
+    invalid = amount.isna() & ~empty
+    return AmountColumn(amount=amount.astype(float), currency=currency, invalid=invalid, _source=values)
+
+
+def _parse_numbers(digits: pd.Series, decimal: Optional[str]) -> pd.Series:
+    """Numbers from strings holding only digits, ',', '.' and '-'"""
+    last_dot = digits.str.rfind('.')
+    last_comma = digits.str.rfind(',')
+    dots = digits.str.count(r'\.')
+    commas = digits.str.count(',')
+    tail = digits.str.len() - 1 - np.maximum(last_dot, last_comma)
+
+    both = (dots > 0) & (commas > 0)
+    single_comma = (commas == 1) & (dots == 0)
+    single_dot = (dots == 1) & (commas == 0)
+    group_of_three = tail == 3
+
+    comma_decimal = (
+        (both & (last_comma > last_dot))
+        | (single_comma & (~group_of_three | (decimal == ',')))
+    )
+    dot_decimal = (
+        (both & (last_dot > last_comma))
+        | (single_dot & (~group_of_three | (decimal != ',')))
+    )
+
+    cleaned = digits.where(~comma_decimal, digits.str.replace('.', '', regex=False).str.replace(',', '.', regex=False))
+    cleaned = cleaned.where(comma_decimal | dot_decimal, cleaned.str.replace(r'[.,]', '', regex=True))
+    cleaned = cleaned.where(~dot_decimal, cleaned.str.replace(',', '', regex=False))
+    return pd.to_numeric(cleaned, errors='coerce')
+
+
+def _wall_clock(value):
+    """Naive timestamp with the value's own local time (offset dropped, not applied); NaT if invalid"""
+    try:
+        stamp = pd.Timestamp(value)
+    except (ValueError, TypeError, OverflowError):
+        return pd.NaT
+    return stamp.tz_localize(None) if stamp.tzinfo is not None else stamp
+
+
+def parse_dates(values, dayfirst: bool = True) -> DateColumn:
+    """
+    Parse a column of dates, one pass per distinct value
+
+    Args:
+        values: Strings, datetimes or None
+        dayfirst: Read 01/02/2026 as 1 February (EU); False for US sources
+
+    Returns:
+        DateColumn with naive calendar dates (time of day and offsets dropped)
+    """
+    values = pd.Series(values, dtype=object)
+    codes, uniques = pd.factorize(values)
+    text = pd.Series(uniques, dtype=object).astype(str).str.strip()
+    parsed = pd.Series(pd.NaT, index=text.index, dtype='datetime64[ns]')
+
+    stamps = np.array([isinstance(v, (pd.Timestamp, np.datetime64)) or hasattr(v, 'year') for v in uniques], dtype=bool)
+    if stamps.any():
+        # Local wall-clock date, as the string path keeps the written date:
+        # converting to UTC first would move CET midnight to the previous day
+        local = pd.Series([_wall_clock(v) for v in uniques[stamps]], dtype=object)
+        parsed[stamps] = pd.to_datetime(local, errors='coerce').dt.normalize().to_numpy()
+
+    formats = DATE_FORMATS + [(SLASH_DATE, '%d/%m/%Y' if dayfirst else '%m/%d/%Y')]
+    pending = ~stamps
+    for guard, fmt in formats:
+        match = pending & text.str.match(guard).to_numpy(dtype=bool)
+        if match.any():
+            candidates = text[match].str[:10] if fmt == '%Y-%m-%d' else text[match]
+            parsed[match] = pd.to_datetime(candidates, format=fmt, errors='coerce').to_numpy()
+            pending &= ~match
+
+    if pending.any():
+        # Month names and anything else dateutil understands
+        parsed[pending] = pd.to_datetime(text[pending], format='mixed', dayfirst=dayfirst, errors='coerce').to_numpy()
+
+    # code -1 (missing) picks the trailing NaT
+    dates = pd.Series(np.append(parsed.to_numpy(), np.datetime64('NaT', 'ns'))[codes], index=values.index)
+    blank = np.append(text.eq('').to_numpy(), True)[codes]
+    return DateColumn(dates=dates, invalid=dates.isna() & ~blank, _source=values)
+
+
+if __name__ == '__main__':
+    amounts = parse_amounts(['1.234.567,89', '€ 1,234,567.89', '1 234 567,89 zł', "CHF 1'234'567.50",
+                             'SEK 5 000', '€1,5 Mio', '.5', 12.5, True, None, 'n/a', 'approx. 1000'],
+                            default_currency='EUR')
+    print(pd.DataFrame({'amount': amounts.amount, 'currency': amounts.currency, 'invalid': amounts.invalid}))
+    print(amounts.report())
+
+    dates = parse_dates(['2026-10-01+01:00', '01.02.2026', '20261003', '3 March 2026', 'March 4, 2026', '', 'soon'])
+    print(pd.DataFrame({'date': dates.dates, 'invalid': dates.invalid}))
@@ -0,0 +1,313 @@
+"""
+Seeded synthetic tender corpus
+
+Generates TED-shaped tenders with NumPy, one column at a time, so millions
+of rows take seconds. Distributions are skewed the way real notices are:
+
+- values are log-normal with a per-CPV median (construction is large,
+  supplies small), rounded to EUR 1,000
+- publication dates follow weekday and month seasonality (quiet weekends
+  and August, busy December)
+- countries and CPV divisions follow a skewed mix (Germany and France
+  publish most, construction and business services dominate)
+
+Output is fully determined by (rows, seed, end date); tender ids are
+derived from the seed and row number, so the same id always carries the
+same data. Demo mode, benchmarks and the load-test mock share this module.
+
+`generate_awards` derives contract awards for the tenders whose deadline
+has passed: winners from a per-country supplier pool (with the spelling
+variants real notices have), bid counts by procedure and awarded values
+scattered around the estimate.
+
+Usage:
+    python -m connectors.synthetic --rows 1000000 --seed 0 --out data/tenders.parquet
+"""
+import argparse
+import re
+import time
+from datetime import date
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+# country -> (name, share of notices)
+COUNTRIES = {
+    'DE': ('Germany', 0.22), 'FR': ('France', 0.19), 'PL': ('Poland', 0.12),
+    'IT': ('Italy', 0.11), 'ES': ('Spain', 0.10), 'NL': ('Netherlands', 0.06),
+    'SE': ('Sweden', 0.06), 'BE': ('Belgium', 0.05), 'AT': ('Austria', 0.05),
+    'DK': ('Denmark', 0.04)
+}
+
+# CPV code -> (description, share of notices, median value EUR)
+CPV_CATEGORIES = {
+    '45000000': ('Construction work', 0.24, 2_500_000),
+    '79000000': ('Business services', 0.18, 400_000),
+    '72000000': ('IT services: consulting, software development', 0.15, 600_000),
+    '85000000': ('Health and social work services', 0.13, 800_000),
+    '30200000': ('Computer equipment and supplies', 0.12, 250_000),
+    '90000000': ('Sewage, refuse, cleaning services', 0.10, 900_000),
+    '48000000': ('Software package and information systems', 0.08, 500_000)
+}
+
+TITLE_TEMPLATES = [
+    "Supply and implementation of {service}",
+    "Framework agreement for {service}",
+    "Provision of {service}",
+    "{service} - Multi-year contract",
+    "Consulting services for {service}"
+]
+
+SERVICES = [
+    "cloud computing infrastructure",
+    "enterprise resource planning system",
+    "cybersecurity services",
+    "data analytics platform",
+    "digital transformation",
+    "AI/ML solutions",
+    "electronic procurement system",
+    "healthcare IT system"
+]
+
+# procedure -> share
+PROCEDURES = {'Open': 0.62, 'Restricted': 0.23, 'Negotiated': 0.15}
+
+# Relative publication volume by weekday (Mon..Sun) and month (Jan..Dec)
+WEEKDAY_WEIGHTS = np.array([1.0, 1.05, 1.05, 1.0, 0.9, 0.08, 0.04])
+MONTH_WEIGHTS = np.array([0.85, 0.95, 1.05, 1.0, 1.0, 1.05, 0.85, 0.6, 1.0, 1.05, 1.1, 1.3])
+
+# Awards: share of closed tenders awarded, mean bids per procedure, award/estimate spread
+AWARD_SHARE = 0.7
+MEAN_BIDS = {'Open': 5.0, 'Restricted': 3.0, 'Negotiated': 1.5}
+AWARD_RATIO_SIGMA = 0.18
+
+SUPPLIER_PREFIXES = ['Nordic', 'Euro', 'Alpha', 'Delta', 'Civitas', 'Atlas', 'Vertex', 'Orion',
+                     'Meridian', 'Summit', 'Helix', 'Pioneer', 'Quantum', 'Granite', 'Aurora']
+SUPPLIER_TRADES = ['Systems', 'Consulting', 'Construction', 'Services', 'Technologies',
+                   'Facility Management', 'Health Solutions', 'Data', 'Infrastructure', 'Engineering']
+LEGAL_FORMS = {'DE': 'GmbH', 'AT': 'GmbH', 'FR': 'SAS', 'PL': 'sp. z o.o.', 'IT': 'S.r.l.',
+               'ES': 'S.L.', 'NL': 'B.V.', 'BE': 'NV', 'SE': 'AB', 'DK': 'A/S'}
+SUPPLIERS_PER_COUNTRY = 60
+
+VALUE_SIGMA = 1.3
+MIN_VALUE, MAX_VALUE = 10_000, 500_000_000
+
+# tender_id = TED-<ID_BASE + seed * 10^10 + row>
+ID_BASE = 2026000000
+
+# Rows per independently seeded block; bounds memory when writing Parquet
+BLOCK_ROWS = 1_000_000
+
+
+def _shares(spec: dict, index: int = 1) -> np.ndarray:
+    weights = np.array([v[index] if isinstance(v, tuple) else v for v in spec.values()], dtype=float)
+    return weights / weights.sum()
+
+
+def _day_weights(first_day: np.int64, days: int) -> np.ndarray:
+    """Publication probability per day from weekday and month seasonality"""
+    day_numbers = first_day + np.arange(days)
+    weekdays = (day_numbers + 3) % 7      # 1970-01-01 was a Thursday
+    months = day_numbers.astype('datetime64[D]').astype('datetime64[M]').astype(int) % 12
+    weights = WEEKDAY_WEIGHTS[weekdays] * MONTH_WEIGHTS[months]
+    return weights / weights.sum()
+
+
+def _format_days(days: np.ndarray) -> np.ndarray:
+    """YYYY-MM-DD strings, formatted once per distinct day"""
+    uniques, codes = np.unique(days, return_inverse=True)
+    return uniques.astype('datetime64[D]').astype(str).astype(object)[codes]
+
+
+def _pick(values, codes: np.ndarray) -> np.ndarray:
+    return np.asarray(values, dtype=object)[codes]
+
+
+def _block(rng: np.random.Generator, first_row: int, rows: int, seed: int,
+           end: np.int64, days: int) -> pd.DataFrame:
+    """One block of tenders; row numbers start at first_row"""
+    countries = list(COUNTRIES)
+    cpv_codes = list(CPV_CATEGORIES)
+    titles = [t.format(service=s) for t in TITLE_TEMPLATES for s in SERVICES]
+
+    country = rng.choice(len(countries), rows, p=_shares(COUNTRIES))
+    cpv = rng.choice(len(cpv_codes), rows, p=_shares(CPV_CATEGORIES))
+
+    medians = np.array([v[2] for v in CPV_CATEGORIES.values()], dtype=float)
+    values = np.exp(np.log(medians[cpv]) + rng.normal(0, VALUE_SIGMA, rows))
+    values = np.round(np.clip(values, MIN_VALUE, MAX_VALUE), -3)
+
+    first_day = end - days + 1
+    published = first_day + rng.choice(days, rows, p=_day_weights(first_day, days))
+    deadline = published + rng.integers(30, 91, rows)
+
+    numbers = (ID_BASE + np.int64(seed) * 10**10 + first_row + np.arange(rows)).astype(str)
+    ids = np.char.add('TED-', numbers).astype(object)
+
+    return pd.DataFrame({
+        'tender_id': ids,
+        'title': _pick(titles, rng.integers(0, len(titles), rows)),
+        'country': _pick(countries, country),
+        'country_name': _pick([v[0] for v in COUNTRIES.values()], country),
+        'cpv_code': _pick(cpv_codes, cpv),
+        'cpv_description': _pick([v[0] for v in CPV_CATEGORIES.values()], cpv),
+        'value_eur': values,
+        'currency': 'EUR',
+        'published_date': _format_days(published),
+        'deadline': _format_days(deadline),
+        'buyer': _pick([f'{v[0]} Government Agency' for v in COUNTRIES.values()], country),
+        'procedure_type': _pick(list(PROCEDURES), rng.choice(len(PROCEDURES), rows, p=_shares(PROCEDURES))),
+        'source': 'TED (EU)',
+        'url': np.char.add('https://ted.europa.eu/udl?uri=TED:NOTICE:', numbers).astype(object)
+    })
+
+
+def iter_blocks(rows: int, seed: int = 0, end: Optional[date] = None, days: int = 365) -> Iterator[pd.DataFrame]:
+    """The corpus as consecutive blocks of at most BLOCK_ROWS rows"""
+    end_day = np.datetime64(end or date.today(), 'D').astype(np.int64)
+    for block, first_row in enumerate(range(0, max(rows, 1), BLOCK_ROWS)):
+        rng = np.random.default_rng([seed, block])
+        yield _block(rng, first_row, min(BLOCK_ROWS, rows - first_row), seed, end_day, days)
+
+
+def generate_tenders(rows: int, seed: int = 0, end: Optional[date] = None, days: int = 365) -> pd.DataFrame:
+    """
+    Synthetic tenders
+
+    Args:
+        rows: Number of tenders
+        seed: RNG seed; equal (rows, seed, end, days) give equal frames
+        end: Last publication date (default: today)
+        days: Length of the publication window
+    """
+    blocks = list(iter_blocks(rows, seed, end, days))
+    if len(blocks) == 1:
+        return blocks[0]
+    return pd.concat(blocks, ignore_index=True)
+
+
+def _supplier_names(country: str) -> list:
+    """Deterministic supplier pool for one country"""
+    rng = np.random.default_rng([sum(map(ord, country)), SUPPLIERS_PER_COUNTRY])
+    prefixes = rng.choice(SUPPLIER_PREFIXES, SUPPLIERS_PER_COUNTRY)
+    trades = rng.choice(SUPPLIER_TRADES, SUPPLIERS_PER_COUNTRY)
+    legal = LEGAL_FORMS.get(country, 'Ltd')
+    return [f'{p} {t} {legal}' for p, t in zip(prefixes, trades)]
+
+
+def generate_awards(tenders: pd.DataFrame, seed: int = 0, end: Optional[date] = None) -> pd.DataFrame:
+    """
+    Contract awards for tenders closed before `end` (default: today)
+
+    Winners are spelled inconsistently (upper case, missing legal form) the
+    way they are across real award notices. Output is determined by
+    (tenders, seed, end).
+    """
+    end_day = np.datetime64(end or date.today(), 'D')
+    deadlines = pd.to_datetime(tenders['deadline'], errors='coerce').to_numpy().astype('datetime64[D]')
+    rng = np.random.default_rng([seed, len(tenders), 7])
+
+    decided = deadlines + rng.integers(14, 90, len(tenders))
+    awarded = (~np.isnat(deadlines)) & (decided <= end_day) & (rng.random(len(tenders)) < AWARD_SHARE)
+    closed = tenders[awarded]
+    rows = len(closed)
+    decided = decided[awarded]
+
+    countries = closed['country'].to_numpy(dtype=object)
+    winners = np.empty(rows, dtype=object)
+    for country in pd.unique(countries):
+        at = np.flatnonzero(countries == country)
+        pool = _supplier_names(country)
+        # Zipf-like: a few suppliers win most contracts
+        weights = 1 / np.arange(1, len(pool) + 1)
+        winners[at] = np.asarray(pool, dtype=object)[rng.choice(len(pool), len(at), p=weights / weights.sum())]
+
+    variant = rng.random(rows)
+    upper = variant < 0.1
+    bare = (variant >= 0.1) & (variant < 0.2)
+    winners[upper] = [w.upper() for w in winners[upper]]
+    legal_forms = '|'.join(re.escape(form) for form in set(LEGAL_FORMS.values()))
+    winners[bare] = pd.Series(winners[bare], dtype=object).str.replace(rf'\s+({legal_forms})$', '', regex=True).to_numpy()
+
+    mean_bids = closed['procedure_type'].map(MEAN_BIDS).fillna(3.0).to_numpy(dtype=float)
+    bids = 1 + rng.poisson(mean_bids - 1)
+    # More competition, lower prices relative to the estimate
+    ratio = np.exp(rng.normal(0.05 - 0.03 * np.minimum(bids, 8), AWARD_RATIO_SIGMA))
+    values = np.round(closed['value_eur'].to_numpy(dtype=float) * ratio, -2)
+
+    tender_ids = closed['tender_id'].to_numpy(dtype=object)
+    return pd.DataFrame({
+        'award_id': np.char.add(tender_ids.astype(str), '-AWD').astype(object),
+        'tender_id': tender_ids,
+        'winner': winners,
+        'winner_country': countries,
+        'awarded_value_eur': values,
+        'estimated_value_eur': closed['value_eur'].to_numpy(dtype=float),
+        'currency': 'EUR',
+        'bids': bids.astype(np.int64),
+        'award_date': _format_days(decided.astype(np.int64)),
+        'buyer': closed['buyer'].to_numpy(dtype=object),
+        'country': countries,
+        'cpv_code': closed['cpv_code'].to_numpy(dtype=object),
+        'source': closed['source'].to_numpy(dtype=object) if 'source' in closed else 'TED (EU)',
+        'url': closed['url'].to_numpy(dtype=object) if 'url' in closed else None
+    })
+
+
+def write_parquet(path, rows: int, seed: int = 0, end: Optional[date] = None, days: int = 365) -> Path:
+    """Stream the corpus to a Parquet file block by block"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f'.{path.name}.tmp')
+
+    writer = None
+    try:
+        for block in iter_blocks(rows, seed, end, days):
+            table = pa.Table.from_pandas(block, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(tmp, table.schema, compression='zstd')
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    tmp.replace(path)
+    return path
+
+
+def load_corpus(rows: int, seed: int = 0, cache_dir=None) -> pd.DataFrame:
+    """
+    Corpus for (rows, seed) ending today, read from
+    `<cache_dir>/tenders_<rows>_<seed>_<date>.parquet` when present,
+    otherwise generated (and written there if cache_dir is given)
+    """
+    if cache_dir is None:
+        return generate_tenders(rows, seed)
+
+    path = Path(cache_dir) / f'tenders_{rows}_{seed}_{date.today():%Y%m%d}.parquet'
+    if not path.exists():
+        write_parquet(path, rows, seed)
+    return pd.read_parquet(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a seeded synthetic tender corpus to Parquet')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--end', type=date.fromisoformat, default=None, help='Last publication date (YYYY-MM-DD, default today)')
+    parser.add_argument('--days', type=int, default=365, help='Publication window length')
+    parser.add_argument('--out', default='data/tenders.parquet')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    path = write_parquet(args.out, args.rows, args.seed, args.end, args.days)
+    print(f"Wrote {args.rows:,} tenders to {path} ({path.stat().st_size / 1e6:.1f} MB) "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
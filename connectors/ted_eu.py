@@ -2,26 +2,136 @@
 TED (Tenders Electronic Daily) - EU Procurement Connector
 Official EU procurement portal with 600B+ EUR annually
 """
+import os
+import time
 import requests
 import pandas as pd
+from functools import lru_cache
+from pathlib import Path
 from typing import Dict, List, Optional
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from .base import ProcurementConnector
+from .synthetic import generate_awards, generate_tenders
+from .ted_parser import AWARD_FIELDS, NoticeColumns, parse_notices
+from core.config import get_setting
+from storage.aggregates import compute_aggregates
+from storage.awards import AWARD_COLUMNS, filter_awards
+from storage.tender_store import filter_tenders
+
+# eForms fields requested from the search API
+NOTICE_FIELDS = [
+    'publication-number', 'notice-title', 'buyer-name', 'buyer-country',
+    'classification-cpv', 'BT-27-Procedure', 'BT-27-Procedure-Currency',
+    'publication-date', 'deadline-receipt-tender-date-lot', 'procedure-type'
+]
+
+AWARD_NOTICE_FIELDS = [
+    'publication-number', 'BT-125(i)-Lot', 'winner-name', 'winner-country', 'buyer-name',
+    'buyer-country', 'classification-cpv', 'BT-720-Tender', 'BT-720-Tender-Currency',
+    'BT-27-Procedure', 'BT-759-LotResult', 'BT-1451-Contract', 'publication-date'
+]
+
+# Result notices: contract award notices (eForms subtypes 29-37)
+AWARD_NOTICE_TYPE = 'can-standard'
+
+TENDER_COLUMNS = [
+    'tender_id', 'title', 'country', 'country_name', 'cpv_code', 'cpv_description',
+    'value_eur', 'currency', 'published_date', 'deadline', 'buyer', 'procedure_type',
+    'source', 'url'
+]
+
+# TED uses ISO 3166-1 alpha-3 country codes
+COUNTRY_CODES = {
+    'DEU': 'DE', 'FRA': 'FR', 'ESP': 'ES', 'ITA': 'IT', 'NLD': 'NL',
+    'BEL': 'BE', 'POL': 'PL', 'SWE': 'SE', 'AUT': 'AT', 'DNK': 'DK'
+}
+
+COUNTRY_NAMES = {
+    'DE': 'Germany', 'FR': 'France', 'ES': 'Spain', 'IT': 'Italy',
+    'NL': 'Netherlands', 'BE': 'Belgium', 'PL': 'Poland',
+    'SE': 'Sweden', 'AT': 'Austria', 'DK': 'Denmark'
+}
+
+CPV_CATEGORIES = {
+    '48000000': 'Software package and information systems',
+    '72000000': 'IT services: consulting, software development',
+    '30200000': 'Computer equipment and supplies',
+    '45000000': 'Construction work',
+    '79000000': 'Business services',
+    '85000000': 'Health and social work services',
+    '90000000': 'Sewage, refuse, cleaning services'
+}
+
+CPV_DIVISIONS = {code[:2]: description for code, description in CPV_CATEGORIES.items()}
+
+PROCEDURE_TYPES = {'open': 'Open', 'restricted': 'Restricted', 'neg-w-call': 'Negotiated', 'neg-wo-call': 'Negotiated'}
+
+# The search API returns at most this many notices per page
+MAX_PAGE_SIZE = 250
+
+# Demo-mode corpus: seed and publication window (days up to today)
+SAMPLE_SEED = 2026
+SAMPLE_DAYS = 180
+
+
+@lru_cache(maxsize=1)
+def sample_corpus(day: date) -> pd.DataFrame:
+    """
+    Demo-mode tenders for one day, newest first: the Parquet corpus at
+    SAMPLE_CORPUS / `sources.ted_eu.sample_corpus` if set, otherwise
+    `sources.ted_eu.sample_rows` generated tenders
+    """
+    path = os.getenv('SAMPLE_CORPUS') or get_setting('sources.ted_eu.sample_corpus')
+    if path and Path(path).exists():
+        corpus = pd.read_parquet(path)
+    else:
+        rows = int(get_setting('sources.ted_eu.sample_rows', 5000))
+        corpus = generate_tenders(rows, seed=SAMPLE_SEED, end=day, days=SAMPLE_DAYS)
+    return corpus.sort_values('published_date', ascending=False, kind='stable').reset_index(drop=True)
+
+
+@lru_cache(maxsize=2)
+def sample_awards(day: date) -> pd.DataFrame:
+    """Demo-mode awards for the sample tenders closed by `day`, newest first"""
+    awards = generate_awards(sample_corpus(day), seed=SAMPLE_SEED, end=day)
+    return awards.sort_values('award_date', ascending=False, kind='stable').reset_index(drop=True)
 
 
 class TEDConnector(ProcurementConnector):
     """Connector for TED (EU) procurement data"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 live: bool = False, timeout: float = 30, max_retries: int = 3):
+        """
+        Args:
+            api_key: TED API key (optional for search)
+            base_url: API root, e.g. a local mock (default: the public v3 API)
+            live: Query the API; otherwise return generated sample data
+            timeout: Per-request timeout in seconds
+            max_retries: Retries on 429/5xx before giving up
+        """
         super().__init__(api_key)
-        self.base_url = "https://api.ted.europa.eu/v3"
+        self.base_url = (base_url or "https://api.ted.europa.eu/v3").rstrip('/')
         self.source_name = "TED (EU)"
         self.headers = {}
+        self.live = live
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._session = requests.Session()
         
         if api_key:
             self.headers['Authorization'] = f'Bearer {api_key}'
     
-    def search_tenders(self, filters: Dict = None) -> pd.DataFrame:
+    @classmethod
+    def from_config(cls) -> 'TEDConnector':
+        """Connector for `sources.ted_eu` in config.yml (TED_API_URL / TED_LIVE override)"""
+        return cls(
+            api_key=get_setting('sources.ted_eu.api_key') or None,
+            base_url=os.getenv('TED_API_URL') or get_setting('sources.ted_eu.api_url'),
+            live=os.getenv('TED_LIVE', str(get_setting('sources.ted_eu.live', False))).lower() == 'true'
+        )
+    
+    def search_tenders(self, filters: Dict = None, raise_errors: bool = False) -> pd.DataFrame:
         """
         Search for EU tenders
         
@@ -32,29 +142,53 @@ class TEDConnector(ProcurementConnector):
             - max_value: Maximum tender value in EUR
             - deadline_from: Start of deadline range (YYYY-MM-DD)
             - deadline_to: End of deadline range (YYYY-MM-DD)
+            - published_from: Earliest publication date (YYYY-MM-DD)
             - keywords: Search keywords
             - limit: Number of results (default 100)
+        
+        Upstream failures fall back to sample data unless `raise_errors`
+        (the refresh path must not store sample rows as real ones).
         """
         filters = filters or {}
         
         # TED Search API endpoint (public, no auth needed for search)
         search_url = f"{self.base_url}/notices/search"
         
-        # Build query parameters
-        params = {
-            'pageSize': filters.get('limit', 100),
-            'pageNum': 1
-        }
+        limit = int(filters.get('limit', 100))
         
-        # Add filters to query
+        try:
+            if not self.live:
+                # Demo mode: generated sample data
+                return self._get_sample_tenders(filters)
+            
+            notices = self._search_notices(search_url, self._query(filters), limit)
+            return self._columns_to_frame(notices)
+            
+        except Exception as e:
+            if raise_errors:
+                raise
+            print(f"TED API Error: {e}")
+            return self._get_sample_tenders(filters)
+    
+    def _query(self, filters: Dict, value_field: str = 'BT-27-Procedure') -> str:
+        """Expert-search query for the connector-style filters (value bounds on `value_field`)"""
         query_parts = []
         
+        if 'notice_type' in filters:
+            query_parts.append(f'notice-type={filters["notice_type"]}')
+        
         if 'country' in filters:
             query_parts.append(f'BT-05-Lot={filters["country"]}')
         
         if 'cpv_code' in filters:
             query_parts.append(f'BT-262-Lot={filters["cpv_code"]}*')
         
+        if 'min_value' in filters:
+            query_parts.append(f'{value_field}>={filters["min_value"]}')
+        
+        if 'max_value' in filters:
+            query_parts.append(f'{value_field}<={filters["max_value"]}')
+        
         if 'keywords' in filters:
             query_parts.append(f'*{filters["keywords"]}*')
         
@@ -64,121 +198,125 @@ class TEDConnector(ProcurementConnector):
         if 'deadline_to' in filters:
             query_parts.append(f'BT-131-Lot<={filters["deadline_to"]}')
         
-        if query_parts:
-            params['q'] = ' AND '.join(query_parts)
+        if 'published_from' in filters:
+            query_parts.append(f'publication-date>={str(filters["published_from"]).replace("-", "")}')
         
-        try:
-            # Note: For demo without API key, return sample data
-            # In production, uncomment the API call below
-            
-            # response = requests.get(search_url, params=params, headers=self.headers, timeout=30)
-            # response.raise_for_status()
-            # data = response.json()
-            
-            # For now, return sample data structure
-            return self._get_sample_tenders(filters)
-            
-        except Exception as e:
-            print(f"TED API Error: {e}")
-            return self._get_sample_tenders(filters)
+        return ' AND '.join(query_parts)
     
-    def _get_sample_tenders(self, filters: Dict = None) -> pd.DataFrame:
+    def _post(self, url: str, body: Dict) -> requests.Response:
         """
-        Generate realistic sample tender data
-        This simulates TED API response for demo purposes
+        POST with retries (honours Retry-After on 429, backs off on 5xx);
+        returns the response with its body still unread
         """
-        from datetime import timedelta
-        import random
-        
-        # Sample countries
-        countries = ['DE', 'FR', 'ES', 'IT', 'NL', 'BE', 'PL', 'SE', 'AT', 'DK']
-        country_names = {
-            'DE': 'Germany', 'FR': 'France', 'ES': 'Spain', 'IT': 'Italy',
-            'NL': 'Netherlands', 'BE': 'Belgium', 'PL': 'Poland', 
-            'SE': 'Sweden', 'AT': 'Austria', 'DK': 'Denmark'
-        }
+        for attempt in range(self.max_retries + 1):
+            response = self._session.post(url, json=body, headers=self.headers, timeout=self.timeout, stream=True)
+            retryable = response.status_code == 429 or response.status_code >= 500
+            if not retryable or attempt == self.max_retries:
+                response.raise_for_status()
+                return response
+            
+            response.close()
+            retry_after = response.headers.get('Retry-After', '')
+            delay = float(retry_after) if retry_after.replace('.', '', 1).isdigit() else 0.5 * 2 ** attempt
+            time.sleep(min(delay, 30))
+    
+    def _search_notices(self, url: str, query: str, limit: int, fields: List[str] = NOTICE_FIELDS,
+                        columns: Optional[NoticeColumns] = None) -> NoticeColumns:
+        """Page through the search API, streaming notices into column buffers"""
+        columns = columns if columns is not None else NoticeColumns()
+        # One page size throughout: page N starts at (N - 1) * page_size
+        page_size = min(MAX_PAGE_SIZE, limit)
+        page = 1
+        while len(columns) < limit:
+            response = self._post(url, {
+                'query': query,
+                'fields': fields,
+                'page': page,
+                'limit': page_size,
+                'paginationMode': 'PAGE_NUMBER'
+            })
+            with response:
+                response.raw.decode_content = True
+                parsed = parse_notices(response.raw, columns)
+            # A short page is the last one; so is reaching the reported total, if any
+            if parsed < page_size or (columns.total is not None and len(columns) >= columns.total):
+                break
+            page += 1
+        columns.truncate(limit)
+        return columns
+    
+    def _columns_to_frame(self, notices: NoticeColumns) -> pd.DataFrame:
+        """Map parsed eForms columns onto the platform's tender columns (one pass per column)"""
+        raw = {column: pd.Series(values, dtype=object) for column, values in notices.columns.items()}
+        if len(notices) == 0:
+            return pd.DataFrame(columns=TENDER_COLUMNS)
         
-        # Sample CPV categories
-        cpv_categories = {
-            '48000000': 'Software package and information systems',
-            '72000000': 'IT services: consulting, software development',
-            '30200000': 'Computer equipment and supplies',
-            '45000000': 'Construction work',
-            '79000000': 'Business services',
-            '85000000': 'Health and social work services',
-            '90000000': 'Sewage, refuse, cleaning services'
-        }
+        number = raw['notice_id'].fillna('').astype(str)
+        country = raw['country'].map(COUNTRY_CODES).fillna(raw['country'])
+        cpv_code = raw['cpv_code'].fillna('').astype(str)
+        procedure = raw['procedure_type'].map(PROCEDURE_TYPES).fillna(raw['procedure_type'])
+        amounts = self.normalize_values(raw['value'], default_currency=raw['currency'].fillna('EUR'))
+        published = self.normalize_dates(raw['published_date'], 'published_date')
         
-        # Sample titles
-        title_templates = [
-            "Supply and implementation of {service}",
-            "Framework agreement for {service}",
-            "Provision of {service}",
-            "{service} - Multi-year contract",
-            "Consulting services for {service}"
-        ]
-        
-        services = [
-            "cloud computing infrastructure",
-            "enterprise resource planning system",
-            "cybersecurity services",
-            "data analytics platform",
-            "digital transformation",
-            "AI/ML solutions",
-            "electronic procurement system",
-            "healthcare IT system"
-        ]
-        
-        # Generate sample tenders
-        num_samples = min(filters.get('limit', 50), 100) if filters else 50
-        tenders = []
-        
-        base_date = datetime.now()
-        
-        for i in range(num_samples):
-            country = random.choice(countries)
-            cpv_code = random.choice(list(cpv_categories.keys()))
-            service = random.choice(services)
-            title_template = random.choice(title_templates)
-            
-            # Generate realistic dates
-            published = base_date - timedelta(days=random.randint(1, 30))
-            deadline = published + timedelta(days=random.randint(30, 90))
-            
-            # Generate realistic values
-            value = random.randint(100000, 50000000)
-            
-            tender = {
-                'tender_id': f'TED-{2026000000 + i}',
-                'title': title_template.format(service=service),
-                'country': country,
-                'country_name': country_names[country],
-                'cpv_code': cpv_code,
-                'cpv_description': cpv_categories[cpv_code],
-                'value_eur': value,
-                'currency': 'EUR',
-                'published_date': published.strftime('%Y-%m-%d'),
-                'deadline': deadline.strftime('%Y-%m-%d'),
-                'buyer': f'{country_names[country]} Government Agency',
-                'procedure_type': random.choice(['Open', 'Restricted', 'Negotiated']),
-                'source': 'TED (EU)',
-                'url': f'https://ted.europa.eu/udl?uri=TED:NOTICE:{2026000000 + i}'
-            }
-            
-            # Apply filters
-            if filters:
-                if 'country' in filters and tender['country'] != filters['country']:
-                    continue
-                if 'cpv_code' in filters and not tender['cpv_code'].startswith(filters['cpv_code'][:2]):
-                    continue
-                if 'min_value' in filters and tender['value_eur'] < filters['min_value']:
-                    continue
-                if 'max_value' in filters and tender['value_eur'] > filters['max_value']:
-                    continue
-            
-            tenders.append(tender)
+        return pd.DataFrame({
+            'tender_id': 'TED-' + number,
+            'title': raw['title'],
+            'country': country,
+            'country_name': country.map(COUNTRY_NAMES).fillna(country),
+            'cpv_code': cpv_code,
+            'cpv_description': cpv_code.str[:2].map(CPV_DIVISIONS).fillna(''),
+            'value_eur': self.convert_to_eur(amounts.amount, amounts.currency, published),
+            'currency': amounts.currency,
+            'published_date': published.dt.strftime('%Y-%m-%d'),
+            'deadline': self.normalize_dates(raw['deadline'], 'deadline').dt.strftime('%Y-%m-%d'),
+            'buyer': raw['buyer'],
+            'procedure_type': procedure,
+            'source': self.source_name,
+            'url': 'https://ted.europa.eu/en/notice/-/detail/' + number
+        })[TENDER_COLUMNS]
+    
+    def _award_columns_to_frame(self, notices: NoticeColumns) -> pd.DataFrame:
+        """Map parsed result-notice columns onto the award columns"""
+        raw = {column: pd.Series(values, dtype=object) for column, values in notices.columns.items()}
+        if len(notices) == 0:
+            return pd.DataFrame(columns=AWARD_COLUMNS)
         
-        return pd.DataFrame(tenders)
+        number = raw['notice_id'].fillna('').astype(str)
+        country = raw['country'].map(COUNTRY_CODES).fillna(raw['country'])
+        winner_country = raw['winner_country'].map(COUNTRY_CODES).fillna(raw['winner_country'])
+        amounts = self.normalize_values(raw['value'], 'awarded_value', default_currency=raw['currency'].fillna('EUR'))
+        estimates = self.normalize_values(raw['estimate'], 'estimated_value', default_currency=amounts.currency)
+        awarded = self.normalize_dates(raw['award_date'], 'award_date')
+        
+        return pd.DataFrame({
+            'award_id': 'TED-' + number,
+            'tender_id': 'TED-' + raw['tender_ref'].fillna(number).astype(str),
+            'winner': raw['winner'],
+            'winner_country': winner_country.fillna(country),
+            'awarded_value_eur': self.convert_to_eur(amounts.amount, amounts.currency, awarded, 'awarded_value_eur'),
+            'estimated_value_eur': self.convert_to_eur(estimates.amount, estimates.currency, awarded, 'estimated_value_eur'),
+            'currency': amounts.currency,
+            'bids': pd.to_numeric(raw['bids'], errors='coerce').astype('Int64'),
+            'award_date': awarded.dt.strftime('%Y-%m-%d'),
+            'buyer': raw['buyer'],
+            'country': country,
+            'cpv_code': raw['cpv_code'].fillna('').astype(str),
+            'source': self.source_name,
+            'url': 'https://ted.europa.eu/en/notice/-/detail/' + number
+        })[AWARD_COLUMNS]
+    
+    def _get_sample_tenders(self, filters: Dict = None) -> pd.DataFrame:
+        """
+        Sample tenders for demo mode, drawn from a seeded synthetic corpus
+        so the same tender_id always carries the same data
+        """
+        filters = {'limit': 50, **(filters or {})}
+        return filter_tenders(sample_corpus(date.today()), filters)
+    
+    def _get_sample_awards(self, filters: Dict = None) -> pd.DataFrame:
+        """Sample awards for demo mode, concluding the sample tenders"""
+        filters = {'limit': 50, **(filters or {})}
+        return filter_awards(sample_awards(date.today()), filters)
     
     def get_tender_details(self, tender_id: str) -> Dict:
         """Get detailed information for a specific tender"""
@@ -193,33 +331,40 @@ class TEDConnector(ProcurementConnector):
             'status': 'active'
         }
     
-    def search_awards(self, filters: Dict = None) -> pd.DataFrame:
-        """Search for contract awards"""
-        
-        filters = filters or {}
-        filters['notice_type'] = 'award'
+    def search_awards(self, filters: Dict = None, raise_errors: bool = False) -> pd.DataFrame:
+        """
+        Search for contract awards (result notices), one row per award with
+        the winner, awarded value, bids received and the tender_id of the
+        contract notice it concludes
+
+        Filters: as search_tenders; min_value / max_value apply to the awarded value
+        (`raise_errors` as well)
+        """
+        filters = {**(filters or {}), 'notice_type': AWARD_NOTICE_TYPE}
+        limit = int(filters.get('limit', 100))
         
-        # Similar to search_tenders but filtered for awards
-        return self.search_tenders(filters)
+        try:
+            if not self.live:
+                return self._get_sample_awards(filters)
+            
+            notices = self._search_notices(
+                f"{self.base_url}/notices/search", self._query(filters, value_field='BT-720-Tender'), limit,
+                fields=AWARD_NOTICE_FIELDS, columns=NoticeColumns(AWARD_FIELDS)
+            )
+            return self._award_columns_to_frame(notices)
+            
+        except Exception as e:
+            if raise_errors:
+                raise
+            print(f"TED API Error: {e}")
+            return self._get_sample_awards(filters)
     
     def get_statistics(self, filters: Dict = None) -> Dict:
         """Get procurement statistics"""
         
         tenders = self.search_tenders(filters)
         
-        if len(tenders) == 0:
-            return {}
-        
-        return {
-            'total_tenders': len(tenders),
-            'total_value': tenders['value_eur'].sum(),
-            'average_value': tenders['value_eur'].mean(),
-            'min_value': tenders['value_eur'].min(),
-            'max_value': tenders['value_eur'].max(),
-            'countries': tenders['country'].nunique(),
-            'top_countries': tenders.groupby('country_name')['value_eur'].sum().sort_values(ascending=False).head(5).to_dict(),
-            'top_categories': tenders.groupby('cpv_description')['tender_id'].count().sort_values(ascending=False).head(5).to_dict()
-        }
+        return compute_aggregates(tenders, ['country', 'category']).to_stats()
 
 
 # Quick test
@@ -0,0 +1,152 @@
+"""
+Streaming parser for TED v3 search responses
+
+Notices are decoded incrementally (ijson when installed, otherwise the
+standard json module) and each eForms field is appended straight to a
+per-column buffer, so a page never exists as a list of notice dicts.
+Normalization then runs once per column (see TEDConnector).
+"""
+import json
+from decimal import Decimal
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import ijson
+except ImportError:  # optional: falls back to a full json.load per page
+    ijson = None
+
+# Column -> eForms fields carrying it (search API alias first, then BT ids)
+FIELDS = {
+    'notice_id': ['publication-number'],
+    'title': ['notice-title', 'BT-21-Procedure', 'BT-21-Lot'],
+    'buyer': ['buyer-name', 'BT-500-Organization-Company'],
+    'country': ['buyer-country', 'BT-514-Organization-Company', 'place-of-performance-country-lot', 'BT-5141-Lot'],
+    'cpv_code': ['classification-cpv', 'BT-262-Procedure', 'BT-262-Lot'],
+    'value': ['BT-27-Procedure', 'BT-27-Lot', 'estimated-value-proc'],
+    'currency': ['BT-27-Procedure-Currency', 'BT-27-Lot-Currency', 'estimated-value-cur-proc'],
+    'published_date': ['publication-date', 'BT-05(a)-notice', 'dispatch-date'],
+    'deadline': ['deadline-receipt-tender-date-lot', 'BT-131(d)-Lot', 'BT-131-Lot'],
+    'procedure_type': ['procedure-type', 'BT-105-Procedure'],
+}
+
+# Result (contract award) notices; `tender_ref` is the publication number of
+# the contract notice the award concludes
+AWARD_FIELDS = {
+    'notice_id': ['publication-number'],
+    'tender_ref': ['BT-125(i)-Lot', 'BT-1251-Lot'],
+    'winner': ['winner-name'],
+    'winner_country': ['winner-country'],
+    'buyer': FIELDS['buyer'],
+    'country': FIELDS['country'],
+    'cpv_code': FIELDS['cpv_code'],
+    'value': ['BT-720-Tender', 'BT-161-NoticeResult'],
+    'currency': ['BT-720-Tender-Currency', 'BT-161-NoticeResult-Currency'],
+    'estimate': ['BT-27-Procedure'],
+    'bids': ['BT-759-LotResult', 'received-submissions-count'],
+    'award_date': ['BT-1451-Contract', 'winner-decision-date', 'publication-date'],
+}
+
+
+def field_index(fields: Dict[str, List[str]]) -> Dict[str, Tuple[str, int]]:
+    """Field name -> (column, priority); lower priority wins when a notice has several"""
+    return {
+        field: (column, priority)
+        for column, aliases in fields.items()
+        for priority, field in enumerate(aliases)
+    }
+
+
+FIELD_INDEX = field_index(FIELDS)
+
+# Multilingual text: this language is preferred, otherwise the first one seen
+PREFERRED_LANGUAGE = 'eng'
+
+NOTICE_PREFIX = 'notices.item'
+
+
+class NoticeColumns:
+    """Column buffers filled one notice at a time"""
+
+    def __init__(self, fields: Dict[str, List[str]] = FIELDS):
+        self.columns: Dict[str, List] = {column: [] for column in fields}
+        self.index = FIELD_INDEX if fields is FIELDS else field_index(fields)
+        self.total: Optional[int] = None
+
+    def __len__(self):
+        return len(self.columns['notice_id'])
+
+    def append(self, row: Dict[str, Tuple[int, object]]):
+        for column, values in self.columns.items():
+            values.append(row[column][1] if column in row else None)
+
+    def truncate(self, length: int):
+        """Keep the first `length` notices"""
+        for values in self.columns.values():
+            del values[length:]
+
+
+def _events_from_object(value, prefix: str = '') -> Iterator[Tuple[str, str, object]]:
+    """ijson-compatible (prefix, event, value) events for an already decoded document"""
+    if isinstance(value, dict):
+        yield prefix, 'start_map', None
+        for key, item in value.items():
+            yield prefix, 'map_key', key
+            yield from _events_from_object(item, f'{prefix}.{key}' if prefix else key)
+        yield prefix, 'end_map', None
+    elif isinstance(value, list):
+        yield prefix, 'start_array', None
+        for item in value:
+            yield from _events_from_object(item, f'{prefix}.item' if prefix else 'item')
+        yield prefix, 'end_array', None
+    elif value is None:
+        yield prefix, 'null', None
+    elif isinstance(value, bool):
+        yield prefix, 'boolean', value
+    elif isinstance(value, (int, float)):
+        yield prefix, 'number', value
+    else:
+        yield prefix, 'string', value
+
+
+def iter_events(stream: BinaryIO) -> Iterator[Tuple[str, str, object]]:
+    """Parse events from a byte stream (incrementally when ijson is available)"""
+    if ijson is not None:
+        return ijson.parse(stream)
+    return _events_from_object(json.load(stream))
+
+
+def parse_notices(stream: BinaryIO, columns: NoticeColumns) -> int:
+    """
+    Append the notices of one search response page to `columns`
+
+    Returns:
+        Number of notices parsed from this page
+    """
+    parsed = 0
+    row: Optional[Dict[str, Tuple[int, object]]] = None
+    depth = len(NOTICE_PREFIX.split('.'))
+
+    for prefix, event, value in iter_events(stream):
+        if prefix == NOTICE_PREFIX:
+            if event == 'start_map':
+                row = {}
+            elif event == 'end_map' and row is not None:
+                columns.append(row)
+                parsed += 1
+                row = None
+            continue
+
+        if row is not None and event in ('string', 'number'):
+            path = prefix.split('.')
+            target = columns.index.get(path[depth])
+            if target is None:
+                continue
+            column, priority = target
+            # Within a field: the preferred language beats the first value seen
+            rank = priority * 2 + (0 if PREFERRED_LANGUAGE in path[depth + 1:] else 1)
+            if column not in row or rank < row[column][0]:
+                row[column] = (rank, float(value) if isinstance(value, Decimal) else value)
+        elif prefix == 'totalNoticeCount' and event == 'number':
+            columns.total = int(value)
+
+    return parsed
@@ -0,0 +1,6 @@
+"""
+Shared application services (auth, caching, metrics)
+"""
+from .auth import TokenCache, AuthError, require_user, token_cache
+
+__all__ = ['TokenCache', 'AuthError', 'require_user', 'token_cache']
@@ -0,0 +1,123 @@
+"""
+JWT authentication dependency with a bounded cache of verified tokens
+"""
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Dict, Optional
+
+import jwt
+from fastapi import Depends, HTTPException, Request
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+
+SECRET_KEY = os.getenv("SECRET_KEY", "change-this-secret-key-in-production")
+ALGORITHM = "HS256"
+ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
+
+security = HTTPBearer()
+
+
+class AuthError(HTTPException):
+    """401 raised by the auth dependency"""
+
+    def __init__(self, detail: str = "Invalid token"):
+        super().__init__(
+            status_code=401,
+            detail=detail,
+            headers={'WWW-Authenticate': 'Bearer'}
+        )
+
+
+class TokenCache:
+    """
+    Bounded LRU of verified token -> claims
+
+    Only tokens that passed signature verification are stored. Entries are
+    dropped once their `exp` claim has passed, so an expired token always
+    goes back through `jwt.decode` and is rejected there.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._entries: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.route_metrics = defaultdict(lambda: {'hits': 0, 'misses': 0, 'rejected': 0})
+
+    def get(self, token: str) -> Optional[Dict]:
+        """Return cached claims for a token, or None if absent or expired"""
+        with self._lock:
+            claims = self._entries.get(token)
+            if claims is None:
+                return None
+            exp = claims.get('exp')
+            if exp is not None and exp <= time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return claims
+
+    def put(self, token: str, claims: Dict):
+        """Store verified claims, evicting the least recently used entry"""
+        with self._lock:
+            self._entries[token] = claims
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def verify(self, token: str, route: str = '') -> Dict:
+        """Return claims for a token, decoding it only on a cache miss"""
+        metrics = self.route_metrics[route]
+
+        claims = self.get(token)
+        if claims is not None:
+            metrics['hits'] += 1
+            return claims
+
+        metrics['misses'] += 1
+        try:
+            claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except jwt.ExpiredSignatureError:
+            metrics['rejected'] += 1
+            raise AuthError("Token expired")
+        except jwt.InvalidTokenError:
+            metrics['rejected'] += 1
+            raise AuthError("Invalid token")
+
+        self.put(token, claims)
+        return claims
+
+    def stats(self) -> Dict:
+        """Cache size and per-route hit/miss/rejected counters"""
+        with self._lock:
+            size = len(self._entries)
+        return {
+            'size': size,
+            'max_size': self.max_size,
+            'routes': {route: dict(counts) for route, counts in self.route_metrics.items()}
+        }
+
+
+token_cache = TokenCache(max_size=int(os.getenv("TOKEN_CACHE_SIZE", 1024)))
+
+
+async def require_user(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> str:
+    """FastAPI dependency returning the authenticated user's email"""
+    route = request.scope.get('route')
+    route_path = getattr(route, 'path', request.url.path)
+
+    claims = token_cache.verify(credentials.credentials, route_path)
+    email = claims.get('email')
+
+    if not email:
+        token_cache.route_metrics[route_path]['rejected'] += 1
+        raise AuthError("Invalid token")
+
+    return email
@@ -0,0 +1,94 @@
+"""
+Fan-out broadcaster for live tender events (Server-Sent Events)
+
+Each subscriber owns a small bounded queue. Publishing is O(subscribers) and
+never blocks: when a slow client's queue is full its oldest event is dropped.
+"""
+import asyncio
+import json
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class Subscription:
+    """One connected client and its filters"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, country: Optional[str] = None,
+                 cpv_code: Optional[str] = None, max_queue: int = 100):
+        self.loop = loop
+        self.country = country.upper() if country else None
+        self.cpv_code = cpv_code
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.dropped = 0
+
+    def matches(self, tender: Dict) -> bool:
+        if self.country and tender.get('country') != self.country:
+            return False
+        if self.cpv_code and not str(tender.get('cpv_code', '')).startswith(self.cpv_code):
+            return False
+        return True
+
+    def offer(self, event: str):
+        """Enqueue without blocking (runs on the subscriber's loop)"""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+
+class Broadcaster:
+    """Pushes newly ingested tenders to matching subscribers"""
+
+    def __init__(self, max_queue: int = 100):
+        self.max_queue = max_queue
+        self._subscribers: List[Subscription] = []
+        self._lock = threading.Lock()
+        self.published = 0
+
+    def subscribe(self, country: Optional[str] = None, cpv_code: Optional[str] = None) -> Subscription:
+        """Register a client; must be called from inside the event loop"""
+        subscription = Subscription(asyncio.get_running_loop(), country, cpv_code, self.max_queue)
+        with self._lock:
+            self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, tenders: 'pd.DataFrame'):
+        """Send each tender row to the subscribers whose filters match"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        if not subscribers or len(tenders) == 0:
+            return
+
+        records = json.loads(tenders.to_json(orient='records', date_format='iso'))
+        for tender in records:
+            event = format_event(tender, event='tender', event_id=tender.get('tender_id'))
+            for subscription in subscribers:
+                if subscription.matches(tender):
+                    try:
+                        subscription.loop.call_soon_threadsafe(subscription.offer, event)
+                    except RuntimeError:  # loop closed, client is gone
+                        self.unsubscribe(subscription)
+            self.published += 1
+
+
+def format_event(data: Dict, event: Optional[str] = None, event_id: Optional[str] = None) -> str:
+    """Serialize one SSE message"""
+    lines = []
+    if event_id:
+        lines.append(f'id: {event_id}')
+    if event:
+        lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data, separators=(",", ":"))}')
+    return '\n'.join(lines) + '\n\n'
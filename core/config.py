@@ -0,0 +1,44 @@
+"""
+Loader for config.yml with ${ENV_VAR} expansion
+"""
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict
+
+import yaml
+
+CONFIG_PATH = Path(__file__).parent.parent / 'config.yml'
+
+_ENV_PATTERN = re.compile(r'\$\{(\w+)\}')
+
+
+def _expand(value: Any) -> Any:
+    """Replace ${VAR} references with environment values (empty if unset)"""
+    if isinstance(value, str):
+        return _ENV_PATTERN.sub(lambda m: os.getenv(m.group(1), ''), value)
+    if isinstance(value, dict):
+        return {k: _expand(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_expand(v) for v in value]
+    return value
+
+
+@lru_cache(maxsize=1)
+def load_config() -> Dict:
+    """Parsed config.yml (cached for the life of the process)"""
+    if not CONFIG_PATH.exists():
+        return {}
+    with open(CONFIG_PATH) as f:
+        return _expand(yaml.safe_load(f) or {})
+
+
+def get_setting(path: str, default: Any = None) -> Any:
+    """Dotted lookup, e.g. get_setting('sources.ted_eu.cache_hours', 6)"""
+    node = load_config()
+    for part in path.split('.'):
+        if not isinstance(node, dict) or part not in node:
+            return default
+        node = node[part]
+    return node
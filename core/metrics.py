@@ -0,0 +1,199 @@
+"""
+Lightweight metrics with Prometheus text exposition
+
+Timing spans feed latency histograms; point-in-time values (cache hit
+ratios, in-flight counts, store size) are read from registered collectors
+only when /metrics is scraped. With metrics disabled (`metrics.enabled` in
+config.yml or METRICS_ENABLED=0) every span is a shared no-op context.
+
+Observations made inside offload pool workers are captured with
+`call_captured` and replayed into the parent process registry.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .config import get_setting
+
+ENABLED = os.getenv('METRICS_ENABLED', str(get_setting('metrics.enabled', True))).lower() in ('1', 'true', 'yes')
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_NOOP = nullcontext()
+_histograms: Dict[str, 'Histogram'] = {}
+_collectors: List[Callable[[], Iterable[Tuple]]] = []
+
+# Observations buffered in an offload worker (see call_captured)
+_pending: Optional[List[Tuple]] = None
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple, extra: str = '') -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+class Histogram:
+    """Latency histogram with fixed buckets, one series per label set"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple, List] = {}
+        self._lock = threading.Lock()
+        _histograms[name] = self
+
+    def observe(self, value: float, *labelvalues):
+        if _pending is not None:
+            _pending.append((self.name, labelvalues, value))
+            return
+
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def time(self, *labelvalues):
+        """Context manager timing its body (no-op when metrics are disabled)"""
+        if not ENABLED:
+            return _NOOP
+        return self._timer(labelvalues)
+
+    @contextmanager
+    def _timer(self, labelvalues: Tuple):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labelvalues)
+
+    def expose(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = {k: (list(v[0]), v[1]) for k, v in self._series.items()}
+
+        for labelvalues, (counts, total) in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float('inf') else f'le="{bound!r}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, labelvalues, le)} {cumulative}')
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f'{self.name}_sum{labels} {total}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+def register_collector(collector: Callable[[], Iterable[Tuple]]):
+    """
+    Register a scrape-time collector
+
+    The collector returns `(name, type, help, samples)` tuples where samples
+    is a list of `(labels dict, value)`; type is 'counter' or 'gauge'.
+    """
+    _collectors.append(collector)
+
+
+def call_captured(func: Callable, *args):
+    """Run `func(*args)` in a pool worker; return (result, observations)"""
+    global _pending
+    _pending = []
+    try:
+        return func(*args), _pending
+    finally:
+        _pending = None
+
+
+def replay(observations: Iterable[Tuple]):
+    """Record observations captured in a worker process"""
+    for name, labelvalues, value in observations:
+        histogram = _histograms.get(name)
+        if histogram is not None:
+            histogram.observe(value, *labelvalues)
+
+
+def render() -> str:
+    """All metrics in the Prometheus text format (version 0.0.4)"""
+    lines = []
+    for histogram in _histograms.values():
+        lines.extend(histogram.expose())
+
+    for collector in _collectors:
+        try:
+            families = list(collector())
+        except Exception as e:
+            print(f"Metrics collector error: {e}")
+            continue
+        for name, kind, documentation, samples in families:
+            lines.append(f'# HELP {name} {documentation}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, value in samples:
+                names = tuple(labels)
+                lines.append(f'{name}{_format_labels(names, tuple(labels[n] for n in names))} {value}')
+
+    return '\n'.join(lines) + '\n'
+
+
+# Shared histograms
+UPSTREAM_SECONDS = Histogram(
+    'procurement_upstream_seconds', 'Connector call latency', ('connector', 'method'),
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+STAGE_SECONDS = Histogram(
+    'procurement_stage_seconds', 'Dashboard build stage latency', ('builder', 'stage')
+)
+REQUEST_SECONDS = Histogram(
+    'procurement_http_request_seconds', 'HTTP request latency by route', ('method', 'route')
+)
+
+# Connector calls currently running, by connector name
+upstream_inflight: Dict[str, int] = {}
+_inflight_lock = threading.Lock()
+
+
+@contextmanager
+def _upstream_span(connector: str, method: str):
+    with _inflight_lock:
+        upstream_inflight[connector] = upstream_inflight.get(connector, 0) + 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        UPSTREAM_SECONDS.observe(time.perf_counter() - started, connector, method)
+        with _inflight_lock:
+            upstream_inflight[connector] -= 1
+
+
+def upstream_span(connector: str, method: str):
+    """Time a connector call and count it as in flight while it runs"""
+    if not ENABLED:
+        return _NOOP
+    return _upstream_span(connector, method)
+
+
+register_collector(lambda: [(
+    'procurement_upstream_inflight', 'gauge', 'Connector calls in flight',
+    [({'connector': name}, count) for name, count in sorted(upstream_inflight.items())]
+)])
+
+
+if __name__ == '__main__':
+    with STAGE_SECONDS.time('demo', 'aggregate'):
+        time.sleep(0.01)
+    with upstream_span('demo', 'search_tenders'):
+        time.sleep(0.02)
+    print(render())
@@ -0,0 +1,82 @@
+"""
+Offload CPU-heavy work (Plotly figure building, aggregation) from the event
+loop to a bounded process or thread pool
+
+Identical in-flight builds are coalesced: callers passing the same `key`
+while a build is running await that build instead of starting another.
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Hashable, Optional
+
+from . import metrics
+from .singleflight import SingleFlight
+
+
+class Offloader:
+    """Bounded executor for CPU-bound builds with in-flight coalescing"""
+
+    def __init__(self, mode: str = 'process', max_workers: int = 2):
+        if mode not in ('process', 'thread', 'inline'):
+            raise ValueError(f"Unknown offload mode: {mode}")
+        self.mode = mode
+        self.max_workers = max_workers
+        self._executor: Optional[Executor] = None
+        self.flight = SingleFlight('offload')
+        self.stats = {'submitted': 0, 'fallbacks': 0}
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self.mode == 'inline':
+            return None
+        if self._executor is None:
+            if self.mode == 'process':
+                # spawn: never fork a process that already runs threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='offload')
+        return self._executor
+
+    async def _submit(self, func: Callable, *args):
+        executor = self._get_executor()
+        if executor is None:
+            return func(*args)
+
+        loop = asyncio.get_running_loop()
+        self.stats['submitted'] += 1
+        try:
+            if self.mode == 'process' and metrics.ENABLED:
+                # Bring the worker's timing spans back into this process
+                result, observations = await loop.run_in_executor(executor, metrics.call_captured, func, *args)
+                metrics.replay(observations)
+                return result
+            return await loop.run_in_executor(executor, func, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM); rebuild the pool and run in a thread this time
+            self.stats['fallbacks'] += 1
+            self._executor = None
+            return await asyncio.to_thread(func, *args)
+
+    async def run(self, func: Callable, *args, key: Optional[Hashable] = None):
+        """
+        Run `func(*args)` in the pool and return its result
+
+        Args:
+            func: Module-level (picklable) function
+            key: Identity of the build; concurrent calls with an equal key
+                 share one execution
+        """
+        if key is None:
+            return await self._submit(func, *args)
+
+        key = (func.__module__, func.__qualname__, key)
+        return await self.flight.run(key, self._submit, func, *args, in_thread=False)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
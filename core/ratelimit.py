@@ -0,0 +1,233 @@
+"""
+Token buckets shared by all workers: per-client rate limits and upstream quotas
+
+Buckets live in a small memory-mapped file in the cache directory, so every
+uvicorn worker draws from the same balance and a client cannot multiply its
+allowance by landing on different workers. A bucket is a fixed-size slot
+(key hash, tokens, last update) found by hashing its key; a take holds an
+exclusive lock on the file for a few microseconds. The file is created and
+mapped by the first take, not when the buckets are constructed.
+
+Behind a reverse proxy (Railway's, for one) every request arrives from the
+proxy's address, so clients must be told apart by the X-Forwarded-For hop
+the proxy adds (`ratelimit.trust_forwarded`); otherwise all users share a
+single bucket.
+"""
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from .config import get_setting
+
+try:
+    import fcntl
+except ImportError:  # Windows: buckets are shared by the threads of one worker only
+    fcntl = None
+
+SLOT = struct.Struct('<Qdd')  # key hash, tokens, updated (unix time)
+
+
+class QuotaExceeded(Exception):
+    """An upstream call was refused by the source's budget and no cached data can stand in"""
+
+    def __init__(self, source: str, retry_after: float):
+        super().__init__(f"Upstream quota for {source} exhausted")
+        self.source = source
+        self.retry_after = retry_after
+
+
+class SharedBuckets:
+    """Fixed table of token buckets in a memory-mapped file"""
+
+    def __init__(self, path: Path, slots: int = 4096):
+        self.path = Path(path)
+        self.slots = slots
+        self._fd: Optional[int] = None
+        self._map: Optional[mmap.mmap] = None
+        self._lock = threading.Lock()
+
+    def _open(self):
+        """Create (or join) the bucket file and map it; called under the lock"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        size = self.slots * SLOT.size
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if os.fstat(fd).st_size < size:
+            os.ftruncate(fd, size)
+        self._map = mmap.mmap(fd, size)
+        self._fd = fd
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        # Stable across processes (unlike hash()); 0 marks an empty slot
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'little') or 1
+
+    def take(self, key: str, rate: float, burst: float, cost: float = 1.0,
+             now: Optional[float] = None) -> Tuple[bool, float, float]:
+        """
+        Take `cost` tokens from `key`'s bucket (refilled at `rate` per second up to `burst`)
+
+        Returns:
+            (allowed, tokens left, seconds until `cost` tokens are available)
+        """
+        now = time.time() if now is None else now
+        digest = self._hash(key)
+        first = digest % self.slots
+        with self._lock:
+            if self._map is None:
+                self._open()
+            if fcntl:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                # Two candidate slots; a key not found takes the emptier-looking one
+                # (least recently used), starting from a full bucket
+                candidates = [first * SLOT.size, (first + 1) % self.slots * SLOT.size]
+                slots = [(offset, *SLOT.unpack_from(self._map, offset)) for offset in candidates]
+                match = [slot for slot in slots if slot[1] == digest]
+                if match:
+                    offset, _, tokens, updated = match[0]
+                    tokens = min(burst, tokens + max(0.0, now - updated) * rate)
+                else:
+                    offset = min(slots, key=lambda slot: slot[3])[0]
+                    tokens = burst
+
+                allowed = tokens >= cost
+                if allowed:
+                    tokens -= cost
+                SLOT.pack_into(self._map, offset, digest, tokens, now)
+            finally:
+                if fcntl:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+        wait = 0.0 if allowed else (cost - tokens) / rate if rate > 0 else math.inf
+        return allowed, tokens, wait
+
+    def close(self):
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                os.close(self._fd)
+                self._map, self._fd = None, None
+
+
+class RateLimiter:
+    """
+    Per-client token buckets for the API and dashboard routes
+
+    Clients are keyed by API key (X-API-Key, when it is one of the configured
+    keys) or else by IP address. A request costs one token plus one per
+    `rows_per_token` rows it asks for, so `limit=1000` costs more than a page;
+    limits are bounded to 1..`max_rows` as the routes bound them.
+    """
+
+    def __init__(self, buckets: SharedBuckets, rate: float = 5, burst: float = 60,
+                 key_rate: float = 20, key_burst: float = 240, rows_per_token: int = 250,
+                 max_rows: int = 1000, api_keys: Iterable[str] = (),
+                 paths: Iterable[str] = ('/api/', '/dashboard/'), trust_forwarded: bool = False):
+        self.buckets = buckets
+        self.rate, self.burst = float(rate), float(burst)
+        self.key_rate, self.key_burst = float(key_rate), float(key_burst)
+        self.rows_per_token = max(1, int(rows_per_token))
+        self.max_rows = max(1, int(max_rows))
+        self.api_keys = {key for key in api_keys if key}
+        self.paths = tuple(paths)
+        self.trust_forwarded = trust_forwarded
+        self.stats = {'allowed': 0, 'limited': 0}
+
+    @classmethod
+    def from_config(cls, buckets: SharedBuckets) -> 'RateLimiter':
+        """Limiter for the `ratelimit` section of config.yml"""
+        keys = get_setting('ratelimit.api_keys', '') or ''
+        # 'auto': trust the proxy when running on Railway, which sets RAILWAY_ENVIRONMENT
+        trust = str(os.getenv('RATELIMIT_TRUST_FORWARDED', get_setting('ratelimit.trust_forwarded', 'auto'))).lower()
+        if trust == 'auto':
+            trust = 'true' if os.getenv('RAILWAY_ENVIRONMENT') else 'false'
+        return cls(
+            buckets,
+            rate=float(get_setting('ratelimit.rate', 5)),
+            burst=float(get_setting('ratelimit.burst', 60)),
+            key_rate=float(get_setting('ratelimit.key_rate', 20)),
+            key_burst=float(get_setting('ratelimit.key_burst', 240)),
+            rows_per_token=int(get_setting('ratelimit.rows_per_token', 250)),
+            max_rows=int(get_setting('dashboards.max_limit', 1000)),
+            api_keys=[key.strip() for key in str(keys).split(',')],
+            paths=get_setting('ratelimit.paths', None) or ('/api/', '/dashboard/'),
+            trust_forwarded=trust in ('1', 'true', 'yes')
+        )
+
+    def applies(self, path: str) -> bool:
+        return path.startswith(self.paths)
+
+    def client(self, headers, host: Optional[str]) -> Tuple[str, bool]:
+        """Bucket key for a request and whether it carries a known API key"""
+        api_key = headers.get('x-api-key')
+        if api_key and api_key in self.api_keys:
+            return f'key:{api_key}', True
+        if self.trust_forwarded and headers.get('x-forwarded-for'):
+            # The last hop was added by our own proxy; earlier ones are client-supplied
+            host = headers['x-forwarded-for'].split(',')[-1].strip()
+        return f'ip:{host or "unknown"}', False
+
+    def cost(self, query_params) -> float:
+        try:
+            rows = int(query_params.get('limit') or 0)
+        except ValueError:
+            rows = 0
+        return 1 + max(0, min(rows, self.max_rows)) // self.rows_per_token
+
+    def check(self, headers, host: Optional[str], query_params) -> Tuple[bool, float, float]:
+        """(allowed, tokens left, retry after seconds) for one request"""
+        key, known = self.client(headers, host)
+        rate, burst = (self.key_rate, self.key_burst) if known else (self.rate, self.burst)
+        # Never ask for more than a full bucket, or the request could never pass
+        allowed, left, wait = self.buckets.take(key, rate, burst, min(self.cost(query_params), burst))
+        self.stats['allowed' if allowed else 'limited'] += 1
+        return allowed, left, wait
+
+
+class UpstreamBudget:
+    """
+    Upstream calls per hour each source may make, shared by all workers
+
+    Sources without `quota_per_hour` in config.yml are unlimited. A call the
+    budget refuses should be answered from cached data, however old.
+    """
+
+    def __init__(self, buckets: SharedBuckets, quotas: Dict[str, float]):
+        self.buckets = buckets
+        self.quotas = {source: float(quota) for source, quota in quotas.items() if quota}
+        self.stats = {source: {'allowed': 0, 'deferred': 0} for source in self.quotas}
+
+    @classmethod
+    def from_config(cls, buckets: SharedBuckets) -> 'UpstreamBudget':
+        sources = get_setting('sources') or {}
+        return cls(buckets, {name: settings.get('quota_per_hour') for name, settings in sources.items()})
+
+    def take(self, source: str) -> Tuple[bool, float]:
+        """Spend one call of `source`'s budget: (allowed, seconds until the next call is)"""
+        quota = self.quotas.get(source)
+        if not quota:
+            return True, 0.0
+        allowed, _, wait = self.buckets.take(f'upstream:{source}', quota / 3600, quota)
+        self.stats[source]['allowed' if allowed else 'deferred'] += 1
+        return allowed, wait
+
+
+if __name__ == '__main__':
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as directory:
+        buckets = SharedBuckets(Path(directory) / 'buckets')
+        results = [buckets.take('ip:10.0.0.1', rate=1, burst=5, now=100.0)[0] for _ in range(7)]
+        print(f"burst of 7 with capacity 5: {results}")
+        print(f"one second later: {buckets.take('ip:10.0.0.1', rate=1, burst=5, now=101.0)}")
+
+        started = time.perf_counter()
+        for i in range(100_000):
+            buckets.take(f'ip:10.0.{i % 250}.1', rate=5, burst=60)
+        print(f"{(time.perf_counter() - started) / 100_000 * 1e6:.1f} us per take")
+        buckets.close()
@@ -0,0 +1,128 @@
+"""
+Asyncio job scheduler started from the FastAPI lifespan
+
+Jobs are plain functions run in a worker thread at a fixed interval. When
+several uvicorn workers run the same schedule, a per-job file lock makes sure
+only one of them does the work for a given run; the others skip it.
+"""
+import asyncio
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """Exclusive lock on a file, shared across processes"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._fd: Optional[int] = None
+
+    def acquire(self, blocking: bool = False) -> bool:
+        """Take the lock; without `blocking`, return False if it is held"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+        except OSError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is None:
+            return
+        try:
+            if fcntl:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class Job:
+    """A function run every `interval` seconds"""
+
+    def __init__(self, name: str, func: Callable, interval: float, run_at_start: bool = True):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.run_at_start = run_at_start
+        self.last_run: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.runs = 0
+
+
+class Scheduler:
+    """Runs registered jobs on the event loop until stopped"""
+
+    def __init__(self):
+        self.jobs: List[Job] = []
+        self._tasks: List[asyncio.Task] = []
+
+    def add_job(self, name: str, func: Callable, interval: float, run_at_start: bool = True) -> Job:
+        job = Job(name, func, interval, run_at_start)
+        self.jobs.append(job)
+        return job
+
+    async def run_job(self, job: Job):
+        """Run a job once in a worker thread, recording its outcome"""
+        started = time.perf_counter()
+        try:
+            await asyncio.to_thread(job.func)
+            job.last_error = None
+        except Exception as e:
+            job.last_error = str(e)
+            print(f"Scheduler job '{job.name}' failed: {e}")
+        job.last_run = time.time()
+        job.last_duration = time.perf_counter() - started
+        job.runs += 1
+
+    async def _loop(self, job: Job):
+        if not job.run_at_start:
+            await asyncio.sleep(job.interval)
+        while True:
+            await self.run_job(job)
+            await asyncio.sleep(job.interval)
+
+    def start(self):
+        """Start one task per job; call from inside the running loop"""
+        self._tasks = [asyncio.create_task(self._loop(job), name=f'job:{job.name}') for job in self.jobs]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def status(self) -> Dict:
+        return {
+            job.name: {
+                'interval': job.interval,
+                'runs': job.runs,
+                'last_run': job.last_run,
+                'last_duration': job.last_duration,
+                'last_error': job.last_error
+            }
+            for job in self.jobs
+        }
@@ -0,0 +1,110 @@
+"""
+Single-flight request coalescing
+
+Concurrent calls with the same key share one execution and its result (or
+exception). Works from coroutines (`run`) and from plain threads
+(`run_sync`), which share one table of in-flight calls: a thread and a
+coroutine asking for the same key coalesce too. Each group keeps counters
+of how many calls were coalesced.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls"""
+
+    def __init__(self, name: str):
+        self.name = name
+        # Thread-safe futures, awaitable from coroutines via asyncio.wrap_future
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    def _join(self, key: Hashable) -> Tuple[Future, bool]:
+        """(the in-flight future for `key`, True if this caller must execute it)"""
+        with self._lock:
+            self.calls += 1
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = self._inflight[key] = Future()
+            self.executions += 1
+            return future, True
+
+    def _settle(self, key: Hashable, future: Future, result: Any = None, error: BaseException = None):
+        with self._lock:
+            del self._inflight[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    async def run(self, key: Hashable, func: Callable, *args, in_thread: bool = True):
+        """
+        Await `func(*args)`, sharing the execution with concurrent callers
+
+        Args:
+            key: Identity of the call (e.g. normalized filters)
+            func: Blocking function (run in a thread when `in_thread`) or a
+                  coroutine function when `in_thread` is False
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.shield(asyncio.wrap_future(future))
+
+        async def execute():
+            try:
+                result = await (asyncio.to_thread(func, *args) if in_thread else func(*args))
+            except BaseException as e:
+                self._settle(key, future, error=e)
+                raise
+            self._settle(key, future, result)
+            return result
+
+        # Shielded: the execution outlives a cancelled leader, followers still get its result
+        return await asyncio.shield(asyncio.ensure_future(execute()))
+
+    def run_sync(self, key: Hashable, func: Callable, *args):
+        """Blocking variant for worker threads"""
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+
+        try:
+            result = func(*args)
+        except BaseException as e:
+            self._settle(key, future, error=e)
+            raise
+        self._settle(key, future, result)
+        return result
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    def stats(self) -> Dict:
+        return {
+            'calls': self.calls,
+            'executions': self.executions,
+            'coalesced': self.coalesced,
+            'inflight': self.inflight
+        }
+
+
+if __name__ == '__main__':
+    import time
+
+    flight = SingleFlight('demo')
+
+    async def main():
+        slow = lambda q: (time.sleep(0.2), q.upper())[1]
+        results = await asyncio.gather(*(flight.run(('q', 'de'), slow, 'de') for _ in range(5)))
+        print(results, flight.stats())
+
+    asyncio.run(main())
@@ -1,6 +1,14 @@
 """
 Dashboard generators
-"""
-from .generator import DashboardGenerator
 
+Submodules are imported on first use, so the web app can import
+`dashboards.rendering` or `dashboards.pages` without loading plotly.
+"""
 __all__ = ['DashboardGenerator']
+
+
+def __getattr__(name):
+    if name == 'DashboardGenerator':
+        from .generator import DashboardGenerator
+        return DashboardGenerator
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,128 @@
+"""
+Server-side binning and downsampling for chart series
+
+Charts receive pre-aggregated points instead of raw rows, so the size of the
+embedded figure JSON is bounded by chart resolution, not by tender count.
+"""
+from typing import Tuple
+import numpy as np
+import pandas as pd
+
+# Bucket sizes (pandas period alias, label) tried in order until the series
+# fits in max_points
+TIME_FREQUENCIES = [('D', 'Day'), ('W', 'Week'), ('M', 'Month'), ('Q', 'Quarter'), ('Y', 'Year')]
+
+
+def format_eur(value: float) -> str:
+    """Compact EUR label, e.g. 1.2M"""
+    for threshold, suffix in ((1e9, 'B'), (1e6, 'M'), (1e3, 'K')):
+        if abs(value) >= threshold:
+            return f'€{value / threshold:.3g}{suffix}'
+    return f'€{value:.0f}'
+
+
+def log_value_bins(values, bins: int = 30) -> pd.DataFrame:
+    """
+    Histogram of positive values over log-spaced bins
+
+    Returns:
+        DataFrame with lower, upper, count and a readable label per bin
+    """
+    values = np.asarray(values, dtype=float)
+    values = values[np.isfinite(values) & (values > 0)]
+
+    if len(values) == 0:
+        return pd.DataFrame(columns=['lower', 'upper', 'count', 'label'])
+
+    low, high = np.log10(values.min()), np.log10(values.max())
+    if high - low < 1e-9:
+        high = low + 1e-9
+
+    edges = np.logspace(low, high, bins + 1)
+    counts, edges = np.histogram(values, bins=edges)
+
+    return pd.DataFrame({
+        'lower': edges[:-1],
+        'upper': edges[1:],
+        'count': counts,
+        'label': [f'{format_eur(lo)}–{format_eur(hi)}' for lo, hi in zip(edges[:-1], edges[1:])]
+    })
+
+
+def bucket_timeline(series: pd.DataFrame, max_points: int = 180, key: str = 'key') -> Tuple[pd.DataFrame, str]:
+    """
+    Re-aggregate a daily series into the finest bucket that fits max_points
+
+    Args:
+        series: Frame with a datetime `key` column and additive value columns
+                (as produced by storage.aggregates)
+        max_points: Maximum number of buckets to return
+
+    Returns:
+        (bucketed frame, bucket label such as 'Day' or 'Month')
+    """
+    if len(series) == 0:
+        return series, 'Day'
+
+    keys = pd.to_datetime(series[key])
+    additive = [c for c in series.columns if c not in (key, 'average_value')]
+
+    for freq, label in TIME_FREQUENCIES:
+        if len(pd.period_range(keys.min(), keys.max(), freq=freq)) <= max_points:
+            break
+
+    if freq == 'D':
+        return series, label
+
+    buckets = series[additive].groupby(keys.dt.to_period(freq).dt.start_time).sum()
+    buckets.index.name = key
+    buckets = buckets.reset_index()
+
+    if 'average_value' in series.columns:
+        buckets['average_value'] = buckets['value_eur'] / buckets['tenders'].where(buckets['tenders'] > 0)
+
+    return buckets, label
+
+
+def lttb(x, y, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling
+
+    Returns the indices of the points to keep; first and last are always
+    kept. Series shorter than the threshold are returned whole.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = pd.Index(x)
+    x = (x.asi8 if isinstance(x, pd.DatetimeIndex) else x.to_numpy()).astype(float)
+    y = np.asarray(y, dtype=float)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    keep = np.empty(threshold, dtype=int)
+    keep[0] = 0
+    keep[-1] = n - 1
+    a = 0
+
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(area.argmax())
+        keep[i + 1] = a
+
+    return keep
+
+
+def downsample(series: pd.DataFrame, x: str, y: str, max_points: int = 500) -> pd.DataFrame:
+    """Keep at most max_points rows of a series using LTTB on (x, y)"""
+    if len(series) <= max_points:
+        return series
+    return series.iloc[lttb(series[x], series[y], max_points)]
@@ -2,12 +2,17 @@
 Dashboard generator for procurement intelligence
 Creates interactive Plotly dashboards
 """
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from typing import Dict, List
 from datetime import datetime
+from core.metrics import STAGE_SECONDS
+from storage.aggregates import compute_aggregates
+from storage.awards import COMPETITION_LEVELS, award_ratios, award_summary
+from .binning import bucket_timeline, log_value_bins
 
 
 class DashboardGenerator:
@@ -20,6 +25,9 @@ class DashboardGenerator:
             'warning': '#ff7f0e',
             'danger': '#d62728'
         }
+        # Chart resolution limits; payload size is bounded by these, not row count
+        self.max_timeline_points = 180
+        self.value_bins = 30
     
     def create_tender_overview(self, tenders: pd.DataFrame) -> Dict:
         """Create comprehensive tender overview dashboard"""
@@ -27,73 +35,147 @@ class DashboardGenerator:
         if len(tenders) == 0:
             return {'error': 'No tenders found'}
         
-        # KPI Cards
-        total_tenders = len(tenders)
-        total_value = tenders['value_eur'].sum()
-        avg_value = tenders['value_eur'].mean()
+        with STAGE_SECONDS.time('tender_overview', 'aggregate'):
+            aggregates = compute_aggregates(tenders, ['timeline', 'country', 'category', 'buyer'])
+            timeline, bucket = bucket_timeline(aggregates.timeline, max_points=self.max_timeline_points)
+            value_bins = log_value_bins(tenders['value_eur'], bins=self.value_bins)
+            category_data = aggregates.by_category.sort_values('value_eur', ascending=False).head(10)
         
-        # Timeline Chart
-        tenders['published_date'] = pd.to_datetime(tenders['published_date'])
-        timeline = tenders.groupby(tenders['published_date'].dt.to_period('D')).agg({
-            'tender_id': 'count',
-            'value_eur': 'sum'
-        }).reset_index()
-        timeline['published_date'] = timeline['published_date'].dt.to_timestamp()
+        with STAGE_SECONDS.time('tender_overview', 'figures'):
+            figures = self._overview_figures(aggregates, timeline, bucket, value_bins, category_data)
         
+        with STAGE_SECONDS.time('tender_overview', 'serialize'):
+            charts = {
+                name: fig.to_html(full_html=False, include_plotlyjs=False, div_id=name)
+                for name, fig in figures.items()
+            }
+        
+        return {
+            'kpis': {
+                'total_tenders': aggregates.total_tenders,
+                'total_value': f'€{aggregates.total_value:,.0f}',
+                'average_value': f'€{aggregates.average_value:,.0f}'
+            },
+            'charts': charts
+        }
+    
+    def _overview_figures(self, aggregates, timeline, bucket, value_bins, category_data) -> Dict[str, go.Figure]:
+        """Plotly figures for create_tender_overview, keyed by chart id"""
+        
+        # Timeline Chart (bucketed so point count stays bounded)
         fig_timeline = px.line(
-            timeline, 
-            x='published_date', 
-            y='tender_id',
-            title='Tender Publications Over Time',
-            labels={'tender_id': 'Number of Tenders', 'published_date': 'Date'}
+            timeline,
+            x='key',
+            y='tenders',
+            title=f'Tender Publications per {bucket}',
+            labels={'tenders': 'Number of Tenders', 'key': 'Date'}
         )
         fig_timeline.update_layout(hovermode='x unified')
         
         # Geographic Distribution
-        geo_data = tenders.groupby('country_name').agg({
-            'tender_id': 'count',
-            'value_eur': 'sum'
-        }).reset_index().sort_values('tender_id', ascending=False)
-        
         fig_geo = px.bar(
-            geo_data.head(10),
-            x='country_name',
-            y='tender_id',
+            aggregates.by_country.head(10),
+            x='key',
+            y='tenders',
             title='Top 10 Countries by Tender Count',
-            labels={'tender_id': 'Number of Tenders', 'country_name': 'Country'}
+            labels={'tenders': 'Number of Tenders', 'key': 'Country'}
         )
         
-        # Value Distribution
-        fig_value = px.histogram(
-            tenders,
-            x='value_eur',
-            nbins=30,
+        # Value Distribution (pre-binned on a log scale)
+        fig_value = px.bar(
+            value_bins,
+            x='label',
+            y='count',
             title='Tender Value Distribution',
-            labels={'value_eur': 'Value (EUR)'}
+            labels={'label': 'Value (EUR)', 'count': 'Number of Tenders'}
         )
-        fig_value.update_layout(showlegend=False)
+        fig_value.update_layout(showlegend=False, bargap=0.05)
         
         # Category Breakdown
-        category_data = tenders.groupby('cpv_description')['value_eur'].sum().sort_values(ascending=False).head(10)
-        
         fig_category = px.pie(
-            values=category_data.values,
-            names=category_data.index,
+            values=category_data['value_eur'],
+            names=category_data['key'],
             title='Top 10 Categories by Value'
         )
         
+        figures = {
+            'timeline': fig_timeline,
+            'geography': fig_geo,
+            'value_dist': fig_value,
+            'categories': fig_category
+        }
+        
+        # Top buyers (only when the tenders carry resolved buyer entities)
+        if len(aggregates.by_buyer):
+            figures['buyers'] = px.bar(
+                aggregates.by_buyer.head(10),
+                x='tenders',
+                y='key',
+                orientation='h',
+                title='Top 10 Buyers by Tender Count',
+                labels={'tenders': 'Number of Tenders', 'key': 'Buyer'}
+            ).update_yaxes(autorange='reversed')
+        
+        return figures
+    
+    def create_award_overview(self, awards: pd.DataFrame) -> Dict:
+        """Award analytics: winners, competition and award/estimate ratios"""
+        
+        if len(awards) == 0:
+            return {'error': 'No awards found'}
+        
+        with STAGE_SECONDS.time('award_overview', 'aggregate'):
+            summary = award_summary(awards)
+            aggregates = compute_aggregates(
+                awards, ['award_timeline', 'winner', 'competition'], value_column='awarded_value_eur'
+            )
+            timeline, bucket = bucket_timeline(aggregates.award_timeline, max_points=self.max_timeline_points)
+            levels = [label for _, label in COMPETITION_LEVELS]
+            competition = aggregates.by_competition.set_index('key').reindex(levels, fill_value=0).reset_index()
+            ratios = award_ratios(awards).dropna().clip(0, 2)
+            counts, edges = np.histogram(ratios, bins=20, range=(0, 2))
+            ratio_bins = pd.DataFrame({'ratio': (edges[:-1] + edges[1:]) / 2, 'awards': counts})
+        
+        with STAGE_SECONDS.time('award_overview', 'figures'):
+            figures = {
+                'timeline': px.line(
+                    timeline, x='key', y='tenders', title=f'Awards per {bucket}',
+                    labels={'tenders': 'Number of Awards', 'key': 'Award Date'}
+                ),
+                'winners': px.bar(
+                    aggregates.by_winner.sort_values('value_eur', ascending=False).head(10),
+                    x='value_eur', y='key', orientation='h', title='Top 10 Suppliers by Awarded Value',
+                    labels={'value_eur': 'Awarded Value (EUR)', 'key': 'Supplier'}
+                ).update_yaxes(autorange='reversed'),
+                'competition': px.bar(
+                    competition, x='key', y='tenders', title='Awards by Number of Bids',
+                    labels={'tenders': 'Number of Awards', 'key': 'Competition'}
+                ),
+                'ratio': px.bar(
+                    ratio_bins, x='ratio', y='awards', title='Awarded / Estimated Value',
+                    labels={'ratio': 'Award / Estimate', 'awards': 'Number of Awards'}
+                ).update_layout(bargap=0.05)
+            }
+        
+        with STAGE_SECONDS.time('award_overview', 'serialize'):
+            charts = {
+                name: fig.to_html(full_html=False, include_plotlyjs=False, div_id=name)
+                for name, fig in figures.items()
+            }
+        
+        def share(value):
+            return 'n/a' if value is None else f'{value:.0%}'
+        
         return {
             'kpis': {
-                'total_tenders': total_tenders,
-                'total_value': f'€{total_value:,.0f}',
-                'average_value': f'€{avg_value:,.0f}'
+                'total_awards': summary['total_awards'],
+                'total_value': f"€{summary['total_value']:,.0f}",
+                'average_value': f"€{summary['average_value']:,.0f}",
+                'average_bids': 'n/a' if summary['average_bids'] is None else f"{summary['average_bids']:.1f}",
+                'single_bid_share': share(summary['single_bid_share']),
+                'median_award_ratio': share(summary['median_award_ratio'])
             },
-            'charts': {
-                'timeline': fig_timeline.to_html(include_plotlyjs='cdn', div_id='timeline'),
-                'geography': fig_geo.to_html(include_plotlyjs='cdn', div_id='geography'),
-                'value_dist': fig_value.to_html(include_plotlyjs='cdn', div_id='value_dist'),
-                'categories': fig_category.to_html(include_plotlyjs='cdn', div_id='categories')
-            }
+            'charts': charts
         }
     
     def create_market_intelligence(self, tenders: pd.DataFrame) -> go.Figure:
@@ -108,32 +190,33 @@ class DashboardGenerator:
                    [{'type': 'scatter'}, {'type': 'bar'}]]
         )
         
+        aggregates = compute_aggregates(tenders, ['timeline', 'country', 'category', 'procedure'])
+        
         # Country distribution
-        country_counts = tenders['country_name'].value_counts().head(5)
+        country_counts = aggregates.by_country.head(5)
         fig.add_trace(
-            go.Bar(x=country_counts.index, y=country_counts.values, name='Tenders'),
+            go.Bar(x=country_counts['key'], y=country_counts['tenders'], name='Tenders'),
             row=1, col=1
         )
         
         # Category pie
-        category_values = tenders.groupby('cpv_description')['value_eur'].sum().head(5)
+        category_values = aggregates.by_category.head(5)
         fig.add_trace(
-            go.Pie(labels=category_values.index, values=category_values.values),
+            go.Pie(labels=category_values['key'], values=category_values['value_eur']),
             row=1, col=2
         )
         
         # Timeline
-        tenders['published_date'] = pd.to_datetime(tenders['published_date'])
-        timeline = tenders.groupby(tenders['published_date'].dt.date)['tender_id'].count()
+        timeline, _ = bucket_timeline(aggregates.timeline, max_points=self.max_timeline_points)
         fig.add_trace(
-            go.Scatter(x=timeline.index, y=timeline.values, mode='lines+markers'),
+            go.Scatter(x=timeline['key'], y=timeline['tenders'], mode='lines+markers'),
             row=2, col=1
         )
         
         # Procedure types
-        procedure_counts = tenders['procedure_type'].value_counts()
+        procedure_counts = aggregates.by_procedure
         fig.add_trace(
-            go.Bar(x=procedure_counts.index, y=procedure_counts.values),
+            go.Bar(x=procedure_counts['key'], y=procedure_counts['tenders']),
             row=2, col=2
         )
         
@@ -0,0 +1,81 @@
+"""
+Fixed dashboard page definitions shared by the app routes and the
+static snapshot builder
+"""
+from typing import Dict
+from .rendering import render
+
+# Page slug (as in /dashboard/<slug>) -> layout, labels and data selection.
+# `source` names the connector method ('tenders' -> search_tenders,
+# 'awards' -> search_awards) called with `filters`; `builder` names the
+# dashboard build (dashboards.tasks function / DashboardGenerator.create_<builder>),
+# 'tender_overview' when absent.
+DASHBOARD_PAGES = {
+    'tenders': {
+        'title': 'Tender Overview Dashboard',
+        'icon': '📊',
+        'subtitle': 'EU Procurement Intelligence',
+        'kpis': [('total_tenders', 'Total Tenders'), ('total_value', 'Total Value'),
+                 ('average_value', 'Average Value')],
+        'charts': ['timeline', 'geography', 'value_dist', 'categories'],
+        'source': 'tenders',
+        'filters': {'limit': 100}
+    },
+    'it-tenders': {
+        'title': 'IT Tenders Dashboard',
+        'icon': '💻',
+        'subtitle': 'Software, Cloud Computing & IT Services',
+        'kpis': [('total_tenders', 'IT Tenders'), ('total_value', 'Total IT Spend'),
+                 ('average_value', 'Average Contract')],
+        'charts': ['timeline', 'geography', 'categories'],
+        'source': 'tenders',
+        'filters': {'cpv_code': '48', 'limit': 100}
+    },
+    'countries': {
+        'title': 'Geographic Analysis Dashboard',
+        'icon': '🌍',
+        'subtitle': 'Country & Regional Procurement Trends',
+        'kpis': [('total_tenders', 'Total Tenders'), ('total_value', 'Total Value'),
+                 ('average_value', 'Average Value')],
+        'charts': ['geography', 'categories', 'buyers'],
+        'source': 'tenders',
+        'filters': {'limit': 100}
+    },
+    'value-analysis': {
+        'title': 'Value Analysis Dashboard',
+        'icon': '💰',
+        'subtitle': 'Contract Value Trends & Distribution',
+        'kpis': [('total_tenders', 'Total Tenders'), ('total_value', 'Total Value'),
+                 ('average_value', 'Average Value')],
+        'charts': ['value_dist', 'timeline'],
+        'source': 'tenders',
+        'filters': {'limit': 100}
+    },
+    'awards': {
+        'title': 'Award Analytics Dashboard',
+        'icon': '🏆',
+        'subtitle': 'Contract Award Analysis & Winners',
+        'kpis': [('total_awards', 'Total Awards'), ('total_value', 'Total Awarded'),
+                 ('average_bids', 'Average Bids'), ('single_bid_share', 'Single-Bid Awards'),
+                 ('median_award_ratio', 'Median Award / Estimate')],
+        'charts': ['timeline', 'winners', 'competition', 'ratio'],
+        'source': 'awards',
+        'builder': 'award_overview',
+        'filters': {'limit': 1000}
+    }
+}
+
+# Tabs of the Power BI style insights dashboard (dashboards.powerbi_layout)
+INSIGHTS_TABS = [
+    {'name': 'overview', 'label': 'Overview', 'icon': 'fa-home'},
+    {'name': 'category', 'label': 'By Category', 'icon': 'fa-th'},
+    {'name': 'geography', 'label': 'Geography', 'icon': 'fa-globe'},
+    {'name': 'value', 'label': 'Value Analysis', 'icon': 'fa-dollar-sign'},
+    {'name': 'timeline', 'label': 'Timeline', 'icon': 'fa-clock'}
+]
+
+
+def render_page(page: str, dashboard: Dict) -> str:
+    """Render a dashboard page through the shared layout template"""
+    spec = DASHBOARD_PAGES[page]
+    return render('dashboard.html', **spec, dashboard=dashboard)
@@ -1,14 +1,26 @@
 """
 Power BI Style Dashboard Layout Generator
 Creates tab-based, minimal-scroll dashboards
+
+Only the KPI cards and the active tab are computed when the page is built.
+Every other tab fetches its figures from a JSON endpoint the first time it
+is opened (see `tab_json`).
 """
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import pandas as pd
+from plotly.io.json import to_json_plotly
+from core.metrics import STAGE_SECONDS
+from storage.aggregates import compute_aggregates
+from storage.deadlines import days_to_deadline
+from storage.rollups import period_trends
+from .binning import bucket_timeline, downsample, log_value_bins
+from .pages import INSIGHTS_TABS
+from .rendering import render
 
 class PowerBIDashboard:
     """Generate Power BI style dashboards with tabs and KPIs"""
-    
+
+    TABS = INSIGHTS_TABS
+
     def __init__(self):
         self.colors = {
             'primary': '#667eea',
@@ -18,252 +30,207 @@ class PowerBIDashboard:
             'danger': '#f56565',
             'info': '#4299e1'
         }
-    
+        # Upper bound on points per time series sent to the browser
+        self.max_points = 365
+        self.tab_builders = {
+            'overview': self._create_overview_tab,
+            'category': self._create_category_tab,
+            'geography': self._create_geography_tab,
+            'value': self._create_value_tab,
+            'timeline': self._create_timeline_tab
+        }
+
     def create_kpi_cards(self, kpis):
         """Generate KPI cards HTML"""
-        cards_html = '<div class="kpi-grid">'
-        
-        for kpi in kpis:
-            icon = kpi.get('icon', 'fa-chart-line')
-            color = kpi.get('color', 'primary')
-            
-            cards_html += f'''
-            <div class="kpi-card">
-                <div class="kpi-icon" style="color: {self.colors[color]};">
-                    <i class="fas {icon}"></i>
-                </div>
-                <div class="kpi-value">{kpi['value']}</div>
-                <div class="kpi-label">{kpi['label']}</div>
-                {f'<div class="kpi-change {kpi["change_class"]}">{kpi["change"]}</div>' if 'change' in kpi else ''}
-            </div>
-            '''
-        
-        cards_html += '</div>'
-        return cards_html
-    
-    def create_tab_dashboard(self, data, title="Dashboard"):
-        """Create tabbed dashboard with minimal scrolling"""
-        
-        # Calculate KPIs
-        kpis = [
+        return render('_kpi_cards.html', kpis=kpis, colors=self.colors)
+
+    def calculate_kpis(self, data, trends=None, period='month'):
+        """
+        KPI cards for the dashboard header
+
+        Args:
+            data: Tenders DataFrame
+            trends: Period-over-period trends (TenderStore.trends); computed
+                    from `data` when not given
+            period: Trend period shown on the cards ('week', 'month')
+        """
+
+        if len(data) == 0:
+            return []
+
+        aggregates = compute_aggregates(data, [])
+        remaining = days_to_deadline(data.get('deadline'))
+        trend = (trends or period_trends(data)).get(period, {})
+
+        return [
             {
                 'label': 'Active Tenders',
-                'value': f"{len(data):,}",
+                'value': f"{aggregates.total_tenders:,}",
                 'icon': 'fa-file-alt',
                 'color': 'primary',
-                'change': '+12%',
-                'change_class': 'positive'
+                **self._change(trend, 'tenders_change')
             },
             {
                 'label': 'Total Value',
-                'value': f"EUR {data['value_eur'].sum()/1e9:.1f}B",
+                'value': f"EUR {aggregates.total_value/1e9:.1f}B",
                 'icon': 'fa-euro-sign',
-                'color': 'success'
+                'color': 'success',
+                **self._change(trend, 'value_change')
             },
             {
                 'label': 'Avg. Contract',
-                'value': f"EUR {data['value_eur'].mean()/1e6:.1f}M",
+                'value': f"EUR {aggregates.average_value/1e6:.1f}M",
                 'icon': 'fa-calculator',
                 'color': 'info'
             },
             {
                 'label': 'Urgent (7 days)',
-                'value': f"{len(data[data['days_to_deadline'] <= 7]):,}",
+                'value': f"{int(remaining.between(0, 7).sum()):,}",
                 'icon': 'fa-clock',
                 'color': 'warning'
             }
         ]
-        
-        # Tab contents
-        tabs = {
-            'overview': self._create_overview_tab(data),
-            'category': self._create_category_tab(data),
-            'geography': self._create_geography_tab(data),
-            'value': self._create_value_tab(data),
-            'timeline': self._create_timeline_tab(data)
+
+    def _change(self, trend, field):
+        """Change indicator entries for a KPI card (none without a previous period)"""
+        change = trend.get(field)
+        if change is None:
+            return {}
+        return {
+            'change': f"{change:+.0%} vs prev. {trend['days']}d",
+            'change_class': 'positive' if change >= 0 else 'negative'
         }
-        
-        # Build HTML
-        html = f'''
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>{title}</title>
-            <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
-            <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css">
-            <style>
-                * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-                body {{
-                    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Arial, sans-serif;
-                    background: #f5f7fa;
-                }}
-                .header {{
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    color: white;
-                    padding: 20px 30px;
-                    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                }}
-                .header h1 {{ font-size: 24px; margin-bottom: 5px; }}
-                .header .breadcrumb {{ opacity: 0.9; font-size: 14px; }}
-                .kpi-grid {{
-                    display: grid;
-                    grid-template-columns: repeat(4, 1fr);
-                    gap: 20px;
-                    padding: 20px 30px;
-                    background: white;
-                    border-bottom: 1px solid #e2e8f0;
-                }}
-                .kpi-card {{
-                    padding: 20px;
-                    background: #f8fafc;
-                    border-radius: 8px;
-                    border: 1px solid #e2e8f0;
-                }}
-                .kpi-icon {{ font-size: 32px; margin-bottom: 10px; }}
-                .kpi-value {{ font-size: 32px; font-weight: bold; color: #1a202c; margin: 10px 0; }}
-                .kpi-label {{ color: #64748b; font-size: 14px; }}
-                .kpi-change {{ 
-                    margin-top: 8px; 
-                    font-size: 12px; 
-                    font-weight: 600;
-                }}
-                .kpi-change.positive {{ color: #48bb78; }}
-                .kpi-change.negative {{ color: #f56565; }}
-                .tabs {{
-                    display: flex;
-                    background: white;
-                    border-bottom: 2px solid #e2e8f0;
-                    padding: 0 30px;
-                }}
-                .tab {{
-                    padding: 15px 25px;
-                    cursor: pointer;
-                    border-bottom: 3px solid transparent;
-                    color: #64748b;
-                    font-weight: 500;
-                    transition: all 0.3s;
-                }}
-                .tab:hover {{ color: #667eea; }}
-                .tab.active {{
-                    color: #667eea;
-                    border-bottom-color: #667eea;
-                }}
-                .tab-content {{
-                    display: none;
-                    padding: 20px 30px;
-                    height: calc(100vh - 280px);
-                    overflow: hidden;
-                }}
-                .tab-content.active {{ display: block; }}
-                .chart-grid {{
-                    display: grid;
-                    grid-template-columns: repeat(2, 1fr);
-                    gap: 20px;
-                    height: 100%;
-                }}
-                .chart {{
-                    background: white;
-                    border-radius: 8px;
-                    padding: 20px;
-                    box-shadow: 0 1px 3px rgba(0,0,0,0.1);
-                }}
-                .chart h3 {{
-                    font-size: 16px;
-                    color: #1a202c;
-                    margin-bottom: 15px;
-                }}
-                .back-link {{
-                    color: white;
-                    text-decoration: none;
-                    opacity: 0.9;
-                }}
-                .back-link:hover {{ opacity: 1; }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <a href="/" class="back-link"><i class="fas fa-arrow-left"></i> Back to Home</a>
-                <h1><i class="fas fa-chart-line"></i> {title}</h1>
-                <div class="breadcrumb">Procurement Intelligence / Dashboard</div>
-            </div>
-            
-            {self.create_kpi_cards(kpis)}
-            
-            <div class="tabs">
-                <div class="tab active" onclick="showTab('overview')">
-                    <i class="fas fa-home"></i> Overview
-                </div>
-                <div class="tab" onclick="showTab('category')">
-                    <i class="fas fa-th"></i> By Category
-                </div>
-                <div class="tab" onclick="showTab('geography')">
-                    <i class="fas fa-globe"></i> Geography
-                </div>
-                <div class="tab" onclick="showTab('value')">
-                    <i class="fas fa-dollar-sign"></i> Value Analysis
-                </div>
-                <div class="tab" onclick="showTab('timeline')">
-                    <i class="fas fa-clock"></i> Timeline
-                </div>
-            </div>
-            
-            <div id="overview" class="tab-content active">
-                {tabs['overview']}
-            </div>
-            <div id="category" class="tab-content">
-                {tabs['category']}
-            </div>
-            <div id="geography" class="tab-content">
-                {tabs['geography']}
-            </div>
-            <div id="value" class="tab-content">
-                {tabs['value']}
-            </div>
-            <div id="timeline" class="tab-content">
-                {tabs['timeline']}
-            </div>
-            
-            <script>
-                function showTab(tabName) {{
-                    // Hide all tabs
-                    document.querySelectorAll('.tab-content').forEach(tab => {{
-                        tab.classList.remove('active');
-                    }});
-                    document.querySelectorAll('.tab').forEach(tab => {{
-                        tab.classList.remove('active');
-                    }});
-                    
-                    // Show selected tab
-                    document.getElementById(tabName).classList.add('active');
-                    event.target.closest('.tab').classList.add('active');
-                }}
-            </script>
-        </body>
-        </html>
-        '''
-        
-        return html
-    
+
+    def create_tab_dashboard(self, data, title="Dashboard", active_tab='overview', tab_url='', trends=None):
+        """
+        Create tabbed dashboard with minimal scrolling
+
+        Args:
+            data: Tenders DataFrame
+            title: Page title
+            active_tab: Tab rendered inline with the page
+            tab_url: Base URL the other tabs are fetched from as
+                     `{tab_url}/{tab}`; the page's query string is appended
+            trends: Period-over-period trends for the KPI change indicators
+        """
+
+        if active_tab not in self.tab_builders:
+            active_tab = 'overview'
+
+        with STAGE_SECONDS.time('tab_dashboard', 'aggregate'):
+            kpis = self.calculate_kpis(data, trends)
+        initial_tab = self.tab_json(active_tab, data).replace('</', '<\\/')
+
+        with STAGE_SECONDS.time('tab_dashboard', 'render'):
+            return render(
+                'tab_dashboard.html',
+                title=title,
+                kpi_cards=self.create_kpi_cards(kpis),
+                tabs=self.TABS,
+                active_tab=active_tab,
+                initial_tab=initial_tab,
+                tab_url=tab_url
+            )
+
+    def tab_json(self, tab, data):
+        """Serialize one tab's figures to JSON for the lazy-loading client"""
+
+        if tab not in self.tab_builders:
+            raise KeyError(f"Unknown tab: {tab}")
+
+        with STAGE_SECONDS.time('tab_json', 'figures'):
+            charts = self.tab_builders[tab](data) if len(data) else []
+
+        with STAGE_SECONDS.time('tab_json', 'serialize'):
+            return to_json_plotly({
+                'tab': tab,
+                'charts': [
+                    {'id': f'{tab}-{i}', 'title': title, 'figure': fig.to_plotly_json()}
+                    for i, (title, fig) in enumerate(charts, start=1)
+                ]
+            })
+
+    def _style(self, fig):
+        fig.update_layout(
+            template='none',
+            margin=dict(l=40, r=20, t=20, b=40),
+            showlegend=False,
+            paper_bgcolor='white',
+            plot_bgcolor='white',
+            colorway=list(self.colors.values())
+        )
+        return fig
+
     def _create_overview_tab(self, data):
         """Overview tab with 4 key charts"""
-        # Implementation here
-        return '''
-        <div class="chart-grid">
-            <div class="chart" id="overview-1"></div>
-            <div class="chart" id="overview-2"></div>
-            <div class="chart" id="overview-3"></div>
-            <div class="chart" id="overview-4"></div>
-        </div>
-        '''
-    
+
+        aggregates = compute_aggregates(data, ['country', 'category', 'timeline', 'procedure'])
+        country_counts = aggregates.by_country.head(10)
+        category_values = aggregates.by_category.sort_values('value_eur', ascending=False).head(6)
+        timeline, _ = bucket_timeline(aggregates.timeline, max_points=self.max_points)
+        procedure_counts = aggregates.by_procedure
+
+        return [
+            ('Tenders by Country', self._style(go.Figure(go.Bar(
+                x=country_counts['key'], y=country_counts['tenders'],
+                marker_color=self.colors['primary'])))),
+            ('Value by Category', self._style(go.Figure(go.Pie(
+                labels=category_values['key'], values=category_values['value_eur'], hole=0.4)))),
+            ('Publications Over Time', self._style(go.Figure(go.Scatter(
+                x=timeline['key'], y=timeline['tenders'], mode='lines+markers',
+                line_color=self.colors['secondary'])))),
+            ('Procedure Types', self._style(go.Figure(go.Bar(
+                x=procedure_counts['key'], y=procedure_counts['tenders'],
+                marker_color=self.colors['info']))))
+        ]
+
     def _create_category_tab(self, data):
-        return '<div class="chart-grid"><div class="chart">Category charts here</div></div>'
-    
+        categories = compute_aggregates(data, ['category']).by_category.sort_values('tenders')
+
+        return [
+            ('Tenders per Category', self._style(go.Figure(go.Bar(
+                x=categories['tenders'], y=categories['key'], orientation='h',
+                marker_color=self.colors['primary'])))),
+            ('Average Value per Category (EUR)', self._style(go.Figure(go.Bar(
+                x=categories['average_value'], y=categories['key'], orientation='h',
+                marker_color=self.colors['success']))))
+        ]
+
     def _create_geography_tab(self, data):
-        return '<div class="chart-grid"><div class="chart">Geography charts here</div></div>'
-    
+        countries = compute_aggregates(data, ['country']).by_country.sort_values('value_eur', ascending=False)
+
+        return [
+            ('Total Value by Country (EUR)', self._style(go.Figure(go.Bar(
+                x=countries['key'], y=countries['value_eur'],
+                marker_color=self.colors['success'])))),
+            ('Tenders by Country', self._style(go.Figure(go.Bar(
+                x=countries['key'], y=countries['tenders'],
+                marker_color=self.colors['primary']))))
+        ]
+
     def _create_value_tab(self, data):
-        return '<div class="chart-grid"><div class="chart">Value charts here</div></div>'
-    
+        by_procedure = compute_aggregates(data, ['procedure']).by_procedure.sort_values('average_value', ascending=False)
+        value_bins = log_value_bins(data['value_eur'], bins=30)
+
+        return [
+            ('Value Distribution (EUR)', self._style(go.Figure(go.Bar(
+                x=value_bins['label'], y=value_bins['count'],
+                marker_color=self.colors['primary'])).update_layout(bargap=0.05))),
+            ('Average Value by Procedure (EUR)', self._style(go.Figure(go.Bar(
+                x=by_procedure['key'], y=by_procedure['average_value'],
+                marker_color=self.colors['warning']))))
+        ]
+
     def _create_timeline_tab(self, data):
-        return '<div class="chart-grid"><div class="chart">Timeline charts here</div></div>'
+        aggregates = compute_aggregates(data, ['timeline', 'deadline_week'])
+        value_by_day = downsample(aggregates.timeline, 'key', 'value_eur', max_points=self.max_points)
+        deadlines_by_week, _ = bucket_timeline(aggregates.deadlines_by_week, max_points=self.max_points)
+
+        return [
+            ('Published Value per Day (EUR)', self._style(go.Figure(go.Scatter(
+                x=value_by_day['key'], y=value_by_day['value_eur'], mode='lines',
+                fill='tozeroy', line_color=self.colors['secondary'])))),
+            ('Deadlines per Week', self._style(go.Figure(go.Bar(
+                x=deadlines_by_week['key'], y=deadlines_by_week['tenders'],
+                marker_color=self.colors['warning']))))
+        ]
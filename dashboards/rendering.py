@@ -0,0 +1,45 @@
+"""
+Jinja2 environment shared by the app routes and dashboard builders
+Templates are compiled once and kept in the environment's cache
+"""
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+ROOT_DIR = Path(__file__).parent.parent
+TEMPLATE_DIR = ROOT_DIR / 'templates'
+STATIC_DIR = ROOT_DIR / 'static'
+
+
+def _asset_version() -> str:
+    """Content hash of the static assets, used to bust long-lived caches"""
+    digest = hashlib.sha1()
+    for path in sorted(STATIC_DIR.rglob('*')):
+        if path.is_file():
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:10]
+
+
+@lru_cache(maxsize=None)
+def plotly_js_url() -> str:
+    """CDN URL of the plotly.js bundled with the installed plotly (imported on first render)"""
+    from plotly.offline import get_plotlyjs_version
+    return f'https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js'
+
+
+environment = Environment(
+    loader=FileSystemLoader(str(TEMPLATE_DIR)),
+    autoescape=select_autoescape(['html']),
+    auto_reload=False,
+    cache_size=100,
+    trim_blocks=True,
+    lstrip_blocks=True
+)
+environment.globals['asset_version'] = _asset_version()
+environment.globals['plotly_js_url'] = plotly_js_url
+
+
+def render(template_name: str, **context) -> str:
+    """Render a template to a string"""
+    return environment.get_template(template_name).render(**context)
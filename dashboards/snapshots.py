@@ -0,0 +1,159 @@
+"""
+Static snapshot builder for the fixed (parameterless) dashboards
+
+Pre-renders each page in DASHBOARD_PAGES to HTML plus a JSON summary, with
+gzip siblings, inside the Quarto output directory (site/_site/dashboards).
+The app serves these files directly while they are fresh, so only
+parameterized views reach the live engine.
+
+Usage:
+    python -m dashboards.snapshots                   # build all pages once
+    python -m dashboards.snapshots it-tenders        # build selected pages
+    python -m dashboards.snapshots --interval 360    # rebuild every 6 hours
+"""
+import argparse
+import gzip
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Optional
+
+from core.config import get_setting
+from .pages import DASHBOARD_PAGES, render_page
+from .rendering import ROOT_DIR
+
+SNAPSHOT_DIR = ROOT_DIR / get_setting('snapshots.directory', 'site/_site/dashboards')
+MAX_AGE_HOURS = float(get_setting('snapshots.max_age_hours', 6))
+MANIFEST = 'manifest.json'
+
+if TYPE_CHECKING:  # the app imports find_snapshot without loading pandas/plotly
+    import pandas as pd
+    from .generator import DashboardGenerator
+
+
+def _write_atomic(path: Path, data: bytes):
+    """Write via a temp file + rename so readers never see partial files"""
+    tmp = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _write_with_gzip(path: Path, data: bytes):
+    _write_atomic(path.with_name(path.name + '.gz'), gzip.compress(data, compresslevel=9, mtime=0))
+    _write_atomic(path, data)
+
+
+def connector_fetch(connector) -> Callable[[str, Dict], 'pd.DataFrame']:
+    """
+    Page data fetcher that calls the connector directly; fetched tenders
+    go through a local TenderStore so awards can be joined to them
+    """
+    from storage.tender_store import TenderStore
+    store = TenderStore()
+
+    def fetch(source: str, filters: Dict) -> 'pd.DataFrame':
+        if source == 'awards':
+            if not store.loaded:
+                store.ingest(connector.search_tenders({'limit': filters.get('limit', 100)}))
+                store.mark_loaded('snapshot')
+            return store.join_awards(connector.search_awards(dict(filters)))
+        tenders = store.resolve_entities(connector.search_tenders(dict(filters)))
+        store.ingest(tenders)
+        store.mark_loaded('snapshot')
+        return tenders
+    return fetch
+
+
+def build_snapshot(page: str, fetch: Callable, generator: 'DashboardGenerator', output_dir: Path = SNAPSHOT_DIR) -> Dict:
+    """Render one page to <output_dir>/<page>/index.html and data.json"""
+    spec = DASHBOARD_PAGES[page]
+    tenders = fetch(spec['source'], spec['filters'])
+
+    dashboard = getattr(generator, f"create_{spec.get('builder', 'tender_overview')}")(tenders)
+    html = render_page(page, dashboard).encode('utf-8')
+
+    built_at = datetime.now().isoformat(timespec='seconds')
+    summary = json.dumps({
+        'page': page,
+        'built_at': built_at,
+        'filters': spec['filters'],
+        'kpis': dashboard.get('kpis', {}),
+        'rows': len(tenders)
+    }).encode('utf-8')
+
+    page_dir = output_dir / page
+    page_dir.mkdir(parents=True, exist_ok=True)
+    _write_with_gzip(page_dir / 'data.json', summary)
+    _write_with_gzip(page_dir / 'index.html', html)
+
+    return {'built_at': built_at, 'bytes': len(html), 'rows': len(tenders)}
+
+
+def build_snapshots(fetch: Optional[Callable] = None, pages: Optional[Iterable[str]] = None,
+                    output_dir: Path = SNAPSHOT_DIR) -> Dict:
+    """
+    Build the given pages (default: all) and update the manifest
+
+    Args:
+        fetch: `fetch(source, filters) -> DataFrame` used to load page data;
+               defaults to querying a fresh TEDConnector
+    """
+    if fetch is None:
+        from connectors.ted_eu import TEDConnector
+        fetch = connector_fetch(TEDConnector.from_config())
+
+    from .generator import DashboardGenerator
+    generator = DashboardGenerator()
+    manifest_path = output_dir / MANIFEST
+    manifest = {}
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text())
+
+    for page in pages or DASHBOARD_PAGES:
+        try:
+            manifest[page] = build_snapshot(page, fetch, generator, output_dir)
+        except Exception as e:
+            print(f"Snapshot Error ({page}): {e}")
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    _write_atomic(manifest_path, json.dumps(manifest, indent=2).encode('utf-8'))
+    return manifest
+
+
+def find_snapshot(page: str, max_age_hours: float = MAX_AGE_HOURS, output_dir: Path = SNAPSHOT_DIR) -> Optional[Path]:
+    """Path of a page's snapshot HTML if it exists and is fresh enough"""
+    path = output_dir / page / 'index.html'
+    try:
+        age = time.time() - path.stat().st_mtime
+    except OSError:
+        return None
+    return path if age <= max_age_hours * 3600 else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pre-render fixed dashboards to static files')
+    parser.add_argument('pages', nargs='*', help=f"Pages to build (default: all of {', '.join(DASHBOARD_PAGES)})")
+    parser.add_argument('--interval', type=float, default=0, help='Rebuild every N minutes (0 = build once)')
+    args = parser.parse_args()
+
+    unknown = set(args.pages) - set(DASHBOARD_PAGES)
+    if unknown:
+        parser.error(f"unknown page(s): {', '.join(sorted(unknown))}")
+
+    while True:
+        started = time.perf_counter()
+        manifest = build_snapshots(pages=args.pages or None)
+        for page in args.pages or DASHBOARD_PAGES:
+            info = manifest.get(page, {})
+            print(f"[OK] {page}: {info.get('bytes', 0):,} bytes, {info.get('rows', 0)} rows")
+        print(f"Built snapshots in {time.perf_counter() - started:.2f}s -> {SNAPSHOT_DIR}")
+
+        if not args.interval:
+            break
+        time.sleep(args.interval * 60)
+
+
+if __name__ == '__main__':
+    main()
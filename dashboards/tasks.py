@@ -0,0 +1,53 @@
+"""
+Picklable entry points for dashboard builds run in the offload pool
+
+Each worker process keeps its own generator instances, created on first use.
+Importing this module is cheap: plotly and the aggregation engine load with
+the first build that needs them.
+"""
+from typing import TYPE_CHECKING, Dict, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+_generators: Dict[str, object] = {}
+
+
+def _get(name: str):
+    if name not in _generators:
+        if name == 'overview':
+            from .generator import DashboardGenerator
+            _generators[name] = DashboardGenerator()
+        else:
+            from .powerbi_layout import PowerBIDashboard
+            _generators[name] = PowerBIDashboard()
+    return _generators[name]
+
+
+def tender_overview(tenders: 'pd.DataFrame') -> Dict:
+    """DashboardGenerator.create_tender_overview"""
+    return _get('overview').create_tender_overview(tenders)
+
+
+def award_overview(awards: 'pd.DataFrame') -> Dict:
+    """DashboardGenerator.create_award_overview"""
+    return _get('overview').create_award_overview(awards)
+
+
+def tab_dashboard(tenders: 'pd.DataFrame', title: str, active_tab: str, tab_url: str,
+                  trends: Optional[Dict] = None) -> str:
+    """PowerBIDashboard.create_tab_dashboard"""
+    return _get('powerbi').create_tab_dashboard(
+        tenders, title=title, active_tab=active_tab, tab_url=tab_url, trends=trends
+    )
+
+
+def tab_json(tab: str, tenders: 'pd.DataFrame') -> str:
+    """PowerBIDashboard.tab_json"""
+    return _get('powerbi').tab_json(tab, tenders)
+
+
+def statistics(tenders: 'pd.DataFrame') -> Dict:
+    """Statistics payload for /api/stats"""
+    from storage.aggregates import compute_aggregates
+    return compute_aggregates(tenders, ['country', 'category', 'buyer']).to_stats()
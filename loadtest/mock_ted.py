@@ -0,0 +1,209 @@
+"""
+Local stand-in for the TED v3 search API
+
+Serves eForms-shaped notices generated from a seeded synthetic corpus via
+`POST /v3/notices/search`, with configurable latency, page-number
+pagination, rate limiting (429 + Retry-After) and random server errors.
+Queries with `notice-type=can-standard` return contract award notices that
+reference their contract notice.
+Point the app at it with TED_LIVE=true TED_API_URL=http://localhost:8090/v3.
+
+Usage:
+    python -m loadtest.mock_ted --port 8090 --latency 0.3 --jitter 0.1 \\
+        --rate-limit 20 --error-rate 0.02 --notices 20000
+"""
+import argparse
+import asyncio
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from connectors.synthetic import generate_awards, generate_tenders
+from connectors.ted_eu import AWARD_NOTICE_TYPE, COUNTRY_CODES, MAX_PAGE_SIZE
+
+ISO3 = {iso2: iso3 for iso3, iso2 in COUNTRY_CODES.items()}
+PROCEDURES = {'Open': 'open', 'Restricted': 'restricted', 'Negotiated': 'neg-w-call'}
+
+_QUERY_TERM = re.compile(r'([\w-]+)\s*(>=|<=|=)\s*([^\s]+)')
+
+
+@dataclass
+class MockSettings:
+    notices: int = 20000
+    seed: int = 0
+    latency: float = 0.2        # mean seconds per response
+    jitter: float = 0.05        # standard deviation of latency
+    rate_limit: float = 0.0     # requests/second before 429 (0 = unlimited)
+    error_rate: float = 0.0     # share of requests answered with 500/503
+
+
+class TokenBucket:
+    """Allows `rate` requests per second with bursts up to `rate`"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+def build_notices(settings: MockSettings) -> Dict:
+    """Notices plus the column arrays used to filter them"""
+    tenders = generate_tenders(settings.notices, seed=settings.seed)
+    numbers = [f'{100000 + i}-{published[:4]}' for i, published in enumerate(tenders['published_date'])]
+
+    notices = [
+        {
+            'publication-number': number,
+            'notice-title': {'eng': title},
+            'buyer-name': {'eng': [buyer]},
+            'buyer-country': [ISO3.get(country, country)],
+            'classification-cpv': [cpv],
+            'BT-27-Procedure': int(value),
+            'BT-27-Procedure-Currency': 'EUR',
+            'publication-date': f'{published}+01:00',
+            'deadline-receipt-tender-date-lot': [f'{deadline}+01:00'],
+            'procedure-type': PROCEDURES.get(procedure, procedure)
+        }
+        for number, title, buyer, country, cpv, value, published, deadline, procedure in zip(
+            numbers, tenders['title'], tenders['buyer'], tenders['country'], tenders['cpv_code'],
+            tenders['value_eur'], tenders['published_date'], tenders['deadline'], tenders['procedure_type']
+        )
+    ]
+
+    awards = generate_awards(tenders, seed=settings.seed)
+    contract_numbers = dict(zip(tenders['tender_id'], numbers))
+    award_notices = [
+        {
+            'publication-number': f'{500000 + i}-{decided[:4]}',
+            'BT-125(i)-Lot': [contract_numbers[tender_id]],
+            'winner-name': {'eng': [winner]},
+            'winner-country': [ISO3.get(country, country)],
+            'buyer-name': {'eng': [buyer]},
+            'buyer-country': [ISO3.get(country, country)],
+            'classification-cpv': [cpv],
+            'BT-720-Tender': int(value),
+            'BT-720-Tender-Currency': 'EUR',
+            'BT-27-Procedure': int(estimate),
+            'BT-759-LotResult': [int(bids)],
+            'BT-1451-Contract': [f'{decided}+01:00'],
+            'publication-date': f'{decided}+01:00'
+        }
+        for i, (tender_id, winner, country, buyer, cpv, value, estimate, bids, decided) in enumerate(zip(
+            awards['tender_id'], awards['winner'], awards['country'], awards['buyer'], awards['cpv_code'],
+            awards['awarded_value_eur'], awards['estimated_value_eur'], awards['bids'], awards['award_date']
+        ))
+    ]
+
+    return {
+        'notices': notices,
+        'country': tenders['country'].to_numpy(dtype=object),
+        'cpv': tenders['cpv_code'].to_numpy(dtype=object),
+        'value': tenders['value_eur'].to_numpy(dtype=float),
+        'awards': {
+            'notices': award_notices,
+            'country': awards['country'].to_numpy(dtype=object),
+            'cpv': awards['cpv_code'].to_numpy(dtype=object),
+            'value': awards['awarded_value_eur'].to_numpy(dtype=float)
+        }
+    }
+
+
+def select(corpus: Dict, query: str) -> np.ndarray:
+    """Indices of notices matching the subset of expert-query terms the connector sends"""
+    mask = np.ones(len(corpus['notices']), dtype=bool)
+    for field, op, value in _QUERY_TERM.findall(query or ''):
+        if field == 'BT-05-Lot':
+            mask &= corpus['country'] == value
+        elif field == 'BT-262-Lot':
+            mask &= np.char.startswith(corpus['cpv'].astype(str), value.rstrip('*'))
+        elif field in ('BT-27-Procedure', 'BT-720-Tender'):
+            mask &= (corpus['value'] >= float(value)) if op == '>=' else (corpus['value'] <= float(value))
+    return np.flatnonzero(mask)
+
+
+def create_app(settings: MockSettings) -> FastAPI:
+    app = FastAPI(title='TED v3 mock')
+    corpus = build_notices(settings)
+    bucket = TokenBucket(settings.rate_limit) if settings.rate_limit else None
+    rng = np.random.default_rng(settings.seed)
+    counters = {'requests': 0, 'ok': 0, 'rate_limited': 0, 'errors': 0, 'notices': 0}
+
+    @app.post('/v3/notices/search')
+    async def search(request: Request):
+        counters['requests'] += 1
+        if bucket is not None and not bucket.take():
+            counters['rate_limited'] += 1
+            return JSONResponse({'error': 'Too many requests'}, status_code=429, headers={'Retry-After': '1'})
+
+        delay = max(0.0, rng.normal(settings.latency, settings.jitter)) if settings.latency else 0.0
+        await asyncio.sleep(delay)
+
+        if settings.error_rate and rng.random() < settings.error_rate:
+            counters['errors'] += 1
+            return JSONResponse({'error': 'Upstream failure'}, status_code=int(rng.choice([500, 503])))
+
+        body = await request.json()
+        page = max(1, int(body.get('page', 1)))
+        limit = min(MAX_PAGE_SIZE, max(1, int(body.get('limit', 10))))
+        query = body.get('query', '')
+        notices = corpus['awards'] if f'notice-type={AWARD_NOTICE_TYPE}' in query else corpus
+        matches = select(notices, query)
+        page_rows = matches[(page - 1) * limit:page * limit]
+
+        counters['ok'] += 1
+        counters['notices'] += len(page_rows)
+        return {
+            'notices': [notices['notices'][i] for i in page_rows],
+            'totalNoticeCount': int(len(matches)),
+            'timedOut': False
+        }
+
+    @app.get('/mock/stats')
+    async def stats():
+        return counters
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local TED v3 search API stand-in')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    defaults = MockSettings()
+    for name, value in vars(defaults).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+    args = parser.parse_args()
+
+    settings = MockSettings(**{name: getattr(args, name) for name in vars(defaults)})
+    started = time.perf_counter()
+    app = create_app(settings)
+    print(f"Mock TED: {settings.notices:,} notices ready in {time.perf_counter() - started:.1f}s "
+          f"-> http://{args.host}:{args.port}/v3")
+
+    import uvicorn
+    uvicorn.run(app, host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""
+Load generator replaying mixed traffic against a running server
+
+Workers pick routes by weight from SCENARIO (search and stats queries vary
+country/CPV) for a fixed duration, then report per-route request counts,
+errors, rate-limited (429) responses, p50/p95/p99 latency and throughput.
+Latency and throughput cover served requests only: a 429 is answered
+before any work is done and would flatten the percentiles.
+
+All virtual users share one IP, so run the server without the per-client
+rate limit (or pass a key listed in `ratelimit.api_keys` with --api-key).
+
+Usage:
+    python -m loadtest.mock_ted --latency 0.3 --rate-limit 20 &
+    RATELIMIT_ENABLED=false TED_LIVE=true TED_API_URL=http://127.0.0.1:8090/v3 uvicorn app:app --port 8000 --workers 2 &
+    python -m loadtest.run --url http://127.0.0.1:8000 --concurrency 32 --duration 60
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+COUNTRIES = ['DE', 'FR', 'ES', 'IT', 'NL', 'BE', 'PL', 'SE', 'AT', 'DK']
+CPV_CODES = ['48', '72', '30', '45', '79', '85', '90']
+
+# (route label, weight, path builder)
+SCENARIO = [
+    ('/', 10, lambda r: '/'),
+    ('/api/search', 30, lambda r: f'/api/search?country={r.choice(COUNTRIES)}&cpv_code={r.choice(CPV_CODES)}&limit=100'),
+    ('/api/stats', 15, lambda r: f'/api/stats?cpv_code={r.choice(CPV_CODES)}'),
+    ('/dashboard/tenders', 10, lambda r: f'/dashboard/tenders?country={r.choice(COUNTRIES)}'),
+    ('/dashboard/insights', 10, lambda r: f'/dashboard/insights?cpv_code={r.choice(CPV_CODES)}'),
+    ('/dashboard/it-tenders', 5, lambda r: '/dashboard/it-tenders'),
+    ('/dashboard/countries', 5, lambda r: '/dashboard/countries'),
+    ('/dashboard/value-analysis', 5, lambda r: '/dashboard/value-analysis'),
+    ('/dashboard/awards', 5, lambda r: '/dashboard/awards'),
+    ('/api/dashboard/insights/{tab}', 5, lambda r: f"/api/dashboard/insights/{r.choice(['category', 'geography', 'value', 'timeline'])}"),
+]
+
+
+async def worker(client: httpx.AsyncClient, rng: random.Random, deadline: float,
+                 samples: Dict[str, List[Tuple[float, str]]]):
+    routes = [route for route, _, _ in SCENARIO]
+    weights = [weight for _, weight, _ in SCENARIO]
+    builders = {route: build for route, _, build in SCENARIO}
+
+    while time.perf_counter() < deadline:
+        route = rng.choices(routes, weights)[0]
+        started = time.perf_counter()
+        try:
+            response = await client.get(builders[route](rng))
+            if response.status_code == 429:
+                outcome = 'limited'
+            else:
+                outcome = 'ok' if response.status_code < 400 else 'error'
+        except httpx.HTTPError:
+            outcome = 'error'
+        samples[route].append((time.perf_counter() - started, outcome))
+
+
+def summarize(samples: Dict[str, List[Tuple[float, str]]], elapsed: float) -> List[Dict]:
+    """Per-route and overall latency percentiles (ms) and throughput of served requests"""
+    rows = []
+    everything = [s for route_samples in samples.values() for s in route_samples]
+    for route, route_samples in [*sorted(samples.items()), ('TOTAL', everything)]:
+        if not route_samples:
+            continue
+        served = [latency for latency, outcome in route_samples if outcome != 'limited']
+        latencies = np.array(served) * 1000
+        if len(latencies):
+            p50, p95, p99 = (round(float(p), 1) for p in np.percentile(latencies, [50, 95, 99]))
+        else:
+            # Every request was rate-limited: nothing to measure
+            p50 = p95 = p99 = None
+        rows.append({
+            'route': route,
+            'requests': len(route_samples),
+            'errors': sum(outcome == 'error' for _, outcome in route_samples),
+            'limited': len(route_samples) - len(served),
+            'p50_ms': p50,
+            'p95_ms': p95,
+            'p99_ms': p99,
+            'rps': round(len(served) / elapsed, 2)
+        })
+    return rows
+
+
+async def run(url: str, concurrency: int, duration: float, seed: int, timeout: float,
+              api_key: Optional[str] = None) -> List[Dict]:
+    samples = defaultdict(list)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    headers = {'X-API-Key': api_key} if api_key else None
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits, headers=headers) as client:
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(
+            worker(client, random.Random(seed + i), deadline, samples) for i in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+    return summarize(samples, elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay mixed traffic and report latency percentiles')
+    parser.add_argument('--url', default='http://127.0.0.1:8000', help='Server under test')
+    parser.add_argument('--concurrency', type=int, default=16, help='Concurrent virtual users')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run')
+    parser.add_argument('--timeout', type=float, default=60, help='Per-request timeout')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--api-key', help='Sent as X-API-Key (a key in ratelimit.api_keys gets the higher limit)')
+    parser.add_argument('--json', help='Also write the report to this file')
+    args = parser.parse_args()
+
+    print(f"Load test: {args.concurrency} users x {args.duration:.0f}s -> {args.url}")
+    rows = asyncio.run(run(args.url, args.concurrency, args.duration, args.seed, args.timeout, args.api_key))
+
+    print(f"\n{'route':<32}{'requests':>10}{'errors':>8}{'429s':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>9}")
+    for row in rows:
+        print(f"{row['route']:<32}{row['requests']:>10}{row['errors']:>8}{row['limited']:>8}"
+              f"{str(row['p50_ms']):>10}{str(row['p95_ms']):>10}{str(row['p99_ms']):>10}{row['rps']:>9}")
+    if any(row['limited'] for row in rows):
+        print("\nRate-limited responses are excluded from latency and req/s; "
+              "start the server with RATELIMIT_ENABLED=false or pass --api-key")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'url': args.url, 'concurrency': args.concurrency, 'duration': args.duration, 'routes': rows}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
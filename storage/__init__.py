@@ -0,0 +1,6 @@
+"""
+Tender storage and query engine
+"""
+from .aggregates import TenderAggregates, compute_aggregates
+
+__all__ = ['TenderAggregates', 'compute_aggregates']
@@ -0,0 +1,225 @@
+"""
+Single-pass aggregation engine for dashboards and statistics
+
+Every KPI and chart series a dashboard needs is computed from one read of
+each column involved: each dimension column is factorized once and all
+grouping sets (the grand total plus one per dimension) are reduced with
+`np.bincount` over the shared value column. Dates are parsed over the
+distinct values only, and the source frame is never copied or mutated.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional
+import numpy as np
+import pandas as pd
+
+
+# Dimension name -> source column
+DIMENSIONS = {
+    'timeline': 'published_date',
+    'country': 'country_name',
+    'category': 'cpv_description',
+    'procedure': 'procedure_type',
+    'deadline_week': 'deadline',
+    'buyer': 'buyer_id',
+    # award tables (see storage.awards)
+    'award_timeline': 'award_date',
+    'winner': 'winner_id',
+    'competition': 'competition',
+}
+
+TIME_DIMENSIONS = ('timeline', 'deadline_week', 'award_timeline')
+DAILY_DIMENSIONS = ('timeline', 'award_timeline')
+
+# Entity dimensions: grouped on integer ids, labelled from this column
+ENTITY_LABELS = {'buyer': 'buyer_entity', 'winner': 'winner_entity'}
+
+SERIES_COLUMNS = ['key', 'tenders', 'value_eur', 'average_value']
+
+
+def _empty_series() -> pd.DataFrame:
+    return pd.DataFrame(columns=SERIES_COLUMNS)
+
+
+@dataclass
+class TenderAggregates:
+    """KPIs and per-dimension series for one tender selection"""
+
+    total_tenders: int = 0
+    total_value: float = 0.0
+    average_value: float = 0.0
+    min_value: float = 0.0
+    max_value: float = 0.0
+    countries: int = 0
+    series: Dict[str, pd.DataFrame] = field(default_factory=dict)
+
+    @property
+    def timeline(self) -> pd.DataFrame:
+        return self.series.get('timeline', _empty_series())
+
+    @property
+    def by_country(self) -> pd.DataFrame:
+        return self.series.get('country', _empty_series())
+
+    @property
+    def by_category(self) -> pd.DataFrame:
+        return self.series.get('category', _empty_series())
+
+    @property
+    def by_procedure(self) -> pd.DataFrame:
+        return self.series.get('procedure', _empty_series())
+
+    @property
+    def deadlines_by_week(self) -> pd.DataFrame:
+        return self.series.get('deadline_week', _empty_series())
+
+    @property
+    def by_buyer(self) -> pd.DataFrame:
+        return self.series.get('buyer', _empty_series())
+
+    @property
+    def award_timeline(self) -> pd.DataFrame:
+        return self.series.get('award_timeline', _empty_series())
+
+    @property
+    def by_winner(self) -> pd.DataFrame:
+        return self.series.get('winner', _empty_series())
+
+    @property
+    def by_competition(self) -> pd.DataFrame:
+        return self.series.get('competition', _empty_series())
+
+    def to_stats(self, top: int = 5) -> Dict:
+        """Statistics payload with plain Python types (JSON-safe)"""
+        if self.total_tenders == 0:
+            return {}
+
+        top_countries = self.by_country.sort_values('value_eur', ascending=False).head(top)
+        top_categories = self.by_category.head(top)
+
+        stats = {
+            'total_tenders': self.total_tenders,
+            'total_value': self.total_value,
+            'average_value': self.average_value,
+            'min_value': self.min_value,
+            'max_value': self.max_value,
+            'countries': self.countries,
+            'top_countries': {k: float(v) for k, v in zip(top_countries['key'], top_countries['value_eur'])},
+            'top_categories': {k: int(v) for k, v in zip(top_categories['key'], top_categories['tenders'])}
+        }
+        if 'buyer' in self.series:
+            top_buyers = self.by_buyer.head(top)
+            stats['top_buyers'] = {k: int(v) for k, v in zip(top_buyers['key'], top_buyers['tenders'])}
+        return stats
+
+
+def compute_aggregates(tenders: pd.DataFrame, dimensions: Optional[Iterable[str]] = None,
+                       value_column: str = 'value_eur') -> TenderAggregates:
+    """
+    Compute KPIs plus one series per requested dimension
+
+    Args:
+        tenders: Tenders (or awards) frame (left untouched)
+        dimensions: Subset of DIMENSIONS to compute (default: all available)
+        value_column: Column summed into value_eur (awards: awarded_value_eur)
+
+    Returns:
+        TenderAggregates; each series has columns key, tenders, value_eur,
+        average_value, ordered by key for time dimensions and by tender
+        count otherwise; entity dimensions add entity_id and use the entity
+        name as key
+    """
+    if tenders is None or len(tenders) == 0:
+        return TenderAggregates()
+
+    if dimensions is None:
+        dimensions = DIMENSIONS.keys()
+    dimensions = [
+        d for d in dimensions
+        if DIMENSIONS[d] in tenders.columns and ENTITY_LABELS.get(d, DIMENSIONS[d]) in tenders.columns
+    ]
+
+    values = tenders[value_column].to_numpy(dtype=float, na_value=np.nan)
+    valid = ~np.isnan(values)
+    weights = np.where(valid, values, 0.0)
+    n_valid = int(valid.sum())
+
+    result = TenderAggregates(
+        total_tenders=len(tenders),
+        total_value=float(weights.sum()),
+        average_value=float(weights.sum() / n_valid) if n_valid else 0.0,
+        min_value=float(values[valid].min()) if n_valid else 0.0,
+        max_value=float(values[valid].max()) if n_valid else 0.0,
+        countries=int(pd.unique(tenders['country']).size) if 'country' in tenders.columns else 0
+    )
+
+    for d in dimensions:
+        codes, keys = _factorize(tenders[DIMENSIONS[d]], d)
+        if d in ENTITY_LABELS:
+            codes, keys, ids = _label_entities(codes, keys, tenders[ENTITY_LABELS[d]])
+            result.series[d] = _reduce(codes, keys, weights, valid, d, ids)
+        else:
+            result.series[d] = _reduce(codes, keys, weights, valid, d)
+
+    return result
+
+
+def _factorize(column: pd.Series, dimension: str):
+    """Integer codes per row and the key for each code"""
+    codes, uniques = pd.factorize(column, use_na_sentinel=True)
+
+    if dimension not in TIME_DIMENSIONS:
+        return codes, pd.Index(uniques)
+
+    # Parse the distinct values only, then fold equal dates together
+    parsed = pd.to_datetime(pd.Index(uniques), errors='coerce', format='mixed')
+    if dimension in DAILY_DIMENSIONS:
+        parsed = parsed.normalize()
+    else:
+        parsed = parsed.to_period('W').start_time
+
+    date_codes, dates = pd.factorize(parsed, use_na_sentinel=True)
+    remap = np.append(date_codes, -1)
+    return remap[codes], pd.Index(dates)
+
+
+def _label_entities(codes: np.ndarray, ids: pd.Index, labels: pd.Series):
+    """Drop unresolved ids (< 0) and label each id with the name on its first row"""
+    ids = ids.to_numpy(dtype=np.int64)
+    codes = np.where((codes >= 0) & (ids[codes] >= 0), codes, -1)
+
+    present = np.flatnonzero(codes >= 0)
+    first_row = np.zeros(len(ids), dtype=np.int64)
+    first_row[codes[present[::-1]]] = present[::-1]
+    return codes, pd.Index(labels.to_numpy(dtype=object)[first_row]), ids
+
+
+def _reduce(codes: np.ndarray, keys: pd.Index, weights: np.ndarray, valid: np.ndarray, dimension: str,
+            ids: Optional[np.ndarray] = None) -> pd.DataFrame:
+    """Count, sum and mean per key for one grouping set"""
+    present = codes >= 0
+    codes = codes[present]
+    size = len(keys)
+
+    counts = np.bincount(codes, minlength=size)
+    sums = np.bincount(codes, weights=weights[present], minlength=size)
+    valid_counts = np.bincount(codes, weights=valid[present], minlength=size)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.where(valid_counts > 0, sums / valid_counts, np.nan)
+
+    series = pd.DataFrame({
+        'key': keys,
+        'tenders': counts,
+        'value_eur': sums,
+        'average_value': means
+    })
+    if ids is not None:
+        series['entity_id'] = ids
+        series = series[series['tenders'] > 0]
+
+    if dimension in TIME_DIMENSIONS:
+        series = series.sort_values('key')
+    else:
+        series = series.sort_values(['tenders', 'key'], ascending=[False, True])
+
+    return series.reset_index(drop=True)
@@ -0,0 +1,189 @@
+"""
+Contract award table
+
+Awards live in their own columnar table keyed by award_id and point at the
+tender they conclude through tender_id. Winners are resolved to supplier
+entity ids on ingest and each award gets a competition level from its bid
+count, so award analytics are integer groupbys plus one indexed join
+against the tender snapshot (see TenderStore.join_awards).
+"""
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from .aggregates import compute_aggregates
+from .entities import EntityIndex
+from .snapshot import answers, contains, upsert
+
+AWARD_COLUMNS = [
+    'award_id', 'tender_id', 'winner', 'winner_country', 'awarded_value_eur', 'estimated_value_eur',
+    'currency', 'bids', 'award_date', 'buyer', 'country', 'cpv_code', 'source', 'url'
+]
+
+# Competition level by number of bids received: (lowest bid count, label)
+COMPETITION_LEVELS = [(1, 'Single bid'), (2, '2-3 bids'), (4, '4-5 bids'), (6, '6+ bids')]
+UNKNOWN_COMPETITION = 'Unknown'
+
+
+def competition_levels(bids) -> np.ndarray:
+    """Competition label per award from its bid count"""
+    bids = pd.to_numeric(pd.Series(bids), errors='coerce').to_numpy(dtype=float)
+    thresholds = np.array([low for low, _ in COMPETITION_LEVELS], dtype=float)
+    labels = np.array([label for _, label in COMPETITION_LEVELS] + [UNKNOWN_COMPETITION], dtype=object)
+    codes = np.searchsorted(thresholds, bids, side='right') - 1
+    codes[np.isnan(bids) | (bids < 1)] = len(COMPETITION_LEVELS)
+    return labels[codes]
+
+
+def filter_awards(frame: pd.DataFrame, filters: Optional[Dict] = None) -> pd.DataFrame:
+    """
+    Rows of an awards frame matching connector-style filters
+
+    Filters: country, cpv_code (prefix), min_value, max_value (awarded value),
+    published_from (award date, YYYY-MM-DD), limit
+    """
+    filters = filters or {}
+    limit = filters.get('limit')
+    if limit is not None and int(limit) < 1:
+        raise ValueError(f"limit must be positive, got {limit}")
+    if len(frame) == 0:
+        return frame
+
+    mask = pd.Series(True, index=frame.index)
+    if filters.get('country'):
+        mask &= frame['country'] == filters['country']
+    if filters.get('cpv_code'):
+        mask &= frame['cpv_code'].astype(str).str.startswith(str(filters['cpv_code']))
+    if filters.get('min_value') is not None:
+        mask &= frame['awarded_value_eur'] >= filters['min_value']
+    if filters.get('max_value') is not None:
+        mask &= frame['awarded_value_eur'] <= filters['max_value']
+    if filters.get('published_from'):
+        mask &= frame['award_date'].fillna('').astype(str) >= str(filters['published_from'])
+
+    result = frame[mask]
+    if limit is not None:
+        result = result.head(int(limit))
+    return result.reset_index(drop=True)
+
+
+class AwardTable:
+    """Current awards keyed by award_id"""
+
+    def __init__(self, suppliers: EntityIndex):
+        self.suppliers = suppliers
+        self._frame = pd.DataFrame(columns=AWARD_COLUMNS)
+        self._lock = threading.Lock()
+        self.last_ingest: Dict[str, datetime] = {}
+        self.loaded_sources = set()
+        self.complete_sources = set()
+
+    def resolve(self, awards: pd.DataFrame) -> pd.DataFrame:
+        """Awards with winner_id / winner_entity / competition (unchanged if already resolved)"""
+        if awards is None or len(awards) == 0 or 'winner_id' in awards.columns:
+            return awards
+        countries = awards['winner_country'].fillna(awards['country']) if 'winner_country' in awards else awards.get('country')
+        winner_ids = self.suppliers.resolve(awards['winner'], countries)
+        return awards.assign(
+            winner_id=winner_ids,
+            winner_entity=self.suppliers.labels(winner_ids).to_numpy(),
+            competition=competition_levels(awards['bids'])
+        )
+
+    def ingest(self, awards: pd.DataFrame, source: Optional[str] = None) -> pd.DataFrame:
+        """
+        Upsert awards (incoming rows replace stored rows with the same award_id)
+
+        Returns:
+            The rows whose award_id was not already stored
+        """
+        if awards is None or len(awards) == 0:
+            return pd.DataFrame(columns=AWARD_COLUMNS)
+
+        awards = self.resolve(awards.drop_duplicates('award_id', keep='last'))
+        with self._lock:
+            new_rows = awards[~contains(awards['award_id'], self._frame['award_id'])]
+            self._frame = upsert(self._frame, awards, 'award_id')
+            self.last_ingest[source or 'default'] = datetime.now()
+        return new_rows
+
+    def swap(self, snapshot: pd.DataFrame, source: Optional[str] = None):
+        """
+        Replace all awards with `snapshot` (e.g. a memory-mapped file) without
+        copying it; its resolved winners seed the supplier index
+        """
+        if 'winner_id' in snapshot.columns:
+            countries = snapshot['winner_country'].fillna(snapshot['country']) if 'winner_country' in snapshot else snapshot.get('country')
+            self.suppliers.seed(snapshot['winner'], countries, snapshot['winner_id'], snapshot.get('winner_entity'))
+        snapshot = self.resolve(snapshot)
+        with self._lock:
+            self._frame = snapshot
+            self.last_ingest[source or 'default'] = datetime.now()
+
+    def query(self, filters: Optional[Dict] = None) -> pd.DataFrame:
+        """Awards matching the connector-style filters (see filter_awards)"""
+        return filter_awards(self._frame, filters)
+
+    def mark_loaded(self, source: str, complete: bool = False):
+        self.loaded_sources.add(source)
+        if complete:
+            self.complete_sources.add(source)
+        else:
+            self.complete_sources.discard(source)
+
+    @property
+    def loaded(self) -> bool:
+        return bool(self.loaded_sources)
+
+    @property
+    def complete(self) -> bool:
+        return self.loaded and self.loaded_sources <= self.complete_sources
+
+    def answers(self, filters: Optional[Dict], rows: pd.DataFrame) -> bool:
+        """True if `rows` (stored matches for `filters`) need no upstream query"""
+        return answers(filters, rows, self.complete)
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """Current awards (treat as read-only)"""
+        return self._frame
+
+    def __len__(self):
+        return len(self._frame)
+
+
+def award_summary(awards: pd.DataFrame) -> Dict:
+    """
+    Award KPIs: counts and values plus competition (bids, single-bid share)
+    and price (awarded / estimated value) indicators
+    """
+    if awards is None or len(awards) == 0:
+        return {}
+
+    aggregates = compute_aggregates(awards, [], value_column='awarded_value_eur')
+    bids = pd.to_numeric(awards['bids'], errors='coerce')
+    summary = {
+        'total_awards': aggregates.total_tenders,
+        'total_value': aggregates.total_value,
+        'average_value': aggregates.average_value,
+        'average_bids': float(bids.mean()) if bids.notna().any() else None,
+        'single_bid_share': float((bids == 1).sum() / bids.notna().sum()) if bids.notna().any() else None,
+        'median_award_ratio': None
+    }
+    ratio = award_ratios(awards)
+    if ratio.notna().any():
+        summary['median_award_ratio'] = float(ratio.median())
+    return summary
+
+
+def award_ratios(awards: pd.DataFrame) -> pd.Series:
+    """Awarded / estimated value per award (NaN without a positive estimate)"""
+    if 'estimated_value_eur' not in awards.columns:
+        return pd.Series(np.nan, index=awards.index)
+    estimate = awards['estimated_value_eur'].to_numpy(dtype=float, na_value=np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ratio = np.where(estimate > 0, awards['awarded_value_eur'].to_numpy(dtype=float, na_value=np.nan) / estimate, np.nan)
+    return pd.Series(ratio, index=awards.index)
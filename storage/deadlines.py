@@ -0,0 +1,67 @@
+"""
+Deadline index over the tender snapshot
+
+Deadlines are held as one sorted array of day numbers plus the row position
+each came from, built once per snapshot. A "closing soon" query is two
+binary searches and a slice; country/CPV filters then only look at the rows
+in range. Days to deadline are computed from the stored dates when a query
+is answered, so they never go stale between refreshes.
+"""
+from datetime import date
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+def to_days(deadlines) -> np.ndarray:
+    """Deadlines as datetime64[D] (NaT where missing or unparseable)"""
+    parsed = pd.to_datetime(pd.Series(deadlines, dtype=object), errors='coerce', format='ISO8601')
+    return parsed.to_numpy().astype('datetime64[D]')
+
+
+def today_day(today: Optional[date] = None) -> np.datetime64:
+    return np.datetime64(today or date.today(), 'D')
+
+
+def days_to_deadline(deadlines, today: Optional[date] = None) -> pd.Series:
+    """Whole days from `today` until each deadline (negative once passed, NaN if unknown)"""
+    if deadlines is None:
+        return pd.Series(dtype=float)
+    days = to_days(deadlines)
+    remaining = (days - today_day(today)).astype('timedelta64[D]').astype(float)
+    remaining[np.isnat(days)] = np.nan
+    index = deadlines.index if isinstance(deadlines, pd.Series) else None
+    return pd.Series(remaining, index=index)
+
+
+class DeadlineIndex:
+    """Row positions of a frame ordered by deadline"""
+
+    def __init__(self, deadlines):
+        days = to_days(deadlines)
+        known = np.flatnonzero(~np.isnat(days))
+        order = np.argsort(days[known], kind='stable')
+        self.days = days[known][order]
+        self.positions = known[order]
+
+    def between(self, start, end) -> np.ndarray:
+        """Positions of the rows with start <= deadline <= end, earliest deadline first"""
+        lo = np.searchsorted(self.days, np.datetime64(start, 'D'), side='left')
+        hi = np.searchsorted(self.days, np.datetime64(end, 'D'), side='right')
+        return self.positions[lo:hi]
+
+    def closing_within(self, days: int, today: Optional[date] = None) -> np.ndarray:
+        """Positions of the rows whose deadline falls in the next `days` days (today included)"""
+        start = today_day(today)
+        return self.between(start, start + np.timedelta64(int(days), 'D'))
+
+    def __len__(self):
+        return len(self.positions)
+
+
+if __name__ == '__main__':
+    deadlines = pd.Series(['2026-10-20', None, '2026-10-18', '2026-11-30', 'soon', '2026-10-25'])
+    index = DeadlineIndex(deadlines)
+    print(index.closing_within(7, today=date(2026, 10, 18)))
+    print(days_to_deadline(deadlines, today=date(2026, 10, 18)).tolist())
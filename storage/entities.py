@@ -0,0 +1,222 @@
+"""
+Entity resolution for buyer and supplier names
+
+Free-text organisation names are canonicalized (case, accents, punctuation,
+legal forms such as GmbH / S.A. / sp. z o.o.) and clustered within their
+country: a name joins an existing entity when its (lightly stemmed) token
+set is similar enough (Jaccard) to one of that entity's known variants.
+Candidates come from a per-country inverted token index, so a name is only
+compared with the variants it shares a token with.
+
+Entity ids are derived from (kind, country, canonical name) of the first
+variant seen, so every worker and every restart assigns the same id to the
+same organisation. Dashboards group on the integer ids.
+"""
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from hashlib import blake2b
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Tokens dropped before comparison: legal forms and filler words
+LEGAL_FORMS = {
+    'gmbh', 'mbh', 'ag', 'kg', 'ug', 'ev', 'se', 'sa', 'sas', 'sarl', 'spa', 'srl', 'sl', 'slu',
+    'bv', 'nv', 'ab', 'as', 'aps', 'oy', 'oyj', 'ltd', 'limited', 'inc', 'llc', 'plc', 'co',
+    'kft', 'zrt', 'sro', 'doo', 'sp', 'zoo', 'spzoo'
+}
+STOPWORDS = {
+    'the', 'of', 'and', 'for', 'de', 'des', 'du', 'la', 'le', 'les', 'der', 'die', 'das', 'fur',
+    'und', 'van', 'het', 'di', 'del', 'della', 'y', 'et', 'i', 'w', 'z'
+}
+_TRANSLITERATE = str.maketrans({'ä': 'ae', 'ö': 'oe', 'ü': 'ue', 'ß': 'ss', 'ø': 'oe', 'æ': 'ae', 'å': 'aa', 'ł': 'l'})
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+# Minimum Jaccard similarity of token sets for two names to be one entity
+SIMILARITY = 0.75
+
+# Tokens carried by more variants than this are too common to propose candidates
+MAX_POSTINGS = 500
+
+UNKNOWN_ID = -1
+
+
+def canonical_tokens(name: str) -> Tuple[str, ...]:
+    """Comparable tokens of an organisation name, in original order"""
+    text = unicodedata.normalize('NFKD', str(name).casefold().translate(_TRANSLITERATE))
+    text = text.encode('ascii', 'ignore').decode()
+    tokens = _NON_ALNUM.sub(' ', text.replace('.', '')).split()
+    kept = tuple(t for t in tokens if t not in LEGAL_FORMS and t not in STOPWORDS)
+    return kept or tuple(tokens)
+
+
+def _stem(token: str) -> str:
+    """Crude inflection folding for similarity ('miasto'/'miasta', 'ministerio'/'ministerium')"""
+    return token.rstrip('aeiouy') if len(token) > 4 else token
+
+
+def entity_id(kind: str, country: str, canonical: str) -> int:
+    """Stable id for the entity founded by `canonical` (53 bits: exact as a JSON number)"""
+    digest = blake2b(f'{kind}|{country}|{canonical}'.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') >> 11
+
+
+class EntityIndex:
+    """Clusters of organisation names with stable integer ids"""
+
+    def __init__(self, kind: str, similarity: float = SIMILARITY):
+        self.kind = kind
+        self.similarity = similarity
+        self.names: Dict[int, str] = {}                        # id -> display name (first seen)
+        self._exact: Dict[Tuple[str, str], int] = {}           # (country, canonical) -> id
+        self._seen: Dict[Tuple[str, str], int] = {}            # raw (country, name) -> id
+        self._variants: Dict[str, List[Tuple[int, FrozenSet[str]]]] = defaultdict(list)
+        self._postings: Dict[str, Dict[str, List[int]]] = defaultdict(lambda: defaultdict(list))
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.names)
+
+    def resolve(self, names, countries=None) -> np.ndarray:
+        """
+        Entity id per row (UNKNOWN_ID for missing names); new names are
+        clustered into existing entities or founded as new ones
+
+        Args:
+            names: Organisation names
+            countries: Country per row (the blocking key); None for one block
+        """
+        names = pd.Series(names, dtype=object)
+        if countries is None:
+            countries = pd.Series('', index=names.index, dtype=object)
+        countries = pd.Series(countries, index=names.index, dtype=object).fillna('').astype(str)
+
+        # One lookup per distinct (country, name) pair, found via integer codes
+        name_codes, name_values = pd.factorize(names)
+        country_codes, country_values = pd.factorize(countries)
+        width = len(name_values) + 1
+        codes, pairs = pd.factorize(country_codes.astype(np.int64) * width + name_codes + 1)
+
+        with self._lock:
+            seen = self._seen
+            ids = np.empty(len(pairs), dtype=np.int64)
+            for i, pair in enumerate(pairs):
+                country, name = divmod(int(pair), width)
+                if name == 0:
+                    ids[i] = UNKNOWN_ID
+                    continue
+                key = (country_values[country], name_values[name - 1])
+                ids[i] = seen[key] if key in seen else self._remember(key)
+
+        return ids[codes] if len(ids) else np.full(len(names), UNKNOWN_ID, dtype=np.int64)
+
+    def seed(self, names, countries, ids, labels=None):
+        """
+        Register names already resolved elsewhere (e.g. the id columns of a
+        snapshot another worker wrote), so this index gives those names and
+        their later variants the same ids instead of founding new entities
+
+        Args:
+            names, countries, ids: Per row, as passed to and returned by `resolve`
+            labels: Display name per row (default: the name)
+        """
+        names = pd.Series(names, dtype=object)
+        if countries is None:
+            countries = pd.Series('', index=names.index, dtype=object)
+        if labels is None:
+            labels = names
+        pairs = pd.DataFrame({
+            'name': names.to_numpy(),
+            'country': pd.Series(countries, dtype=object).fillna('').astype(str).to_numpy(),
+            'id': np.asarray(ids),
+            'label': pd.Series(labels, dtype=object).to_numpy()
+        })
+        pairs = pairs[pairs['name'].notna() & (pairs['id'] != UNKNOWN_ID)].drop_duplicates(['country', 'name'])
+
+        with self._lock:
+            for name, country, id_, label in pairs.itertuples(index=False):
+                if (country, name) in self._seen:
+                    continue
+                id_ = int(id_)
+                self._seen[(country, name)] = id_
+                self.names.setdefault(id_, str(label if pd.notna(label) else name).strip())
+                tokens = canonical_tokens(name)
+                if tokens and (country, ' '.join(tokens)) not in self._exact:
+                    self._add_variant(country, ' '.join(tokens), frozenset(_stem(t) for t in tokens), id_)
+
+    def labels(self, ids) -> pd.Series:
+        """Display name per entity id (None for unknown)"""
+        return pd.Series(ids).map(self.names)
+
+    def _remember(self, key: Tuple[str, str]) -> int:
+        self._seen[key] = self._resolve_one(*key)
+        return self._seen[key]
+
+    def _resolve_one(self, country: str, name) -> int:
+        tokens = canonical_tokens(name)
+        if not tokens:
+            return UNKNOWN_ID
+        canonical = ' '.join(tokens)
+        known = self._exact.get((country, canonical))
+        if known is not None:
+            return known
+
+        token_set = frozenset(_stem(t) for t in tokens)
+        match = self._best_match(country, token_set)
+        if match is None:
+            match = entity_id(self.kind, country, canonical)
+            self.names[match] = str(name).strip()
+
+        self._add_variant(country, canonical, token_set, match)
+        return match
+
+    def _add_variant(self, country: str, canonical: str, token_set: FrozenSet[str], id_: int):
+        self._exact[(country, canonical)] = id_
+        variants = self._variants[country]
+        postings = self._postings[country]
+        for token in token_set:
+            postings[token].append(len(variants))
+        variants.append((id_, token_set))
+
+    def _best_match(self, country: str, token_set: FrozenSet[str]) -> Optional[int]:
+        """Most similar known entity in the country block, if similar enough"""
+        variants = self._variants.get(country)
+        if not variants:
+            return None
+        postings = self._postings[country]
+
+        candidates = set()
+        for token in token_set:
+            hits = postings.get(token, ())
+            if len(hits) <= MAX_POSTINGS:
+                candidates.update(hits)
+
+        best, best_score = None, self.similarity
+        for position in candidates:
+            candidate, other = variants[position]
+            score = len(token_set & other) / len(token_set | other)
+            if score >= best_score:
+                best, best_score = candidate, score
+        return best
+
+    def stats(self) -> Dict:
+        return {
+            'kind': self.kind,
+            'entities': len(self.names),
+            'variants': sum(len(v) for v in self._variants.values())
+        }
+
+
+if __name__ == '__main__':
+    index = EntityIndex('buyer')
+    names = ['Stadtwerke München GmbH', 'STADTWERKE MUENCHEN', 'Stadtwerke Muenchen G.m.b.H.',
+             'Ministry of Health', 'Ministry of Health', 'Gmina Miasto Kraków', 'Gmina Miasta Krakow',
+             'Ville de Paris', None]
+    countries = ['DE', 'DE', 'DE', 'PL', 'SE', 'PL', 'PL', 'FR', 'FR']
+    ids = index.resolve(names, countries)
+    for name, country, id_, label in zip(names, countries, ids, index.labels(ids)):
+        print(f"{country} {str(name):<32} -> {id_:>20} {label}")
+    print(index.stats())
@@ -0,0 +1,140 @@
+"""
+Per-source refresh through a snapshot file shared by all workers
+
+The worker holding the source's lock fetches upstream at most once per
+`max_age_hours`, merges the result into the source's current snapshot and
+writes the new snapshot to the cache directory (write, then rename). With a
+refresh window, only tenders published in the last `window_days` are
+fetched and older rows are evicted, so the snapshot stays bounded; a refresh
+that got fewer rows than its limit holds the whole window and is marked
+complete, letting the store answer any query without going upstream. Every
+worker, the writer included, then memory-maps that file and swaps it into
+its TenderStore, so all workers share one copy of the data and pick up a
+refresh without re-reading or re-parsing it (on first start they wait for
+the file).
+"""
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+import pandas as pd
+
+from core.scheduler import FileLock
+from .snapshot import evict, map_snapshot, newest_first, upsert, write_snapshot
+
+# Column dating each row, for the refresh window
+DATE_COLUMNS = {'tenders': 'published_date', 'awards': 'award_date'}
+
+
+class SourceCache:
+    """One memory-mapped Arrow snapshot per source under a shared directory"""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self._loaded_version = {}
+
+    def path(self, source: str) -> Path:
+        return self.directory / f'snapshot_{source}.arrow'
+
+    def age_hours(self, source: str) -> Optional[float]:
+        try:
+            return (time.time() - self.path(source).stat().st_mtime) / 3600
+        except OSError:
+            return None
+
+    def read(self, source: str) -> Optional[pd.DataFrame]:
+        """The current snapshot, memory-mapped read-only (None if missing); metadata in `attrs`"""
+        return map_snapshot(self.path(source))
+
+    def read_if_changed(self, source: str) -> Optional[pd.DataFrame]:
+        """Map the file only if it was replaced since this process last mapped it"""
+        try:
+            stat = self.path(source).stat()
+        except OSError:
+            return None
+        # Each write renames a new file into place: a new inode
+        version = (stat.st_ino, stat.st_mtime_ns)
+        if self._loaded_version.get(source) == version:
+            return None
+        rows = self.read(source)
+        if rows is not None:
+            self._loaded_version[source] = version
+        return rows
+
+    def write(self, source: str, rows: pd.DataFrame, metadata: Optional[Dict] = None):
+        """Atomic replace so readers never see a partial file"""
+        write_snapshot(self.path(source), rows, metadata)
+
+
+def refresh_source(source: str, connector, store, cache: SourceCache,
+                   max_age_hours: float, filters: Optional[dict] = None, kind: str = 'tenders',
+                   budget: Optional[Callable[[], Tuple[bool, float]]] = None,
+                   window_days: Optional[int] = None) -> int:
+    """
+    Bring one source's data in the store up to date
+
+    Args:
+        kind: 'tenders' (search_tenders) or 'awards' (search_awards, kept in
+              its own cache file and the store's award table)
+        budget: Spends one upstream call (see UpstreamBudget.take); when it
+                refuses, the stale snapshot is kept and the next poll retries
+                (as when the upstream call fails)
+        window_days: Fetch and keep only rows dated in the last `window_days`
+                     days (None: no window, nothing is evicted)
+
+    Returns:
+        Number of rows in the snapshot swapped into the store (0 if the
+        shared file has not changed since this worker last mapped it)
+    """
+    name = source if kind == 'tenders' else f'{source}_{kind}'
+    if kind == 'awards':
+        fetch, resolve, key = connector.search_awards, store.awards.resolve, 'award_id'
+    else:
+        fetch, resolve, key = connector.search_tenders, store.resolve_entities, 'tender_id'
+    age = cache.age_hours(name)
+
+    if age is None or age >= max_age_hours:
+        lock = FileLock(cache.directory / 'locks' / f'{name}.lock')
+        # With no cache file at all, wait for whichever worker is fetching
+        # rather than starting cold; otherwise skip if someone else has it
+        if lock.acquire(blocking=age is None):
+            try:
+                # Re-check under the lock: another worker may have just refreshed
+                age = cache.age_hours(name)
+                if age is None or age >= max_age_hours:
+                    allowed, wait = budget() if budget else (True, 0.0)
+                    if allowed:
+                        filters = dict(filters or {})
+                        window_from = None
+                        if window_days:
+                            window_from = (date.today() - timedelta(days=int(window_days))).isoformat()
+                            filters['published_from'] = window_from
+                        try:
+                            fresh = resolve(fetch(filters, raise_errors=True))
+                        except Exception as e:
+                            # Keep the previous snapshot and its age, so the next poll retries
+                            print(f"Refresh Error ({name}): {e}")
+                        else:
+                            # Fewer rows than asked for: upstream has nothing more in the window
+                            complete = bool(filters.get('limit')) and len(fresh) < int(filters['limit'])
+                            rows = evict(upsert(cache.read(name), fresh, key), DATE_COLUMNS[kind], window_from)
+                            # Newest first, so a query's head(limit) is the page upstream would return
+                            rows = newest_first(rows, DATE_COLUMNS[kind])
+                            cache.write(name, rows, {'complete': complete, 'window_from': window_from})
+                    else:
+                        print(f"Upstream quota for {source} reached: serving cached {name} for {wait:.0f}s more")
+            finally:
+                lock.release()
+
+    rows = cache.read_if_changed(name)
+    if rows is None:
+        return 0
+
+    complete = bool(rows.attrs.get('complete'))
+    if kind == 'awards':
+        store.awards.swap(rows, source=source)
+        store.awards.mark_loaded(source, complete)
+    else:
+        store.swap(rows, source=source)
+        store.mark_loaded(source, complete)
+    return len(rows)
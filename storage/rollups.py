@@ -0,0 +1,170 @@
+"""
+Incremental daily rollups and period-over-period trends
+
+The store keeps one row per (published day, country, CPV division) with the
+tender count and summed EUR value. Ingest adds the incoming tenders and
+subtracts the rows they replace, so the rollup is never rebuilt. A trend
+query masks the rollup once and buckets its days into the current and the
+previous window of every period: week and month deltas come from one pass
+over a few thousand rows instead of two searches per period.
+
+A period's change needs twice its length of history, and the store holds
+only the refresh window (`scheduler.refresh_days`, 90 days): a period
+longer than half the window (a 91-day quarter) could never be computed.
+"""
+import threading
+from datetime import date
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# Trailing windows in days, ending today (inclusive); at most half the refresh window
+PERIODS = {'week': 7, 'month': 30}
+
+ROLLUP_KEYS = ['day', 'country', 'division']
+ROLLUP_COLUMNS = ROLLUP_KEYS + ['tenders', 'value_eur']
+
+# Longest CPV prefix the rollup can answer (a division is the first two digits)
+DIVISION_DIGITS = 2
+
+
+def _empty_rollup() -> pd.DataFrame:
+    return pd.DataFrame({
+        'day': pd.Series(dtype=np.int64), 'country': pd.Series(dtype=object),
+        'division': pd.Series(dtype=object), 'tenders': pd.Series(dtype=np.int64),
+        'value_eur': pd.Series(dtype=float)
+    })
+
+
+def summarize(tenders: pd.DataFrame, sign: int = 1) -> pd.DataFrame:
+    """Daily rollup rows for a tenders frame (counts and values times `sign`)"""
+    if tenders is None or len(tenders) == 0 or 'published_date' not in tenders.columns:
+        return _empty_rollup()
+
+    # Parse the distinct dates only
+    codes, uniques = pd.factorize(tenders['published_date'])
+    parsed = pd.to_datetime(pd.Index(uniques), errors='coerce', format='mixed').normalize()
+    day_values = np.append(parsed.to_numpy().astype('datetime64[D]').astype(np.int64), np.iinfo(np.int64).min)
+    days = day_values[codes]
+    dated = days != np.iinfo(np.int64).min
+
+    country = tenders['country'] if 'country' in tenders.columns else pd.Series('', index=tenders.index)
+    cpv = tenders['cpv_code'] if 'cpv_code' in tenders.columns else pd.Series('', index=tenders.index)
+    values = tenders['value_eur'].to_numpy(dtype=float, na_value=np.nan) if 'value_eur' in tenders.columns else np.zeros(len(tenders))
+
+    rows = pd.DataFrame({
+        'day': days[dated],
+        'country': country.fillna('').astype(str).to_numpy(dtype=object)[dated],
+        'division': cpv.fillna('').astype(str).str[:DIVISION_DIGITS].to_numpy(dtype=object)[dated],
+        'tenders': np.full(int(dated.sum()), sign, dtype=np.int64),
+        'value_eur': np.nan_to_num(values[dated]) * sign
+    })
+    return rows.groupby(ROLLUP_KEYS, sort=False, as_index=False).sum()
+
+
+class DailyRollup:
+    """Tender counts and values per (day, country, CPV division), kept up to date on ingest"""
+
+    def __init__(self, frame: Optional[pd.DataFrame] = None):
+        self._frame = frame if frame is not None else _empty_rollup()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_frame(cls, tenders: pd.DataFrame) -> 'DailyRollup':
+        return cls(summarize(tenders))
+
+    @staticmethod
+    def answers(filters: Optional[Dict]) -> bool:
+        """True if the rollup alone can answer a query with these filters"""
+        filters = filters or {}
+        if filters.get('min_value') is not None or filters.get('max_value') is not None:
+            return False
+        return len(str(filters.get('cpv_code') or '')) <= DIVISION_DIGITS
+
+    def update(self, added: Optional[pd.DataFrame] = None, removed: Optional[pd.DataFrame] = None):
+        """Add the `added` tenders and subtract the `removed` ones"""
+        parts = [summarize(added), summarize(removed, sign=-1)]
+        parts = [part for part in parts if len(part)]
+        if not parts:
+            return
+        with self._lock:
+            combined = pd.concat([self._frame] + parts, ignore_index=True)
+            combined = combined.groupby(ROLLUP_KEYS, sort=False, as_index=False).sum()
+            self._frame = combined[combined['tenders'] != 0].reset_index(drop=True)
+
+    def trends(self, filters: Optional[Dict] = None, today: Optional[date] = None,
+               periods: Dict[str, int] = PERIODS) -> Dict:
+        """
+        Current vs previous window for every period
+
+        Args:
+            filters: country, cpv_code (prefix of at most two digits)
+            today: Last day of the current windows (default: today)
+
+        Returns:
+            {period: {days, tenders, previous_tenders, tenders_change,
+            value_eur, previous_value_eur, value_change}}; changes are
+            fractions (0.12 = +12%), None when the data does not reach back
+            over the whole previous window (a truncated window would make
+            any change look like growth)
+        """
+        filters = filters or {}
+        frame = self._frame
+        mask = np.ones(len(frame), dtype=bool)
+        if filters.get('country'):
+            mask &= (frame['country'] == filters['country']).to_numpy()
+        if filters.get('cpv_code'):
+            mask &= frame['division'].str.startswith(str(filters['cpv_code'])).to_numpy(dtype=bool)
+
+        today = np.datetime64(today or date.today(), 'D').astype(np.int64)
+        # Oldest day held; that day itself may be cut short by a row limit
+        covered = today - int(frame['day'].min()) if len(frame) else -1
+        age = today - frame['day'].to_numpy()[mask]
+        counts = frame['tenders'].to_numpy()[mask]
+        values = frame['value_eur'].to_numpy()[mask]
+
+        result = {}
+        for name, length in periods.items():
+            current = (age >= 0) & (age < length)
+            previous = (age >= length) & (age < 2 * length)
+            tenders, previous_tenders = int(counts[current].sum()), int(counts[previous].sum())
+            value, previous_value = float(values[current].sum()), float(values[previous].sum())
+            complete = covered > 2 * length - 1
+            result[name] = {
+                'days': length,
+                'tenders': tenders,
+                'previous_tenders': previous_tenders,
+                'tenders_change': _change(tenders, previous_tenders) if complete else None,
+                'value_eur': value,
+                'previous_value_eur': previous_value,
+                'value_change': _change(value, previous_value) if complete else None
+            }
+        return result
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """Rollup rows (treat as read-only)"""
+        return self._frame
+
+    def __len__(self):
+        return len(self._frame)
+
+
+def _change(current: float, previous: float) -> Optional[float]:
+    return float(current / previous - 1) if previous > 0 else None
+
+
+def period_trends(tenders: pd.DataFrame, filters: Optional[Dict] = None, today: Optional[date] = None) -> Dict:
+    """Trends for a tenders frame that is not in a store (rolled up on the fly)"""
+    return DailyRollup.from_frame(tenders).trends(filters, today)
+
+
+if __name__ == '__main__':
+    from connectors.synthetic import generate_tenders
+
+    tenders = generate_tenders(100_000, seed=1, end=date(2026, 10, 18))
+    rollup = DailyRollup.from_frame(tenders)
+    print(f"{len(tenders):,} tenders -> {len(rollup):,} rollup rows")
+    for period, trend in rollup.trends({'country': 'DE'}, today=date(2026, 10, 18)).items():
+        print(f"  {period:<8} {trend['tenders']:>6} vs {trend['previous_tenders']:>6}  {trend['tenders_change']:+.1%}")
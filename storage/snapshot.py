@@ -0,0 +1,108 @@
+"""
+Memory-mapped snapshot files shared by all workers
+
+A snapshot is an uncompressed Arrow IPC (Feather v2) file. Workers open it
+through a read-only memory map and the DataFrame on top wraps the mapped
+column buffers instead of copying them, so however many uvicorn workers
+serve from a snapshot, its data sits in RAM once (in the page cache).
+
+A new snapshot is written to a temporary file and renamed over the old one.
+Readers never see a partial file, and a worker still holding the previous
+mapping keeps a consistent view until it swaps; the old pages are freed when
+the last mapping goes away. A small JSON metadata dict (e.g. whether the
+refresh behind the snapshot was complete) travels in the file's schema and
+comes back in the mapped frame's `attrs`.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+
+
+# Schema metadata key holding the snapshot's JSON metadata
+METADATA_KEY = b'snapshot'
+
+
+def write_snapshot(path: Path, frame: pd.DataFrame, metadata: Optional[Dict] = None):
+    """Write `frame` as an uncompressed Arrow file and atomically replace `path`"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    try:
+        table = pa.Table.from_pandas(frame.reset_index(drop=True), preserve_index=False)
+        if metadata:
+            schema_metadata = {**(table.schema.metadata or {}), METADATA_KEY: json.dumps(metadata).encode()}
+            table = table.replace_schema_metadata(schema_metadata)
+        # Compressed buffers would have to be decompressed into private memory
+        feather.write_feather(table, tmp, compression='uncompressed')
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def map_snapshot(path: Path) -> Optional[pd.DataFrame]:
+    """
+    DataFrame over the memory-mapped snapshot at `path` (read-only), None if
+    missing; its metadata is in `frame.attrs`
+    """
+    try:
+        table = feather.read_table(path, memory_map=True)
+    except (OSError, pa.ArrowInvalid):
+        return None
+    # split_blocks keeps each column on its own buffer (no consolidation copy)
+    frame = table.to_pandas(split_blocks=True)
+    metadata = (table.schema.metadata or {}).get(METADATA_KEY)
+    if metadata:
+        frame.attrs.update(json.loads(metadata))
+    return frame
+
+
+def contains(values: pd.Series, candidates: pd.Series) -> np.ndarray:
+    """Boolean mask: which `values` occur in `candidates` (hash join in Arrow)"""
+    if len(values) == 0 or len(candidates) == 0:
+        return np.zeros(len(values), dtype=bool)
+    values = pa.array(values)
+    found = pc.is_in(values, value_set=pa.array(candidates).cast(values.type))
+    return found.to_numpy(zero_copy_only=False).astype(bool)
+
+
+def upsert(frame: Optional[pd.DataFrame], rows: pd.DataFrame, key: str) -> pd.DataFrame:
+    """`frame` with `rows` added; rows replace stored rows with the same `key`"""
+    if rows is None or len(rows) == 0:
+        return frame if frame is not None else rows
+    rows = rows.drop_duplicates(key, keep='last')
+    if frame is None or len(frame) == 0:
+        return rows.reset_index(drop=True)
+    kept = frame[~contains(frame[key], rows[key])]
+    return pd.concat([kept, rows], ignore_index=True)
+
+
+def evict(frame: Optional[pd.DataFrame], column: str, before: Optional[str]) -> Optional[pd.DataFrame]:
+    """`frame` without the rows dated (ISO `column`) before `before`, or undated"""
+    if frame is None or not before or column not in frame.columns or len(frame) == 0:
+        return frame
+    dates = frame[column].fillna('').astype(str)
+    return frame[(dates != '') & (dates >= before)].reset_index(drop=True)
+
+
+def newest_first(frame: Optional[pd.DataFrame], column: str) -> Optional[pd.DataFrame]:
+    """`frame` sorted by ISO date `column`, newest first (undated rows last), as upstream returns rows"""
+    if frame is None or column not in frame.columns or len(frame) == 0:
+        return frame
+    return frame.sort_values(column, ascending=False, kind='stable', na_position='last').reset_index(drop=True)
+
+
+def answers(filters: Optional[Dict], rows: pd.DataFrame, complete: bool) -> bool:
+    """
+    True if `rows`, a snapshot's matches for `filters`, are the whole answer
+    upstream would give: a full page of `limit` rows, or any number when the
+    snapshot holds everything upstream has in its refresh window
+    """
+    limit = (filters or {}).get('limit')
+    return complete or (bool(limit) and len(rows) >= int(limit))
@@ -0,0 +1,287 @@
+"""
+In-process tender store
+
+Holds the current tender snapshot keyed by tender_id. Everything entering the
+platform goes through `ingest`, which resolves buyer names to entity ids
+(`buyer_id`, `buyer_entity`), returns the rows not seen before and hands
+them to the registered listeners (e.g. the live SSE feed). Contract awards
+are kept in a separate AwardTable and joined to the tenders on tender_id.
+Deadlines are indexed per snapshot for "closing soon" range scans, and a
+daily rollup kept up to date on ingest answers period-over-period trends.
+
+`swap` installs a whole snapshot instead, typically one memory-mapped from
+the shared cache (see storage.snapshot), without copying it.
+"""
+import threading
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+from .awards import AwardTable
+from .deadlines import DeadlineIndex, days_to_deadline
+from .entities import EntityIndex
+from .rollups import DailyRollup, period_trends
+from .snapshot import answers, contains
+
+# Tender columns carried onto awards by join_awards (tender column -> award column)
+AWARD_JOIN_COLUMNS = {
+    'value_eur': 'estimated_value_eur', 'title': 'title', 'country_name': 'country_name',
+    'cpv_description': 'cpv_description', 'procedure_type': 'procedure_type',
+    'published_date': 'published_date'
+}
+
+
+def filter_tenders(frame: pd.DataFrame, filters: Optional[Dict] = None) -> pd.DataFrame:
+    """
+    Rows of a tenders frame matching connector-style filters
+
+    Filters: country, cpv_code (prefix), min_value, max_value,
+    deadline_from, deadline_to, published_from (YYYY-MM-DD, inclusive), limit
+    """
+    filters = filters or {}
+    limit = filters.get('limit')
+    if limit is not None and int(limit) < 1:
+        raise ValueError(f"limit must be positive, got {limit}")
+    if len(frame) == 0:
+        return frame
+
+    mask = pd.Series(True, index=frame.index)
+    if filters.get('country'):
+        mask &= frame['country'] == filters['country']
+    if filters.get('cpv_code'):
+        mask &= frame['cpv_code'].str.startswith(str(filters['cpv_code']))
+    if filters.get('min_value') is not None:
+        mask &= frame['value_eur'] >= filters['min_value']
+    if filters.get('max_value') is not None:
+        mask &= frame['value_eur'] <= filters['max_value']
+    if filters.get('deadline_from') or filters.get('deadline_to'):
+        # ISO dates compare correctly as strings; missing deadlines match neither bound
+        deadline = frame['deadline'].fillna('').astype(str)
+        mask &= deadline != ''
+        if filters.get('deadline_from'):
+            mask &= deadline >= str(filters['deadline_from'])
+        if filters.get('deadline_to'):
+            mask &= deadline <= str(filters['deadline_to'])
+    if filters.get('published_from'):
+        mask &= frame['published_date'].fillna('').astype(str) >= str(filters['published_from'])
+
+    result = frame[mask]
+    if limit is not None:
+        result = result.head(int(limit))
+    return result.reset_index(drop=True)
+
+
+def closing_soon(frame: pd.DataFrame, days: int = 7, filters: Optional[Dict] = None,
+                 today: Optional[date] = None, index: Optional[DeadlineIndex] = None) -> pd.DataFrame:
+    """
+    Tenders whose deadline falls within the next `days` days, earliest first,
+    with `days_to_deadline` computed for `today`
+
+    Args:
+        frame: Tenders
+        days: Window length in days (today included)
+        filters: country, cpv_code, min_value, max_value, limit (see filter_tenders)
+        today: Reference day (default: today)
+        index: DeadlineIndex over `frame`, if one is already built
+    """
+    if len(frame) == 0 or 'deadline' not in frame.columns:
+        return frame.assign(days_to_deadline=pd.Series(dtype=float))
+
+    index = index if index is not None else DeadlineIndex(frame['deadline'])
+    in_range = frame.take(index.closing_within(days, today))
+    result = filter_tenders(in_range, filters)
+    return result.assign(days_to_deadline=days_to_deadline(result['deadline'], today).astype(int))
+
+
+class TenderStore:
+    """Current tender snapshot plus ingest hooks"""
+
+    def __init__(self):
+        self._frame = pd.DataFrame()
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[pd.DataFrame], None]] = []
+        self.last_ingest: Dict[str, datetime] = {}
+        self.loaded_sources = set()
+        self.complete_sources = set()
+        self.buyers = EntityIndex('buyer')
+        self.suppliers = EntityIndex('supplier')
+        self.awards = AwardTable(self.suppliers)
+        self.rollup = DailyRollup()
+        self._positions = None
+        self._deadlines = None
+
+    def add_listener(self, listener: Callable[[pd.DataFrame], None]):
+        """Call `listener(new_rows)` after every ingest that adds tenders"""
+        self._listeners.append(listener)
+
+    def ingest(self, tenders: pd.DataFrame, source: Optional[str] = None) -> pd.DataFrame:
+        """
+        Upsert tenders into the store (incoming rows replace stored rows
+        with the same tender_id)
+
+        Returns:
+            The rows whose tender_id was not already stored
+        """
+        if tenders is None or len(tenders) == 0:
+            return pd.DataFrame(columns=getattr(tenders, 'columns', None))
+
+        tenders = self.resolve_entities(tenders.drop_duplicates('tender_id', keep='last'))
+
+        with self._lock:
+            if len(self._frame):
+                new_rows = tenders[~contains(tenders['tender_id'], self._frame['tender_id'])]
+                replaced = contains(self._frame['tender_id'], tenders['tender_id'])
+                self.rollup.update(tenders, removed=self._frame[replaced])
+                self._frame = pd.concat([self._frame[~replaced], tenders], ignore_index=True)
+            else:
+                new_rows = tenders
+                self.rollup.update(tenders)
+                self._frame = tenders.reset_index(drop=True)
+            self.last_ingest[source or 'default'] = datetime.now()
+
+        self._publish(new_rows)
+        return new_rows
+
+    def swap(self, snapshot: pd.DataFrame, source: Optional[str] = None) -> pd.DataFrame:
+        """
+        Replace the whole snapshot with `snapshot` (e.g. a memory-mapped
+        file), keeping a reference rather than a copy; the rollup is rebuilt
+        from it and its resolved buyers seed the entity index
+
+        Returns:
+            The rows whose tender_id was not held before (also sent to listeners)
+        """
+        if 'buyer_id' in snapshot.columns:
+            self.buyers.seed(snapshot['buyer'], snapshot.get('country'), snapshot['buyer_id'], snapshot.get('buyer_entity'))
+        snapshot = self.resolve_entities(snapshot)
+        rollup = DailyRollup.from_frame(snapshot)
+
+        with self._lock:
+            if len(self._frame):
+                new_rows = snapshot[~contains(snapshot['tender_id'], self._frame['tender_id'])]
+            else:
+                new_rows = snapshot
+            self._frame = snapshot
+            self.rollup = rollup
+            self.last_ingest[source or 'default'] = datetime.now()
+
+        self._publish(new_rows)
+        return new_rows
+
+    def _publish(self, new_rows: pd.DataFrame):
+        if len(new_rows):
+            for listener in self._listeners:
+                try:
+                    listener(new_rows)
+                except Exception as e:
+                    print(f"Ingest listener error: {e}")
+
+    def resolve_entities(self, tenders: pd.DataFrame) -> pd.DataFrame:
+        """Tenders with buyer_id / buyer_entity columns (unchanged if already resolved)"""
+        if 'buyer' not in tenders.columns or 'buyer_id' in tenders.columns:
+            return tenders
+        buyer_ids = self.buyers.resolve(tenders['buyer'], tenders.get('country'))
+        return tenders.assign(buyer_id=buyer_ids, buyer_entity=self.buyers.labels(buyer_ids).to_numpy())
+
+    def query(self, filters: Optional[Dict] = None) -> pd.DataFrame:
+        """Tenders matching the connector-style filters (see filter_tenders)"""
+        return filter_tenders(self._frame, filters)
+
+    def ingest_awards(self, awards: pd.DataFrame, source: Optional[str] = None) -> pd.DataFrame:
+        """Upsert awards into the award table; returns the new rows"""
+        return self.awards.ingest(awards, source=source)
+
+    def query_awards(self, filters: Optional[Dict] = None) -> pd.DataFrame:
+        """Awards matching the filters, joined with their tenders"""
+        return self.join_awards(self.awards.query(filters))
+
+    def join_awards(self, awards: pd.DataFrame) -> pd.DataFrame:
+        """
+        Awards plus the columns of the tender each one concludes (estimated
+        value, title, category, ...); values the award notice already carries
+        are kept, NaN where neither has one
+        """
+        awards = self.awards.resolve(awards)
+        if awards is None or len(awards) == 0:
+            return awards
+
+        frame, index = self._tender_index()
+        positions = index.get_indexer(awards['tender_id'])
+        found = positions >= 0
+        rows = np.where(found, positions, 0)
+
+        joined = {}
+        for column, target in AWARD_JOIN_COLUMNS.items():
+            if column not in frame.columns or not len(frame):
+                continue
+            values = pd.Series(frame[column].to_numpy()[rows], index=awards.index).where(found)
+            joined[target] = awards[target].where(awards[target].notna(), values) if target in awards.columns else values
+        return awards.assign(**joined)
+
+    def _tender_index(self):
+        """(snapshot, tender_id index over it), rebuilt after each ingest"""
+        cached = self._positions
+        frame = self._frame
+        if cached is None or cached[0] is not frame:
+            index = pd.Index(frame['tender_id']) if len(frame) else pd.Index([])
+            cached = self._positions = (frame, index)
+        return cached
+
+    def closing_soon(self, days: int = 7, filters: Optional[Dict] = None,
+                     today: Optional[date] = None) -> pd.DataFrame:
+        """Stored tenders closing within `days` days (see closing_soon), by range scan"""
+        frame, index = self._deadline_index()
+        return closing_soon(frame, days, filters, today, index=index)
+
+    def trends(self, filters: Optional[Dict] = None, today: Optional[date] = None) -> Dict:
+        """
+        Period-over-period trends for the tenders matching `filters` (limit
+        ignored), from the daily rollup when it can answer the filters
+        """
+        filters = {k: v for k, v in (filters or {}).items() if k != 'limit'}
+        if DailyRollup.answers(filters):
+            return self.rollup.trends(filters, today)
+        return period_trends(self.query(filters), today=today)
+
+    def _deadline_index(self):
+        """(snapshot, DeadlineIndex over it), rebuilt after each ingest"""
+        cached = self._deadlines
+        frame = self._frame
+        if cached is None or cached[0] is not frame:
+            index = DeadlineIndex(frame['deadline'] if 'deadline' in frame.columns else [])
+            cached = self._deadlines = (frame, index)
+        return cached
+
+    def mark_loaded(self, source: str, complete: bool = False):
+        """
+        Record that a refresh of `source` has been swapped in; `complete` if
+        it holds every tender upstream has in the refresh window
+        """
+        self.loaded_sources.add(source)
+        if complete:
+            self.complete_sources.add(source)
+        else:
+            self.complete_sources.discard(source)
+
+    @property
+    def loaded(self) -> bool:
+        """True once at least one source has been fully loaded"""
+        return bool(self.loaded_sources)
+
+    @property
+    def complete(self) -> bool:
+        """True if every loaded source's refresh was complete"""
+        return self.loaded and self.loaded_sources <= self.complete_sources
+
+    def answers(self, filters: Optional[Dict], rows: pd.DataFrame) -> bool:
+        """True if `rows` (stored matches for `filters`) need no upstream query (see snapshot.answers)"""
+        return answers(filters, rows, self.complete)
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """Current snapshot (treat as read-only)"""
+        return self._frame
+
+    def __len__(self):
+        return len(self._frame)